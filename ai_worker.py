@@ -0,0 +1,84 @@
+# ai_worker.py — AI move searches off the render loop
+import threading
+import time
+
+
+class AIWorker:
+    """
+    Runs engine.choose(spec, candidates) on a daemon thread so the frame loop
+    keeps drawing (and taking input) while the AI thinks. Each search is
+    tagged with a caller-chosen `key`; answers for any other key are ignored.
+    Where threads can't be started (e.g. the pygbag build) the search runs
+    in the calling frame, as it used to.
+
+    Anytime: a search still running after `budget` seconds is reported as
+    "expired" and the caller plays its quick move instead. The thread is left
+    to finish and its answer is dropped; no new search starts until it has,
+    since engines keep per-search state on themselves. A search run in the
+    calling frame that comes back past its budget is dropped the same way.
+    last_time is how long the current key's search actually ran.
+    """
+
+    def __init__(self, budget=3.0):
+        self.budget = budget
+        self.key = None
+        self.result = None
+        self.last_time = 0.0
+        self._status = None
+        self._started = 0.0
+        self._thread = None
+
+    def start(self, key, engine, spec, candidates, budget=None):
+        """Begin searching for `key` (within `budget` seconds, if given); see status()."""
+        if budget is not None:
+            self.budget = budget
+        self.key = key
+        self.result = None
+        self.last_time = 0.0
+        self._started = time.monotonic()
+        if self._thread is not None and self._thread.is_alive():
+            print("[AI] Previous search still running; using the quick move")
+            self._status = 'expired'
+            return
+
+        self._status = 'thinking'
+
+        def work():
+            try:
+                result = engine.choose(spec, candidates)
+            except Exception as e:
+                print(f"[AI] Background search failed: {e}")
+                result = None
+            if self.key == key and self._status == 'thinking':
+                self.last_time = time.monotonic() - self._started
+                if self.last_time > self.budget:
+                    print(f"[AI] Search ran past its {self.budget:.1f}s budget")
+                    result = None
+                self.result = result
+                self._status = 'done' if result is not None else 'expired'
+
+        try:
+            self._thread = threading.Thread(target=work, name="ai-search", daemon=True)
+            self._thread.start()
+        except RuntimeError:
+            self._thread = None
+            work()
+
+    def status(self, key):
+        """None (no search for `key`), 'thinking', 'done' or 'expired'."""
+        if self.key != key:
+            return None
+        if self._status == 'thinking' and time.monotonic() - self._started >= self.budget:
+            print(f"[AI] Search ran past its {self.budget:.1f}s budget")
+            self.last_time = time.monotonic() - self._started
+            self._status = 'expired'
+        return self._status
+
+    def thinking(self):
+        return self.status(self.key) == 'thinking'
+
+    def cancel(self):
+        """Forget the current search; a running thread's answer will be dropped."""
+        self.key = None
+        self.result = None
+        self._status = None
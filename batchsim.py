@@ -0,0 +1,338 @@
+# batchsim.py — rules statistics from many greedy games stepped together
+#
+#   python batchsim.py [--games 100000] [--players 2 3 4] [--set 6]
+#                      [--mode scoring|race] [--scoring-mode spinner_stays_12]
+#                      [--seed 0] [--within 3] [--batch 20000]
+#
+# Needs NumPy (the game itself doesn't). Every seat plays the greedy AI —
+# engine.score_move, then the heavier tile, then doubles, first legal action
+# on a tie, as policies.greedy_action — under the GameState rules. Games are
+# rows of arrays and each step() moves every unfinished game by one action,
+# so this answers rule questions (points per hand, blocked-hand rates, how
+# soon someone reaches 150) quickly; it can't compare AIs, use tournament.py.
+import argparse
+import time
+
+import numpy as np
+
+from bitboard import TILE_PIPS, set_size, tile_index
+from engine import DOMINO_SETS, TARGET_SCORE, hand_size_for
+
+LEFT, RIGHT, TOP, BOTTOM = range(4)     # arms, in BoardPosition's SIDES order
+ARMS = 4
+TILE_KEY_SPAN = 64      # greedy tie-break 2 * (a + b) + double stays below this
+
+
+def score_moves(projected, current, scoring_enabled=True):
+    """engine.score_move over arrays of totals."""
+    lower = projected < current
+    if not scoring_enabled:
+        return lower.astype(np.int16)
+    rest = projected % 5
+    points = np.where((projected > 0) & (rest == 0), projected, 0)
+    return points + 2 * ((rest == 1) | (rest == 4)) + lower
+
+
+class BatchSim:
+    """
+    `num_games` games of `num_players` greedy players, one row per game:
+    hands as (games, players, tiles) booleans, the board as its tips (pip
+    showing on each arm, -1 where the arm isn't started), spinner and ends
+    total, and the boneyard as the undealt tail of each game's deal order.
+    run() plays every game to game over, leaving per-game hands_played,
+    blocked_hands, board_points and bonus_points, and the final scores.
+    """
+
+    def __init__(self, num_games, num_players, max_pip=6, scoring_enabled=True,
+                 scoring_mode='spinner_stays_12', seed=None):
+        self.num_games = num_games
+        self.num_players = num_players
+        self.max_pip = max_pip
+        self.scoring_enabled = scoring_enabled
+        self.stays_12 = scoring_mode == 'spinner_stays_12'
+        self.hand_size = hand_size_for(max_pip, num_players)
+        self.num_tiles = set_size(max_pip)
+        self.rng = np.random.default_rng(seed)
+
+        pips = np.array(TILE_PIPS[:self.num_tiles], dtype=np.int16)
+        self.low, self.high = pips[:, 0], pips[:, 1]
+        self.double = self.low == self.high
+        self.tile_pips = self.low + self.high
+        self.tile_key = 2 * self.tile_pips + self.double
+        self.opening_total = np.where(self.double, 2 * self.low, self.tile_pips)
+        # showing[pip, tile]: the tile has that pip; the extra last row is for -1 (a closed arm)
+        self.showing = np.zeros((max_pip + 2, self.num_tiles), dtype=bool)
+        for pip in range(max_pip + 1):
+            self.showing[pip] = (self.low == pip) | (self.high == pip)
+        self.doubles = np.array([tile_index(pip, pip) for pip in range(max_pip + 1)])
+
+        n, t = num_games, self.num_tiles
+        self.hands = np.zeros((n, num_players, t), dtype=bool)
+        self.deck = np.zeros((n, t), dtype=np.intp)      # deal order; draws continue along it
+        self.drawn = np.zeros(n, dtype=np.intp)          # deck position of the next draw
+        self.tile_count = np.zeros(n, dtype=np.int16)
+        self.spinner = np.full(n, -1, dtype=np.int16)
+        self.tips = np.full((n, ARMS), -1, dtype=np.int16)
+        self.tip_double = np.zeros((n, ARMS), dtype=bool)
+        self.total = np.zeros(n, dtype=np.int16)
+        self.current = np.zeros(n, dtype=np.intp)
+        self.must_play = np.full(n, -1, dtype=np.intp)
+        self.scores = np.zeros((n, num_players), dtype=np.int32)
+        self.hand_winner = np.zeros(n, dtype=np.intp)
+        self.blocked = np.zeros(n, dtype=bool)
+        self.over = np.zeros(n, dtype=bool)
+        self.winner = np.full(n, -1, dtype=np.intp)
+        # hands_played includes the hand in which someone reached the target
+        self.hands_played = np.zeros(n, dtype=np.int32)
+        self.blocked_hands = np.zeros(n, dtype=np.int32)
+        self.board_points = np.zeros(n, dtype=np.int64)
+        self.bonus_points = np.zeros(n, dtype=np.int64)
+        self.steps = 0
+        self._deal(np.arange(n))
+
+    # ---------- dealing ----------
+
+    def _shuffle(self, count):
+        """`count` deal orders: seat s gets positions s*hand_size.., draws come after."""
+        return self.rng.permuted(np.tile(np.arange(self.num_tiles), (count, 1)), axis=1)
+
+    def _deal(self, games):
+        """Deal a new hand in `games` and pick who opens it, as GameState.deal()."""
+        if not len(games):
+            return
+        players, size = self.num_players, self.hand_size
+        deck = self._shuffle(len(games))
+        self.deck[games] = deck
+        self.hands[games] = False
+        seat_of = np.repeat(np.arange(players), size)
+        self.hands[games[:, None], seat_of, deck[:, :players * size]] = True
+        self.drawn[games] = players * size
+        self.tile_count[games] = 0
+        self.spinner[games] = -1
+        self.tips[games] = -1
+        self.tip_double[games] = False
+        self.total[games] = 0
+
+        # First hand: highest double dealt leads; after a block: the top double, if dealt
+        first = self.hands_played[games] == 0
+        restart = first | self.blocked[games]
+        held = self.hands[games][:, :, self.doubles]         # (games, players, doubles)
+        dealt = held.any(1)
+        top = len(self.doubles) - 1
+        highest = top - dealt[:, ::-1].argmax(1)
+        which = np.where(first, highest, top)
+        rows = np.arange(len(games))
+        found = dealt[rows, which]
+        seat = held[rows, :, which].argmax(1)
+        self.current[games] = np.where(restart, np.where(found, seat, 0), self.hand_winner[games])
+        self.must_play[games] = np.where(restart & found, self.doubles[which], -1)
+        self.blocked[games] = False
+
+    # ---------- the board ----------
+
+    def _open_ends(self, games):
+        """(games, 4) pip playable on each arm, -1 where nothing can join."""
+        tips = self.tips[games]
+        spinner = self.spinner[games]
+        ends = np.where(tips >= 0, tips, spinner[:, None])
+        # top and bottom open once a spinner has both left and right
+        cross = (spinner >= 0) & (tips[:, LEFT] >= 0) & (tips[:, RIGHT] >= 0)
+        ends[~cross, TOP:] = -1
+        return ends
+
+    def _spinner_term(self, spinner, both_sides, lone):
+        """BoardPosition._spinner_term: what the spinner itself adds to the total."""
+        counts = lone | ~both_sides if self.stays_12 else lone
+        return np.where(counts, 2 * spinner, 0)
+
+    def _projected(self, games, arm, tile, connection):
+        """Ends total after joining `tile` to `arm` on `connection`, one candidate per entry."""
+        low, high, double = self.low[tile], self.high[tile], self.double[tile]
+        tip = self.tips[games, arm]
+        started = tip >= 0
+        tip_value = np.where(self.tip_double[games, arm], 2 * tip, tip) * started
+        spinner = self.spinner[games]
+
+        exposed = np.where(low == connection, high, low)
+        joined = np.where(double, 2 * exposed, exposed)
+        # A new spinner arm may change what the spinner itself is worth
+        has_left, has_right = self.tips[games, LEFT] >= 0, self.tips[games, RIGHT] >= 0
+        before = self._spinner_term(spinner, has_left & has_right, self.tile_count[games] == 1)
+        after = self._spinner_term(spinner, (has_left | (arm == LEFT)) & (has_right | (arm == RIGHT)), False)
+        delta = np.where(started, joined - tip_value, joined + after - before)
+        # The first double on the line becomes the spinner
+        spinner_value = 2 * low if self.stays_12 else 0
+        delta = np.where((spinner < 0) & double, spinner_value - tip_value, delta)
+        return np.where(self.tile_count[games] == 0, self.opening_total[tile], self.total[games] + delta)
+
+    def _place(self, games, arm, tile, connection, projected):
+        """BoardPosition.place for one tile per game; the new ends total is already known."""
+        low, high, double = self.low[tile], self.high[tile], self.double[tile]
+        opening = self.tile_count[games] == 0
+        self.hands[games, self.current[games], tile] = False
+        self.total[games] = projected
+        self.tile_count[games] += 1
+        self.must_play[games] = -1
+
+        new_spinner = double & (opening | (self.spinner[games] < 0))
+        self.spinner[games[new_spinner]] = low[new_spinner]
+        line = opening & ~double
+        self.tips[games[line], LEFT] = low[line]
+        self.tips[games[line], RIGHT] = high[line]
+        # A double joining the line becomes the spinner; its arm starts afresh
+        onto = ~opening & new_spinner
+        self.tips[games[onto], arm[onto]] = -1
+        self.tip_double[games[onto], arm[onto]] = False
+        grow = ~opening & ~new_spinner
+        self.tips[games[grow], arm[grow]] = np.where(low == connection, high, low)[grow]
+        self.tip_double[games[grow], arm[grow]] = double[grow]
+
+    # ---------- turns ----------
+
+    def step(self):
+        """One action (play, draw or pass) in every unfinished game; returns how many are left."""
+        games = np.flatnonzero(~self.over)
+        if not len(games):
+            return 0
+        self.steps += 1
+        t = self.num_tiles
+        hand = self.hands[games, self.current[games]]
+        ends = self._open_ends(games)
+        fits = hand[:, None, :] & self.showing[ends]
+
+        # The opening tile goes on arm 0: the double that must lead, or any tile
+        opening = np.flatnonzero(self.tile_count[games] == 0)
+        must = self.must_play[games[opening]]
+        fits[opening, LEFT] = np.where((must >= 0)[:, None], np.arange(t) == must[:, None], hand[opening])
+
+        # Score only the legal moves, listed by game, then arm, then tile
+        slots = ARMS * t
+        row, slot = np.divmod(np.flatnonzero(fits), slots)
+        arm, tile = np.divmod(slot, t)
+        candidate = games[row]
+        projected = self._projected(candidate, arm, tile, ends[row, arm])
+        # Greedy: best score_move, then heavier tile, then double; first legal action on a
+        # tie. The low digits of the key are the reversed slot, so it also says which move.
+        score = score_moves(projected, self.total[candidate], self.scoring_enabled)
+        key = (score.astype(np.int64) * TILE_KEY_SPAN + self.tile_key[tile]) * slots + slots - 1 - slot
+        starts = np.flatnonzero(np.diff(row, prepend=-1))
+        best = slots - 1 - np.maximum.reduceat(key, starts) % slots
+        moved = row[starts]
+
+        plays = games[moved]
+        arm, tile = np.divmod(best, t)
+        connection = ends[moved, arm]
+        self._place(plays, arm, tile, connection, self._projected(plays, arm, tile, connection))
+        self._after_play(plays)
+
+        # Nothing fits: draw while the boneyard lasts, else pass
+        stuck = np.delete(games, moved)
+        can_draw = self.drawn[stuck] < t
+        draws = stuck[can_draw]
+        self.hands[draws, self.current[draws], self.deck[draws, self.drawn[draws]]] = True
+        self.drawn[draws] += 1
+        self._advance(stuck[~can_draw])
+        return int((~self.over).sum())
+
+    def _after_play(self, games):
+        seat = self.current[games]
+        out = ~self.hands[games, seat].any(1)
+        self._end_hand(games[out], seat[out], blocked=False)
+        games, seat = games[~out], seat[~out]
+        if self.scoring_enabled:
+            total = self.total[games]
+            points = np.where((total > 0) & (total % 5 == 0), total, 0)
+            self.scores[games, seat] += points
+            self.board_points[games] += points
+            won = self.scores[games, seat] >= TARGET_SCORE
+            self.over[games[won]] = True
+            self.winner[games[won]] = seat[won]
+            self.hands_played[games[won]] += 1
+            games = games[~won]
+        self._advance(games)
+
+    def _advance(self, games):
+        """Next player; a hand with an empty boneyard where nobody can play is blocked."""
+        self.current[games] = (self.current[games] + 1) % self.num_players
+        games = games[self.drawn[games] >= self.num_tiles]
+        if not len(games):
+            return
+        playable = self.showing[self._open_ends(games)].any(1)
+        # Usually the player to move can go, which settles it without the other hands
+        stuck = ~(self.hands[games, self.current[games]] & playable).any(1)
+        games, playable = games[stuck], playable[stuck]
+        blocked = games[~(self.hands[games] & playable[:, None, :]).any((1, 2))]
+        pips = (self.hands[blocked] * self.tile_pips).sum(2)
+        self._end_hand(blocked, pips.argmin(1), blocked=True)
+
+    def _end_hand(self, games, winner, blocked):
+        """GameState._end_hand: bonus, game over or the next deal."""
+        if not len(games):
+            return
+        self.hand_winner[games] = winner
+        self.blocked[games] = blocked
+        self.hands_played[games] += 1
+        self.blocked_hands[games] += blocked
+        if not self.scoring_enabled:
+            self.over[games] = True
+            self.winner[games] = winner
+            return
+
+        pips = (self.hands[games] * self.tile_pips).sum(2)
+        others = pips.sum(1) - pips[np.arange(len(games)), winner]
+        bonus = 5 * ((others + 2) // 5)         # to the nearest 5; never a tie
+        self.scores[games, winner] += bonus
+        self.bonus_points[games] += bonus
+        done = (self.scores[games] >= TARGET_SCORE).any(1)
+        self.over[games[done]] = True
+        self.winner[games[done]] = self.scores[games[done]].argmax(1)
+        self._deal(games[~done])
+
+    def run(self, max_steps=100_000):
+        while self.step():
+            if self.steps >= max_steps:
+                raise RuntimeError(f"{int((~self.over).sum())} games still going after {max_steps} steps")
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rules statistics from batches of greedy games.")
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--set", type=int, default=6, choices=sorted(DOMINO_SETS), dest="max_pip",
+                        help="highest double of the domino set")
+    parser.add_argument("--mode", choices=("scoring", "race"), default="scoring")
+    parser.add_argument("--scoring-mode", default="spinner_stays_12",
+                        help="any other value: the spinner only counts while it stands alone")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--within", type=int, default=3,
+                        help=f"report how often {TARGET_SCORE} is reached within this many hands")
+    parser.add_argument("--batch", type=int, default=20_000, help="games held in memory at once")
+    args = parser.parse_args(argv)
+    scoring = args.mode == "scoring"
+
+    print(f"{args.games} games of {DOMINO_SETS[args.max_pip]} per table size, {args.mode} mode, "
+          f"{args.scoring_mode}, greedy players")
+    print(f"{'players':>7}{'hands':>10}{'blocked':>9}{'pts/hand':>10}{'bonus/hand':>12}"
+          f"{'hands/game':>12}{f'<= {args.within} hands':>14}{'hands/s':>11}")
+    for players in args.players:
+        hand_size_for(args.max_pip, players)    # fail early on an impossible table
+        totals = dict.fromkeys(("hands", "blocked", "board", "bonus", "within"), 0)
+        start = time.perf_counter()
+        for batch, first in enumerate(range(0, args.games, args.batch)):
+            sim = BatchSim(min(args.batch, args.games - first), players, args.max_pip, scoring,
+                           args.scoring_mode, seed=(args.seed, players, batch)).run()
+            totals["hands"] += int(sim.hands_played.sum())
+            totals["blocked"] += int(sim.blocked_hands.sum())
+            totals["board"] += int(sim.board_points.sum())
+            totals["bonus"] += int(sim.bonus_points.sum())
+            totals["within"] += int((sim.hands_played <= args.within).sum())
+        elapsed = time.perf_counter() - start
+        hands = totals["hands"]
+        print(f"{players:>7}{hands:>10}{totals['blocked'] / hands:>9.1%}{totals['board'] / hands:>10.2f}"
+              f"{totals['bonus'] / hands:>12.2f}{hands / args.games:>12.2f}"
+              f"{totals['within'] / args.games:>14.1%}{hands / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
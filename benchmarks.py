@@ -0,0 +1,95 @@
+# benchmarks.py — per-move cost of the board engine across domino set sizes
+#
+#   python benchmarks.py [deals]          (e.g. > bench_output.txt)
+#
+# Plays random legal tiles onto a headless Board until nothing fits, for each
+# supported set, and reports the mean time of the calls a turn makes. With the
+# open-ends index, the spatial grid and the lane routes these should stay flat
+# as the set (and the board) grows.
+import contextlib
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from bitboard import set_size
+from board import Board
+from engine import DOMINO_SETS
+from tile import Tile
+
+SCREEN = (1200, 800)
+OPS = ("ends", "options", "apply+undo", "play")
+
+
+def _time(stats, op, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    stats[op].append(time.perf_counter() - start)
+    return result
+
+
+def run_deal(max_pip, rng, stats, early, late):
+    """Play one random board to a standstill; `early`/`late` split play() by board fill."""
+    board = Board(*SCREEN, max_pip=max_pip)
+    pool = [Tile(i, j) for i in range(max_pip + 1) for j in range(i, max_pip + 1)]
+    rng.shuffle(pool)
+    early_cut = board.max_tiles // 4
+
+    while pool:
+        _time(stats, "ends", board.get_playable_ends)
+        moves = []
+        for tile in pool:
+            options = _time(stats, "options", board.get_valid_placement_options, tile)
+            moves.extend((tile, option) for option in options)
+        if not moves:
+            break
+        tile, option = rng.choice(moves)
+
+        if board.tiles:
+            start = time.perf_counter()
+            if board.apply((tile, option)):
+                board.undo()
+            stats["apply+undo"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        placed = board.play(tile, option)
+        elapsed = time.perf_counter() - start
+        stats["play"].append(elapsed)
+        (early if board.tile_count <= early_cut else late).append(elapsed)
+        if not placed:
+            break
+        pool.remove(tile)
+    return board.tile_count
+
+
+def main(deals=20):
+    pygame.init()
+    pygame.display.set_mode(SCREEN)
+    rng = random.Random(1234)
+
+    print(f"{'set':<15}{'tiles':>7}{'placed':>8}" + "".join(f"{op:>12}" for op in OPS)
+          + f"{'play early':>12}{'play late':>12}")
+    print("(mean microseconds per call; early/late = first quarter of the set vs the rest)")
+    for max_pip, name in DOMINO_SETS.items():
+        stats = {op: [] for op in OPS}
+        early, late = [], []
+        placed = 0
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            # Warm-up deal: loads (or draws) every face and builds the routes
+            run_deal(max_pip, rng, {op: [] for op in OPS}, [], [])
+            for _ in range(deals):
+                placed += run_deal(max_pip, rng, stats, early, late)
+        tiles = set_size(max_pip)
+
+        def mean_us(samples):
+            return f"{1e6 * sum(samples) / len(samples):12.1f}" if samples else f"{'-':>12}"
+
+        print(f"{name:<15}{tiles:>7}{placed / deals:>8.1f}"
+              + "".join(mean_us(stats[op]) for op in OPS) + mean_us(early) + mean_us(late))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,104 @@
+# bitboard.py — integer encoding of a domino set for search and simulation
+import random
+
+# Every domino a|b (a <= b) has a fixed index b*(b+1)/2 + a, so the double-six
+# set is 0..27 and bigger sets only append indices: 0|0, 0|1, 1|1, 0|2, 1|2, ...
+# A hand, the boneyard or the played tiles is then an int with one bit per tile.
+
+MAX_SUPPORTED_PIP = 15
+
+
+def tile_index(a, b):
+    """Fixed index of the domino a|b (order of the halves doesn't matter)."""
+    if a > b:
+        a, b = b, a
+    return b * (b + 1) // 2 + a
+
+
+def set_size(max_pip=6):
+    """Number of dominoes in a double-`max_pip` set (28 for double-six)."""
+    return (max_pip + 1) * (max_pip + 2) // 2
+
+
+def full_mask(max_pip=6):
+    return (1 << set_size(max_pip)) - 1
+
+
+# index -> (low pip, high pip)
+TILE_PIPS = tuple((a, b) for b in range(MAX_SUPPORTED_PIP + 1) for a in range(b + 1))
+
+# pip -> mask of every domino (in the largest supported set) showing that pip;
+# AND with full_mask(max_pip) for a smaller set.
+PIP_MASKS = tuple(
+    sum(1 << tile_index(pip, other) for other in range(MAX_SUPPORTED_PIP + 1))
+    for pip in range(MAX_SUPPORTED_PIP + 1)
+)
+
+DOUBLES_MASK = sum(1 << tile_index(pip, pip) for pip in range(MAX_SUPPORTED_PIP + 1))
+
+
+def tile_pips(index):
+    return TILE_PIPS[index]
+
+
+def indices(mask):
+    """Yield the tile indices set in `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def count(mask):
+    return mask.bit_count()
+
+
+def pip_total(mask):
+    """Sum of the pips on every tile in `mask`."""
+    total = 0
+    for index in indices(mask):
+        a, b = TILE_PIPS[index]
+        total += a + b
+    return total
+
+
+# ---------- conversion to and from Tile objects ----------
+
+def mask_of(tiles):
+    """Mask of a list of Tile objects, e.g. a Player.hand or Boneyard.tiles."""
+    mask = 0
+    for tile in tiles:
+        mask |= 1 << tile.index
+    return mask
+
+
+def tiles_in(mask, tiles):
+    """The Tile objects from `tiles` whose bit is set in `mask`, in their original order."""
+    return [tile for tile in tiles if mask >> tile.index & 1]
+
+
+# ---------- Zobrist keys ----------
+
+# Fixed seed so hashes agree between runs and processes; a private generator
+# so building the tables never disturbs the game's shuffle.
+_rng = random.Random(0x5EED_D0E5)
+
+def _key():
+    return _rng.getrandbits(64)
+
+ZOBRIST_TILE = tuple(_key() for _ in TILE_PIPS)
+ZOBRIST_SPINNER = tuple(_key() for _ in range(MAX_SUPPORTED_PIP + 1))
+ZOBRIST_TIP = {
+    (arm, pip, is_double): _key()
+    for arm in ('left', 'right', 'top', 'bottom')
+    for pip in range(MAX_SUPPORTED_PIP + 1)
+    for is_double in (False, True)
+}
+
+
+def tips_hash(tips):
+    """Zobrist contribution of a BoardPosition.tips dict."""
+    h = 0
+    for arm, (pip, is_double) in tips.items():
+        h ^= ZOBRIST_TIP[arm, pip, is_double]
+    return h
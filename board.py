@@ -1,10 +1,56 @@
 import pygame
 import math
-import random
+import os
+from position import BoardPosition, SIDES
+from spatial_grid import SpatialGrid
+from layout import LayoutPlanner
+from bitboard import set_size
+from engine import DOMINO_SETS, score_move
+from transposition import TranspositionTable
+
+# Tiles never shrink below this width (height is twice it). A play area must
+# let any one arm take the whole set, with a quarter to spare, at this size.
+MIN_TILE_WIDTH = 8
+
+
+def build_placement_geometry(tile_width, tile_height, spacing):
+    """
+    How a tile goes down when played off a target tile, keyed by
+    (is_double, direction, connection_value == tile.value1). Each entry is
+    (rotation, w, h, fx, ox, fy, oy): the tile is turned to `rotation`, covers
+    w x h, and its top-left lands at
+        x = target.x + target.width * fx // 2 + ox
+        y = target.y + target.height * fy // 2 + oy
+    (fx/fy of 0, 1, 2 anchor on the target's near edge, centre or far edge).
+    """
+    # Regular tiles face the matching pip toward the join: (other pip, value1) matches
+    regular_rotation = {'left': (90, 270), 'right': (270, 90), 'top': (0, 180), 'bottom': (180, 0)}
+    table = {}
+    for direction in SIDES:
+        for is_double in (False, True):
+            for matches_value1 in (False, True):
+                if is_double:
+                    # Doubles lie across the branch
+                    rotation = 0 if direction in ('left', 'right') else 90
+                else:
+                    rotation = regular_rotation[direction][matches_value1]
+                w, h = (tile_height, tile_width) if rotation in (90, 270) else (tile_width, tile_height)
+                if direction == 'left':
+                    offsets = (0, -w - spacing, 1, -(h // 2))
+                elif direction == 'right':
+                    offsets = (2, spacing, 1, -(h // 2))
+                elif direction == 'top':
+                    offsets = (1, -(w // 2), 0, -h - spacing)
+                else:
+                    offsets = (1, -(w // 2), 2, spacing)
+                table[is_double, direction, matches_value1] = (rotation, w, h) + offsets
+    return table
+
 
 class Board:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, max_pip=6):
         self.tiles = []
+        self.max_pip = max_pip
         self.screen_width = screen_width
         self.screen_height = screen_height
         
@@ -35,13 +81,59 @@ class Board:
         
         # Tile count and spinner
         self.tile_count = 0
-        self.max_tiles = 28
+        self.max_tiles = set_size(max_pip)
         self.spinner_tile = None
         self.scoring_mode = 'spinner_stays_12'
         
-        # Standard tile sizes
-        self.tile_width = 40
-        self.tile_height = 80
+        # Standard tile sizes (40x80); bigger sets start with smaller board
+        # tiles so the play area holds proportionally more of them, and a
+        # hand whose arms outgrow their routes shrinks them further.
+        scale = min(1.0, math.sqrt(set_size(6) / self.max_tiles))
+        self.full_tile_width = max(16, 2 * round(20 * scale))
+        self.tile_spacing = 2   # hairline gap so abutting tiles don't "collide"
+        smallest = LayoutPlanner(self.play_area_rect,
+                                 build_placement_geometry(MIN_TILE_WIDTH, 2 * MIN_TILE_WIDTH, self.tile_spacing),
+                                 MIN_TILE_WIDTH, 2 * MIN_TILE_WIDTH, self.tile_spacing)
+        if smallest.capacity() < self.max_tiles * 5 // 4:
+            raise ValueError(f"A {self.play_area_rect.width}x{self.play_area_rect.height} play area "
+                             f"is too small for {DOMINO_SETS[max_pip]}")
+
+        # Tile size, geometry table, lane routes and the occupancy grid all
+        # follow the current tile width (see _set_tile_size)
+        self._set_tile_size(self.full_tile_width)
+
+        # What the layout is rebuilt from: the tile at the centre (the opening
+        # tile, then the spinner) and per arm its (tile, connection_value)
+        # pairs going outward.
+        self.hub_tile = None
+        self.arm_chains = {}
+
+        # Logical domino graph, keyed by id(tile): which tile sits on each
+        # side of a placed tile, and the pip an attached tile shows outward.
+        # Connectivity questions are answered from here, never from pixels.
+        self.neighbors = {}
+        self.outward_pips = {}
+
+        # Open-ends index, kept up to date by play()/reset_board(). The logical
+        # arms live in self.position; per arm we remember the tile at its open
+        # end and the screen direction that end grows in.
+        self.position = BoardPosition(self.scoring_mode)
+        self.arm_tiles = {}
+        self.arm_directions = {}
+        self._open_ends = (('center', None, None),)
+        self._open_end_arms = (None,)
+
+        # (end signature, arm, tile, connection, scoring) -> (projected total,
+        # move score). The signature changes with the ends, so entries never
+        # go stale; they are shared by every AI seat and carry across turns.
+        self.move_scores = TranspositionTable(max_entries=4096)
+
+        # Undo records for apply(); while any are pending the board holds
+        # tiles that were never laid out, so only the logical view is valid.
+        self._undo_stack = []
+
+        # Set DOMINO_DEBUG_ENDS=1 to cross-check the index against a full recompute
+        self.debug_open_ends = os.environ.get("DOMINO_DEBUG_ENDS") == "1"
 
     def will_exceed_boundary(self, x, y, tile_width, tile_height):
         """Standard boundary checking within play area."""
@@ -51,358 +143,172 @@ class Board:
                 y + tile_height > self.play_area_rect.bottom)
 
     def _position_occupied(self, x, y, width, height):
-        new_rect = pygame.Rect(x, y, width, height)
-        tolerance = 2
-        for existing in self.tiles:
-            existing_rect = existing.rect
-            # Check with small tolerance for overlap
-            test_rect = pygame.Rect(new_rect.x + tolerance, new_rect.y + tolerance,
-                                  max(1, new_rect.width - 2*tolerance), max(1, new_rect.height - 2*tolerance))
-            existing_test_rect = pygame.Rect(existing_rect.x + tolerance, existing_rect.y + tolerance,
-                                           max(1, existing_rect.width - 2*tolerance), max(1, existing_rect.height - 2*tolerance))
-            if test_rect.colliderect(existing_test_rect):
-                return True
-        return False
+        # Small tolerance so tiles that merely touch don't count as overlapping
+        return self.occupancy.overlaps(x, y, width, height, inset=2)
+
+    def _set_tile_size(self, width):
+        """Lay tiles out `width` wide (and twice as tall) from now on."""
+        self.tile_width = width
+        self.tile_height = 2 * width
+        self.placement_geometry = build_placement_geometry(
+            self.tile_width, self.tile_height, self.tile_spacing)
+        # Lane routes for each arm, out from the hub at the centre
+        self.layout = LayoutPlanner(self.play_area_rect, self.placement_geometry,
+                                    self.tile_width, self.tile_height, self.tile_spacing)
+        # Spatial index of placed tile rects; cells are one tile in size
+        self.occupancy = SpatialGrid(self.tile_width, self.tile_height)
+
+    def _place_hub(self):
+        """Put the hub tile at the centre of the play area and open the routes off it."""
+        tile = self.hub_tile
+        tile.update_size(self.tile_width, self.tile_height)
+        tile.set_rotation(0 if tile.is_double() else 90)
+        self._commit_placement(tile, self.center_x - tile.rect.width // 2,
+                               self.center_y - tile.rect.height // 2)
+        self.neighbors[id(tile)] = {}
+        self.layout.start(tile.is_double())
 
-    def _place_tile_in_direction(self, tile, direction, target_tile, connection_value):
+    def _place_on_route(self, tile, arm, target_tile, connection_value):
         """
-        Internal method to handle the logic of placing a tile in a specified direction.
-        Returns a tuple: (success, reason_string)
+        Put `tile` where the layout planner says the next tile on `arm` goes.
+        Returns the side of target_tile it went on, or None if the route has
+        run out of room at this tile size.
         """
-        # Set initial rotation and position
-        self._set_tile_rotation(tile, direction, connection_value)
-        new_x, new_y = self._calculate_initial_position(tile, target_tile, direction)
-        w, h = tile.rect.width, tile.rect.height
-
-        # Check if straight placement is within bounds and not a collision
-        if self.play_area_rect.collidepoint(new_x, new_y) and self.play_area_rect.collidepoint(new_x + w, new_y + h):
-            if not self._position_occupied(new_x, new_y, w, h):
-                tile.rect.x, tile.rect.y = new_x, new_y
-                self.tiles.append(tile)
-                print(f"[BOARD] Tile successfully placed at ({new_x}, {new_y}) in {direction} direction")
-                return True, "success"
-        
-        # --- Handle Boundary Conditions with Clamping ---
-        else:
-            clamped_x, clamped_y = self._clamp_to_play_area(new_x, new_y, w, h)
-            if not self._position_occupied(clamped_x, clamped_y, w, h):
-                tile.rect.x, tile.rect.y = clamped_x, clamped_y
-                self.tiles.append(tile)
-                print(f"[BOARD] Edge-clamped placement at ({clamped_x}, {clamped_y}) in {direction} direction")
-                return True, "success"
-            else:
-                # If clamping failed due to collision, proceed to corner turns
-                print("Straight placement (clamped) failed due to collision. Trying corner turn...")
-                
-        # --- Handle Corner Turns as Fallback ---
-        turn_found = False
-        for turn_direction in self._get_corner_turn_directions(target_tile, direction, tile):
-            # Recalculate and re-evaluate placement for the new direction
-            self._set_tile_rotation(tile, turn_direction, connection_value)
-            turned_x, turned_y = self._calculate_initial_position(tile, target_tile, turn_direction)
-            turned_w, turned_h = tile.rect.width, tile.rect.height
-
-            # Check if the turned tile is within bounds and not a collision
-            if self.play_area_rect.collidepoint(turned_x, turned_y) and self.play_area_rect.collidepoint(turned_x + turned_w, turned_y + turned_h):
-                if not self._position_occupied(turned_x, turned_y, turned_w, turned_h):
-                    tile.rect.x, tile.rect.y = turned_x, turned_y
-                    self.tiles.append(tile)
-                    print(f"[BOARD] Tile successfully placed via corner turn to {turn_direction}.")
-                    turn_found = True
-                    break
-            else:
-                # If the turned tile is also out of bounds, try to clamp it
-                clamped_turned_x, clamped_turned_y = self._clamp_to_play_area(turned_x, turned_y, turned_w, turned_h)
-                if not self._position_occupied(clamped_turned_x, clamped_turned_y, turned_w, turned_h):
-                    tile.rect.x, tile.rect.y = clamped_turned_x, clamped_turned_y
-                    self.tiles.append(tile)
-                    print(f"[BOARD] Tile successfully placed via clamped corner turn to {turn_direction}.")
-                    turn_found = True
-                    break
-
-        if turn_found:
-            return True, "success"
-        
-        # --- FINAL FALLBACK: Try all possible directions with aggressive clamping ---
-        print("[BOARD] Corner turns failed. Trying all directions with aggressive clamping...")
-        all_directions = ['left', 'right', 'top', 'bottom']
-        for fallback_dir in all_directions:
-            self._set_tile_rotation(tile, fallback_dir, connection_value)
-            fb_x, fb_y = self._calculate_initial_position(tile, target_tile, fallback_dir)
-            fb_w, fb_h = tile.rect.width, tile.rect.height
-            
-            clamped_fb_x, clamped_fb_y = self._clamp_to_play_area(fb_x, fb_y, fb_w, fb_h)
-            if not self._position_occupied(clamped_fb_x, clamped_fb_y, fb_w, fb_h):
-                tile.rect.x, tile.rect.y = clamped_fb_x, clamped_fb_y
-                self.tiles.append(tile)
-                print(f"[BOARD] Tile placed via aggressive fallback to {fallback_dir} at ({clamped_fb_x}, {clamped_fb_y})")
-                return True, "success"
-        
-        print("[BOARD] Tile placement failed: No valid position found even with aggressive fallback.")
-        return False, "boundary_or_collision_error"
+        layout = self.layout
+        cursor = layout.cursors[arm]
+        planned = layout.plan(cursor, tile.is_double(), connection_value == tile.value1, target_tile.rect)
+        if planned is None or self._position_occupied(*planned[1:5]):
+            return None
+        rotation, x, y, w, h, direction = planned
+        self._commit_placement(tile, x, y, rotation)
+        layout.advance(cursor, direction, (x, y, w, h))
+        return direction
 
-    def _set_tile_rotation(self, tile, direction, connection_value):
-        # Your existing _set_tile_rotation logic here...
-        if tile.is_double():
-            if direction in ['left', 'right']:
-                tile.set_rotation(0)
-            else:
-                tile.set_rotation(90)
-        else:
-            if direction == 'left':
-                tile.set_rotation(270 if connection_value == tile.value1 else 90)
-            elif direction == 'right':
-                tile.set_rotation(90 if connection_value == tile.value1 else 270)
-            elif direction == 'top':
-                tile.set_rotation(180 if connection_value == tile.value1 else 0)
-            elif direction == 'bottom':
-                tile.set_rotation(0 if connection_value == tile.value1 else 180)
-    
-    def _calculate_initial_position(self, tile, target_tile, direction):
+    def _pivot_on_spinner(self, spinner, arm):
         """
-        Calculates the initial position (x, y) for a new tile
-        based on the target tile and the play direction.
+        The first double joined the end of `arm` and takes over the hub:
+        `arm` carries on past it, and the rest of the line, back through the
+        opening tile, becomes the arm on its other side.
         """
-        if target_tile is None:
-            # First tile placed at the center of the board
-            return (self.center_x - tile.rect.width / 2,
-                    self.center_y - tile.rect.height / 2)
-
-        spacing = 2  # <<< keep a hairline gap so abutting tiles don't "collide"
-
-        if direction == 'left':
-            new_x = target_tile.rect.left - tile.rect.width - spacing
-            new_y = target_tile.rect.centery - tile.rect.height // 2
-        elif direction == 'right':
-            new_x = target_tile.rect.right + spacing
-            new_y = target_tile.rect.centery - tile.rect.height // 2
-        elif direction == 'top':
-            new_x = target_tile.rect.centerx - tile.rect.width // 2
-            new_y = target_tile.rect.top - tile.rect.height - spacing
-        elif direction == 'bottom':
-            new_x = target_tile.rect.centerx - tile.rect.width // 2
-            new_y = target_tile.rect.bottom + spacing
-        else:
-            return 0, 0
-
-        return new_x, new_y
-        
-    def _can_place_tile_directly(self, new_tile, direction, target_tile, connection_value):
+        other = self._opposite_dir(arm)
+        line = ([tile for tile, _ in reversed(self.arm_chains.get(arm, []))] + [self.hub_tile] +
+                [tile for tile, _ in self.arm_chains.get(other, [])])
+        chain, pip = [], spinner.value1
+        for tile in line:
+            chain.append((tile, pip))
+            pip = tile.value2 if tile.value1 == pip else tile.value1
+        self.hub_tile = spinner
+        self.arm_chains = {other: chain}
+
+    def _lay_out(self):
         """
-        Check if we can place the tile directly in the given direction without hitting boundaries.
-        This is more accurate than the previous space-based calculation.
+        Put every tile on the board down again at the current tile size: the
+        hub at the centre and each arm along its route.
         """
-        # Temporarily set up the tile for this placement to get accurate dimensions
-        original_rotation = getattr(new_tile, 'rotation', 0)
-        
-        # Determine rotation for this placement
-        if new_tile.is_double():
-            if direction in ['left', 'right']:
-                test_rotation = 0   # vertical for left/right branches
-            else:
-                test_rotation = 90  # horizontal for top/bottom branches
-        else:
-            if direction == 'left':
-                test_rotation = 270 if connection_value == new_tile.value1 else 90
-            elif direction == 'right':
-                test_rotation = 90  if connection_value == new_tile.value1 else 270
-            elif direction == 'top':
-                test_rotation = 180 if connection_value == new_tile.value1 else 0
-            elif direction == 'bottom':
-                test_rotation = 0   if connection_value == new_tile.value1 else 180
-            else:
-                return False
-        
-        # Temporarily apply rotation to get correct dimensions
-        new_tile.set_rotation(test_rotation)
-        
-        # Calculate position
-        target_rect = target_tile.rect
-        spacing = 2
-        
-        if direction == 'left':
-            new_x = target_rect.left - new_tile.rect.width - spacing
-            new_y = target_rect.centery - new_tile.rect.height // 2
-        elif direction == 'right':
-            new_x = target_rect.right + spacing
-            new_y = target_rect.centery - new_tile.rect.height // 2
-        elif direction == 'top':
-            new_x = target_rect.centerx - new_tile.rect.width // 2
-            new_y = target_rect.top - new_tile.rect.height - spacing
-        elif direction == 'bottom':
-            new_x = target_rect.centerx - new_tile.rect.width // 2
-            new_y = target_rect.bottom + spacing
-        else:
-            return False
-        
-        # Check if this position would be within bounds
-        can_place = not self.will_exceed_boundary(new_x, new_y, new_tile.rect.width, new_tile.rect.height)
-        
-        # Restore original rotation
-        new_tile.set_rotation(original_rotation)
-        
-        return can_place
-
-    def _remaining_space_pixels(self, target_tile, direction):
+        self.tiles = []
+        self.neighbors = {}
+        self.outward_pips = {}
+        self.occupancy.clear()
+        self._place_hub()
+        for arm, chain in self.arm_chains.items():
+            target = self.hub_tile
+            for tile, connection_value in chain:
+                tile.update_size(self.tile_width, self.tile_height)
+                direction = self._place_on_route(tile, arm, target, connection_value)
+                if direction is None:
+                    raise RuntimeError(f"[BOARD] The {arm} arm doesn't fit its route")
+                self._link_tiles(tile, target, direction, connection_value)
+                target = tile
+            self.arm_directions[arm] = direction
+        self._refresh_open_ends()
+
+    def _fit_layout(self):
         """
-        Calculates the remaining space in pixels on the board from the given target tile
-        in the specified direction.
+        Lay the board out again around the hub, first shrinking the tiles
+        until every arm fits its route. Sizes are tried on the routes alone,
+        so only the final one moves and rescales any tiles.
         """
-        if direction == 'left':
-            return target_tile.rect.left - self.play_area_rect.left
-        elif direction == 'right':
-            return self.play_area_rect.right - (target_tile.rect.left + target_tile.rect.width)
-        elif direction == 'top':
-            return target_tile.rect.top - self.play_area_rect.top
-        elif direction == 'bottom':
-            return self.play_area_rect.bottom - (target_tile.rect.top + target_tile.rect.height)
-        return 0
-        
-    def _has_room_for_at_least_n_tiles(self, target_tile, direction, n=1):
+        arms = {arm: [(tile.is_double(), connection_value == tile.value1) for tile, connection_value in chain]
+                for arm, chain in self.arm_chains.items()}
+        width = self.tile_width
+        while not LayoutPlanner(self.play_area_rect,
+                                build_placement_geometry(width, 2 * width, self.tile_spacing),
+                                width, 2 * width, self.tile_spacing).fits(self.hub_tile.is_double(), arms):
+            if width <= MIN_TILE_WIDTH:
+                raise RuntimeError(f"[BOARD] {self.tile_count} tiles don't fit the play area")
+            width -= 2
+        if width != self.tile_width:
+            self._set_tile_size(width)
+            print(f"[BOARD] An arm outgrew its route; tiles shrink to {self.tile_width}x{self.tile_height}")
+        self._lay_out()
+
+    def _commit_placement(self, tile, x, y, rotation=None):
+        """Pin a tile's rect at (x, y), turned to `rotation`, and add it to the drawn tiles."""
+        if rotation is not None:
+            tile.set_rotation(rotation)
+        tile.rect.x, tile.rect.y = x, y
+        self.tiles.append(tile)
+        self.occupancy.insert(x, y, tile.rect.width, tile.rect.height)
+
+    def _placement_for(self, tile, direction, connection_value, target_rect):
         """
-        Quick feasibility check: use the actual dimension needed in the placement direction.
-        Prevents premature corner turns when there's sufficient space to continue straight.
+        (rotation, x, y, w, h) for `tile` played on the `direction` side of
+        target_rect, from one geometry-table lookup. The tile is not touched.
         """
-        # pixels available from target_tile to the play-area border in this direction
-        runway = self._remaining_space_pixels(target_tile, direction)
-
-        # When extending left/right, placed tiles are horizontal (rotated),
-        # so the "width" they consume along the branch is tile_height.
-        # When extending top/bottom, they consume tile_height vertically as well.
-        if direction in ['left', 'right']:
-            needed_span = self.tile_height    # ~80px
-        else:  # 'top' or 'bottom'
-            needed_span = self.tile_height    # ~80px
-
-        need = n * needed_span
-        return runway >= need
-    
-    def _get_corner_turn_directions(self, target_tile, original_direction, next_tile):
+        return self._placement_rect(
+            (tile.value1 == tile.value2, direction, connection_value == tile.value1), target_rect)
+
+    def _placement_rect(self, key, target_rect):
+        entry = self.placement_geometry.get(key)
+        if entry is None:
+            return None
+        rotation, w, h, fx, ox, fy, oy = entry
+        return (rotation,
+                target_rect.x + target_rect.width * fx // 2 + ox,
+                target_rect.y + target_rect.height * fy // 2 + oy,
+                w, h)
+
+    def _link_tiles(self, tile, target_tile, direction, connection_value):
         """
-        Determines if a corner turn is required and returns the possible turn directions.
-        This function is crucial for preventing tiles from turning too soon.
+        Record in the domino graph that `tile` was attached on the `direction`
+        side of `target_tile`, joining on `connection_value`.
         """
-        
-        spacing = 2  # This can be changed to whatever spacing you prefer
-        
-        # Calculate the required space for the next tile based on its orientation
-        if original_direction in ['left', 'right']:
-            # Horizontal placement: next tile will be horizontal. Width is tile_height.
-            if next_tile.is_double():
-                needed_span = self.tile_height + spacing
-            else:
-                needed_span = self.tile_height + spacing
-        else: # original_direction is 'top' or 'bottom'
-            # Vertical placement: next tile will be vertical. Height is tile_height.
-            if next_tile.is_double():
-                needed_span = self.tile_height + spacing
-            else:
-                needed_span = self.tile_height + spacing
-
-        # Get the remaining space in the original direction
-        space_in_original_dir = self._remaining_space_pixels(target_tile, original_direction)
-
-        # Only return turn directions if there is not enough space for a straight placement
-        if space_in_original_dir < needed_span:
-            # Not enough runway, time to turn the corner.
-            if original_direction in ['left', 'right']:
-                return ['top', 'bottom']
-            else: # 'top' or 'bottom'
-                return ['left', 'right']
-        else:
-            # Enough runway, no corner turn is needed.
-            return []
-
-    def _clamp_to_play_area(self, x, y, w, h):
-        """Clamp a rect (x,y,w,h) to stay fully inside the play area."""
-        pa = self.play_area_rect
-        clamped_x = max(pa.left, min(x, pa.right - w))
-        clamped_y = max(pa.top,  min(y, pa.bottom - h))
-        return clamped_x, clamped_y
-
-    def _try_placement_in_direction_with_reason(self, new_tile, direction, target_tile, connection_value):
-        """Attempt to place a tile in the specified direction, with gentle edge-clamping."""
-        # --- orientation ---
-        if new_tile.is_double():
-            # Doubles: placed perpendicular to branch direction
-            if direction in ['left', 'right']:
-                new_tile.set_rotation(0)   # vertical for left/right branches
-            else:
-                new_tile.set_rotation(90)  # horizontal for top/bottom branches
-        else:
-            # Regular tiles must face the matching side toward the join
-            if direction == 'left':
-                new_tile.set_rotation(270 if connection_value == new_tile.value1 else 90)
-            elif direction == 'right':
-                new_tile.set_rotation(90  if connection_value == new_tile.value1 else 270)
-            elif direction == 'top':
-                new_tile.set_rotation(180 if connection_value == new_tile.value1 else 0)
-            elif direction == 'bottom':
-                new_tile.set_rotation(0   if connection_value == new_tile.value1 else 180)
-            else:
-                return False, "invalid_direction"
-
-        # --- initial position next to target ---
-        target_rect = target_tile.rect
-        spacing = 2
-        if direction == 'left':
-            new_x = target_rect.left - new_tile.rect.width - spacing
-            new_y = target_rect.centery - new_tile.rect.height // 2
-        elif direction == 'right':
-            new_x = target_rect.right + spacing
-            new_y = target_rect.centery - new_tile.rect.height // 2
-        elif direction == 'top':
-            new_x = target_rect.centerx - new_tile.rect.width // 2
-            new_y = target_rect.top - new_tile.rect.height - spacing
-        elif direction == 'bottom':
-            new_x = target_rect.centerx - new_tile.rect.width // 2
-            new_y = target_rect.bottom + spacing
+        self.neighbors[id(tile)] = {self._opposite_dir(direction): target_tile}
+        self.neighbors.setdefault(id(target_tile), {})[direction] = tile
+        if tile.is_double():
+            self.outward_pips[id(tile)] = tile.value1
         else:
-            return False, "invalid_direction"
+            self.outward_pips[id(tile)] = tile.value2 if tile.value1 == connection_value else tile.value1
 
-        w, h = new_tile.rect.width, new_tile.rect.height
-        
-        # DEBUG: Show exactly what's happening with boundary checking
-        print(f"[DEBUG BOUNDARY] Direction: {direction}")
-        print(f"[DEBUG BOUNDARY] Target tile at: ({target_rect.x}, {target_rect.y}, {target_rect.width}x{target_rect.height})")
-        print(f"[DEBUG BOUNDARY] New tile size: {w}x{h}")
-        print(f"[DEBUG BOUNDARY] Calculated position: ({new_x}, {new_y})")
-        print(f"[DEBUG BOUNDARY] Play area: ({self.play_area_rect.x}, {self.play_area_rect.y}, {self.play_area_rect.width}x{self.play_area_rect.height})")
-        
-        # Check each boundary condition separately
-        exceeds_left = new_x < self.play_area_rect.left
-        exceeds_top = new_y < self.play_area_rect.top
-        exceeds_right = new_x + w > self.play_area_rect.right
-        exceeds_bottom = new_y + h > self.play_area_rect.bottom
-        
-        print(f"[DEBUG BOUNDARY] Exceeds left: {exceeds_left} (new_x={new_x} < play_left={self.play_area_rect.left})")
-        print(f"[DEBUG BOUNDARY] Exceeds top: {exceeds_top} (new_y={new_y} < play_top={self.play_area_rect.top})")
-        print(f"[DEBUG BOUNDARY] Exceeds right: {exceeds_right} (new_x+w={new_x+w} > play_right={self.play_area_rect.right})")
-        print(f"[DEBUG BOUNDARY] Exceeds bottom: {exceeds_bottom} (new_y+h={new_y+h} > play_bottom={self.play_area_rect.bottom})")
-
-        # --- boundary & collision checks (with one-time edge clamp) ---
-        if self.will_exceed_boundary(new_x, new_y, w, h):
-            print(f"[DEBUG BOUNDARY] Boundary exceeded, trying edge clamp")
-            # Try clamping back inside the play area once before failing
-            clamped_x, clamped_y = self._clamp_to_play_area(new_x, new_y, w, h)
-            print(f"[DEBUG BOUNDARY] Clamped position: ({clamped_x}, {clamped_y})")
-            if (clamped_x, clamped_y) != (new_x, new_y):
-                if not self._position_occupied(clamped_x, clamped_y, w, h):
-                    new_tile.rect.x, new_tile.rect.y = clamped_x, clamped_y
-                    self.tiles.append(new_tile)
-                    print(f"[BOARD] Edge-clamped placement at ({clamped_x}, {clamped_y}) in {direction} direction")
-                    return True, "success"
-            print(f"[DEBUG BOUNDARY] Edge clamp failed, returning boundary error")
-            return False, "boundary"
-
-        if self._position_occupied(new_x, new_y, w, h):
-            return False, "collision"
-
-        # --- commit placement ---
-        new_tile.rect.x, new_tile.rect.y = new_x, new_y
-        self.tiles.append(new_tile)
-        print(f"[BOARD] Tile successfully placed at ({new_x}, {new_y}) in {direction} direction")
-        return True, "success"
+    def ranked_moves(self, available_tiles, scoring_enabled=True, moves=None):
+        """
+        Every legal move for the tiles in 'available_tiles' as
+        (tile, (direction, target_tile, end_value), score), best first: by
+        move score, then pip sum, then doubles; ties keep hand order. Scored
+        in one pass, so a caller can walk down the list if a placement fails.
+        Pass `moves` if moves_for_hand(available_tiles) is already to hand.
+        """
+        current_total = self.get_board_ends_total() or 0
+        print(f"[BOARD] AI evaluating moves. Current board total: {current_total}")
+
+        scored = []
+        signature = self.position.end_signature()
+        if moves is None:
+            moves = self.moves_for_hand(available_tiles)
+        for tile, direction, target_tile, end_value in moves:
+            projected_total, move_score = self._evaluate_move(
+                signature, tile, direction, target_tile, end_value,
+                current_total, scoring_enabled
+            )
+
+            print(f"[BOARD] Move: {tile.value1}|{tile.value2} {direction}, "
+                  f"projected total: {projected_total}, score: {move_score}")
+
+            tiebreak = (tile.value1 + tile.value2, 1 if tile.is_double() else 0)
+            scored.append(((move_score,) + tiebreak, tile, (direction, target_tile, end_value)))
+
+        scored.sort(key=lambda move: move[0], reverse=True)   # stable: ties stay in hand order
+        return [(tile, option, key[0]) for key, tile, option in scored]
 
     def get_best_strategic_move(self, available_tiles, scoring_enabled=True):
         """
@@ -410,210 +316,59 @@ class Board:
         Returns a placement option tuple: (direction, target_tile, end_value),
         or None if nothing is playable.
         """
-        current_total = self.get_board_ends_total() or 0
-        print(f"[BOARD] AI evaluating moves. Current board total: {current_total}")
-
-        best_option = None
-        best_tile_for_log = None
-        best_score = float("-inf")
-        best_tiebreak = (-1, -1)  # (pip_sum, is_double)
+        ranked = self.ranked_moves(available_tiles, scoring_enabled)
+        if not ranked:
+            print("[BOARD] No strategic move available")
+            return None
 
-        for tile in available_tiles:
-            options = self.get_valid_placement_options(tile, require_runway=False)
-            if not options:
-                continue
+        best_tile_for_log, best_option, best_score = ranked[0]
+        if scoring_enabled:
+            print(f"[BOARD] Best move selected: "
+                  f"{best_tile_for_log.value1}|{best_tile_for_log.value2} "
+                  f"{best_option[0]} for {best_score} points")
+        else:
+            print(f"[BOARD] Best move selected (race mode): "
+                  f"{best_tile_for_log.value1}|{best_tile_for_log.value2} "
+                  f"{best_option[0]} with heuristic score {best_score}")
+        return best_option
 
-            for option in options:
-                direction, target_tile, end_value = option
-                # Correct call: pass 4 args (tile, direction, target_tile, end_value)
-                projected_total = self._calculate_projected_total(tile, direction, target_tile, end_value)
-
-                move_score = self._score_move(
-                    projected_total,
-                    current_total,
-                    scoring_enabled=scoring_enabled
-                )
-
-                print(f"[BOARD] Move: {tile.value1}|{tile.value2} {direction}, "
-                      f"projected total: {projected_total}, score: {move_score}")
-
-                pip_sum = tile.value1 + tile.value2
-                is_double = 1 if tile.is_double() else 0
-                tiebreak = (pip_sum, is_double)
-
-                if (move_score > best_score) or (move_score == best_score and tiebreak > best_tiebreak):
-                    best_score = move_score
-                    best_tiebreak = tiebreak
-                    best_option = option
-                    best_tile_for_log = tile
-
-        if best_option is not None:
-            if scoring_enabled:
-                print(f"[BOARD] Best move selected: "
-                      f"{best_tile_for_log.value1}|{best_tile_for_log.value2} "
-                      f"{best_option[0]} for {best_score} points")
+    def _evaluate_move(self, signature, tile, direction, target_tile, end_value,
+                       current_total, scoring_enabled=True):
+        """(projected total, move score) for one option, from move_scores when seen before."""
+        arm = self._arm_for_option(direction, target_tile) if self.tile_count else None
+        key = (signature, arm, tile.value1, tile.value2, end_value, scoring_enabled)
+        entry = self.move_scores.get(key)
+        if entry is None:
+            if self.tile_count and arm is None:
+                projected_total = self.position.total
             else:
-                print(f"[BOARD] Best move selected (race mode): "
-                      f"{best_tile_for_log.value1}|{best_tile_for_log.value2} "
-                      f"{best_option[0]} with heuristic score {best_score}")
-        else:
-            print("[BOARD] No strategic move available")
+                projected_total = self.position.projected_total(arm, tile.value1, tile.value2, end_value)
+            entry = (projected_total, self._score_move(projected_total, current_total, scoring_enabled))
+            self.move_scores.put(key, entry)
+        return entry
 
-        return best_option
-        
     def _calculate_projected_total(self, tile, direction, target_tile, end_value):
         """
         Compute the board-ends total *after* hypothetically placing `tile`
         at (direction, target_tile, end_value) WITHOUT mutating board state.
         Matches the rules used by get_board_ends_total(), including spinner behavior.
         """
+        if self.tile_count == 0:
+            return self.position.projected_total(None, tile.value1, tile.value2, end_value)
 
-        # --- First tile case -------------------------------------------------------
-        if not self.tiles:
-            return tile.value1 * 2 if tile.is_double() else (tile.value1 + tile.value2)
-
-        # Helper to get the "other pip" or double contribution for the *new* end
-        def _new_end_contrib_for_tile(t, match_val):
-            if t.is_double():
-                return t.value1 * 2  # e.g., 5|5 contributes 10
-            # non-double: exposed end is the side that did NOT match
-            return t.value2 if t.value1 == match_val else t.value1
-
-        # Helper to get contribution for an existing end tile
-        def _contrib_of_existing_end_tile(end_tile):
-            if not end_tile:
-                return 0
-            if end_tile.is_double():
-                return end_tile.value1 * 2
-            v = self._get_regular_tile_end_value(end_tile)
-            return v if v is not None else 0
-
-        # --- Spinner present --------------------------------------------------------
-        if self.spinner_tile:
-            spinner = self.spinner_tile
-
-            has_left   = self._is_tile_connected_to_side(spinner, 'left')
-            has_right  = self._is_tile_connected_to_side(spinner, 'right')
-            has_top    = self._is_tile_connected_to_side(spinner, 'top')
-            has_bottom = self._is_tile_connected_to_side(spinner, 'bottom')
-
-            # Branch presence AFTER the hypothetical move
-            has_left_after   = has_left   or (target_tile is spinner and direction == 'left')
-            has_right_after  = has_right  or (target_tile is spinner and direction == 'right')
-            has_top_after    = has_top    or (target_tile is spinner and direction == 'top')
-            has_bottom_after = has_bottom or (target_tile is spinner and direction == 'bottom')
-
-            def _branch_contrib_after(dir_name):
-                """Contribution of a branch end AFTER this hypothetical placement."""
-                if target_tile is spinner and direction == dir_name:
-                    # The new end is the placed tile itself
-                    return _new_end_contrib_for_tile(tile, end_value)
-                # Otherwise, unchanged branch: use current end tile
-                end_tile = self._follow_branch_to_end_from_spinner(dir_name)
-                return _contrib_of_existing_end_tile(end_tile)
-
-            # Spinner contribution rule:
-            # If you use the "spinner stays double until both L&R exist" rule,
-            # keep counting the spinner until both left and right branches exist.
-            spinner_counts = (
-                getattr(self, "scoring_mode", "") == "spinner_stays_12"
-                and not (has_left_after and has_right_after)
-            )
-            total = (spinner.value1 * 2) if spinner_counts else 0
-
-            if has_left_after:
-                total += _branch_contrib_after('left')
-            if has_right_after:
-                total += _branch_contrib_after('right')
-            if has_top_after:
-                total += _branch_contrib_after('top')
-            if has_bottom_after:
-                total += _branch_contrib_after('bottom')
+        arm = self._arm_for_option(direction, target_tile)
+        if arm is None:
+            return self.position.total
+        return self.position.projected_total(arm, tile.value1, tile.value2, end_value)
 
-            return total
-
-        # --- No spinner: main line left/right only ---------------------------------
-        # Compute contributions for each end AFTER this move
-        left_end_tile  = self._find_leftmost_main_line_tile()
-        right_end_tile = self._find_rightmost_main_line_tile()
-
-        # Start with current ends
-        left_contrib  = _contrib_of_existing_end_tile(left_end_tile)
-        right_contrib = 0
-        if right_end_tile is not None:
-            # In a one-tile case, left_end_tile == right_end_tile; after placement
-            # there will be two distinct ends, but using existing right end value is fine.
-            if right_end_tile is not left_end_tile:
-                right_contrib = _contrib_of_existing_end_tile(right_end_tile)
-            else:
-                right_contrib = _contrib_of_existing_end_tile(right_end_tile)
-
-        # Replace the side we are extending with the contribution from the placed tile
-        if direction == 'left':
-            left_contrib = _new_end_contrib_for_tile(tile, end_value)
-        elif direction == 'right':
-            right_contrib = _new_end_contrib_for_tile(tile, end_value)
-        else:
-            # 'top'/'bottom' should not occur without a spinner; fall back to current total
-            return self.get_board_ends_total()
-
-        return (left_contrib + right_contrib)
-    
     def _score_move(self, projected_total, current_total, scoring_enabled=True):
-        if not scoring_enabled:
-            # neutralize the "by 5" bias; keep a tiny defensive nudge
-            score = 0
-            if projected_total < current_total:
-                score += 1
-            return score
-        # existing logic:
-        score = 0
-        if projected_total % 5 == 0 and projected_total > 0:
-            score += projected_total
-        remainder = projected_total % 5
-        if remainder in [1, 4]:
-            score += 2
-        if projected_total < current_total:
-            score += 1
-        return score
+        return score_move(projected_total, current_total, scoring_enabled)
 
     def _is_tile_connected_to_side(self, tile, direction):
-        tile_rect = tile.rect
-        buffer = 8
-        for other_tile in self.tiles:
-            if other_tile is tile:
-                continue
-            other_rect = other_tile.rect
-            if direction == 'top':
-                if abs(other_rect.bottom - tile_rect.top) < buffer and abs(other_rect.centerx - tile_rect.centerx) < buffer:
-                    return True
-            elif direction == 'bottom':
-                if abs(other_rect.top - tile_rect.bottom) < buffer and abs(other_rect.centerx - tile_rect.centerx) < buffer:
-                    return True
-            elif direction == 'left':
-                if abs(other_rect.right - tile_rect.left) < buffer and abs(other_rect.centery - tile_rect.centery) < buffer:
-                    return True
-            elif direction == 'right':
-                if abs(other_rect.left - tile_rect.right) < buffer and abs(other_rect.centery - tile_rect.centery) < buffer:
-                    return True
-        return False
+        return direction in self.neighbors.get(id(tile), ())
 
     def _neighbor_on(self, tile, direction):
-        tile_rect = tile.rect
-        buffer = 8
-        for other_tile in self.tiles:
-            if other_tile is tile:
-                continue
-            other_rect = other_tile.rect
-            if direction == 'top' and abs(other_rect.bottom - tile_rect.top) < buffer and abs(other_rect.centerx - tile_rect.centerx) < buffer:
-                return other_tile
-            if direction == 'bottom' and abs(other_rect.top - tile_rect.bottom) < buffer and abs(other_rect.centerx - tile_rect.centerx) < buffer:
-                return other_tile
-            if direction == 'left' and abs(other_rect.right - tile_rect.left) < buffer and abs(other_rect.centery - tile_rect.centery) < buffer:
-                return other_tile
-            if direction == 'right' and abs(other_rect.left - tile_rect.right) < buffer and abs(other_rect.centery - tile_rect.centery) < buffer:
-                return other_tile
-        return None
+        return self.neighbors.get(id(tile), {}).get(direction)
 
     def _follow_branch_to_end(self, start_tile, came_from_tile):
         """Follow a branch from start_tile to its end, avoiding came_from_tile."""
@@ -622,35 +377,22 @@ class Board:
             
         current = start_tile
         prev = came_from_tile
-        buffer = 8
         
         while True:
-            # Find all tiles connected to current tile
-            connected = []
-            current_rect = current.rect
-            
-            for tile in self.tiles:
-                if tile is current or tile is prev:
-                    continue
-                    
-                tile_rect = tile.rect
-                
-                # Check if tiles are adjacent (connected)
-                if ((abs(tile_rect.left - current_rect.right) < buffer and abs(tile_rect.centery - current_rect.centery) < buffer) or
-                    (abs(tile_rect.right - current_rect.left) < buffer and abs(tile_rect.centery - current_rect.centery) < buffer) or
-                    (abs(tile_rect.top - current_rect.bottom) < buffer and abs(tile_rect.centerx - current_rect.centerx) < buffer) or
-                    (abs(tile_rect.bottom - current_rect.top) < buffer and abs(tile_rect.centerx - current_rect.centerx) < buffer)):
-                    connected.append(tile)
-            
+            # Step to the neighbour that isn't where we came from; the graph is
+            # a tree, so past the spinner each tile has at most one such link.
+            next_tile = None
+            for tile in self.neighbors.get(id(current), {}).values():
+                if tile is not prev:
+                    next_tile = tile
+                    break
+
             # If no more connections, we've reached the end
-            if not connected:
+            if next_tile is None:
                 return current
                 
-            # Move to the next tile in the chain
             prev = current
-            current = connected[0]  # Take first connected tile (should only be one in a proper domino chain)
-        
-        return current
+            current = next_tile
     
     def _follow_branch_to_end_from_spinner(self, direction):
         """Follow a branch from the spinner in the given direction to its end."""
@@ -667,27 +409,21 @@ class Board:
 
     def play(self, tile, placement_option=None):
         """Play a tile on the board."""
-        print(f"[BOARD] Playing tile {self.tile_count + 1}/28: ({tile.value1}, {tile.value2})")
+        print(f"[BOARD] Playing tile {self.tile_count + 1}/{self.max_tiles}: ({tile.value1}, {tile.value2})")
         tile.update_size(self.tile_width, self.tile_height)
         
         if not self.tiles or (placement_option and placement_option[0] == 'center'):
             if tile.is_double():
                 self.spinner_tile = tile
-                tile.set_rotation(0)
                 print(f"[BOARD] Spinner set: ({tile.value1}, {tile.value2})")
-            else:
-                tile.set_rotation(90)
-            tile.set_position(self.center_x - tile.rect.width // 2,
-                              self.center_y - tile.rect.height // 2)
-            self.tiles.append(tile)
+            self.hub_tile = tile
+            self.arm_chains = {}
+            self._place_hub()
+            self._index_placement(tile, None, None, None)
             self.tile_count += 1
             print(f"[BOARD] First tile placed")
             return True
 
-        if tile.is_double() and self.spinner_tile is None:
-            self.spinner_tile = tile
-            print(f"[BOARD] First double played, setting as spinner: ({tile.value1}, {tile.value2})")
-
         if not placement_option:
             print("[BOARD] ERROR: No placement option provided")
             return False
@@ -697,55 +433,138 @@ class Board:
             print(f"[BOARD] ERROR: Tile cannot connect to value {connection_value}")
             return False
 
-        # FIXED: Properly handle the return value from _place_tile_in_direction
-        success, reason = self._place_tile_in_direction(tile, direction, target_tile, connection_value)
-        if success:
-            self.tile_count += 1
-            print(f"[BOARD] Tile count now: {self.tile_count}/28")
-            return True
-        else:
-            print(f"[BOARD] Tile placement failed: {reason}")
+        arm = self._arm_for_option(direction, target_tile)
+        if arm is None:
+            print(f"[BOARD] ERROR: {direction} of that tile is not an open end")
             return False
-        
+
+        if tile.is_double() and self.spinner_tile is None:
+            self.spinner_tile = tile
+            print(f"[BOARD] First double played, setting as spinner: ({tile.value1}, {tile.value2})")
+            self._pivot_on_spinner(tile, arm)
+            placed_direction = None
+        else:
+            self.arm_chains.setdefault(arm, []).append((tile, connection_value))
+            placed_direction = self._place_on_route(tile, arm, target_tile, connection_value)
+            if placed_direction:
+                self._link_tiles(tile, target_tile, placed_direction, connection_value)
+                print(f"[BOARD] Tile placed on the {arm} route at {tile.rect.topleft} going {placed_direction}")
+        self._index_placement(tile, arm, placed_direction, connection_value)
+        self.tile_count += 1
+        if placed_direction is None:
+            # A new hub, or an arm past the end of its route: lay everything out again
+            self._fit_layout()
+            print(f"[BOARD] Board laid out again around ({self.hub_tile.value1}, {self.hub_tile.value2})")
+        print(f"[BOARD] Tile count now: {self.tile_count}/{self.max_tiles}")
+        return True
+
+
+    def apply(self, move):
+        """
+        Play move = (tile, placement_option) on the logical board only: ends,
+        total, spinner and tile count change, but nothing is laid out or drawn.
+        Every successful apply() must be paired with an undo().
+        Returns False (and changes nothing) if the option isn't an open end.
+        """
+        tile, option = move
+        if self.tile_count == 0:
+            arm, direction, connection_value = None, None, None
+        else:
+            direction, target_tile, connection_value = option
+            arm = self._arm_for_option(direction, target_tile)
+            if arm is None or connection_value not in (tile.value1, tile.value2):
+                return False
+
+        self._undo_stack.append((
+            self.tile_count, self.spinner_tile,
+            dict(self.arm_tiles), dict(self.arm_directions),
+            self._open_ends, self._open_end_arms, self.position.snapshot(),
+        ))
+        if tile.is_double() and self.spinner_tile is None:
+            self.spinner_tile = tile
+        self._index_placement(tile, arm, direction, connection_value)
+        self.tile_count += 1
+        return True
+
+    def undo(self):
+        """Take back the last apply()."""
+        (self.tile_count, self.spinner_tile,
+         self.arm_tiles, self.arm_directions,
+         self._open_ends, self._open_end_arms, position_state) = self._undo_stack.pop()
+        self.position.restore(position_state)
+
+    def _index_placement(self, tile, arm, placed_direction, connection_value):
+        """Update the open-ends index after `tile` went down on `arm`."""
+        position = self.position
+        if position.tile_count == 0:
+            if tile.is_double():
+                self.arm_tiles = {}
+                self.arm_directions = {}
+            else:
+                # Opening tile lies horizontally: value1 on the left, value2 on the right
+                self.arm_tiles = {'left': tile, 'right': tile}
+                self.arm_directions = {'left': 'left', 'right': 'right'}
+        elif tile.is_double() and position.spinner is None:
+            # New spinner: its far side continues the line's direction of
+            # travel, the near side holds the rest of the line. Each arm
+            # leaves the spinner from the side it is named after.
+            other = self._opposite_dir(arm)
+            self.arm_tiles = {other: self.arm_tiles[other]}
+            self.arm_directions = {other: self.arm_directions[other]}
+        else:
+            self.arm_tiles[arm] = tile
+            self.arm_directions[arm] = placed_direction
+
+        position.place(arm, tile.value1, tile.value2, connection_value)
+        self._refresh_open_ends()
+
+    def _refresh_open_ends(self):
+        """Rebuild the (direction, target_tile, value) view of the logical ends."""
+        ends, arms = [], []
+        for arm, value in self.position.open_ends():
+            if arm == 'center':
+                ends.append(('center', None, None))
+            elif arm in self.arm_tiles:
+                ends.append((self.arm_directions[arm], self.arm_tiles[arm], value))
+            else:
+                ends.append((arm, self.spinner_tile, value))
+            arms.append(arm)
+        self._open_ends = tuple(ends)
+        self._open_end_arms = tuple(arms)
+
+    def _arm_for_option(self, direction, target_tile):
+        """Logical arm a (direction, target_tile) placement option extends, or None."""
+        arms_on_tile = []
+        for (end_direction, end_tile, _), arm in zip(self._open_ends, self._open_end_arms):
+            if end_tile is target_tile:
+                if end_direction == direction:
+                    return arm
+                arms_on_tile.append(arm)
+        # A runway-adjusted option may report a turned direction for a branch end
+        return arms_on_tile[0] if len(arms_on_tile) == 1 else None
+
     def _find_leftmost_main_line_tile(self):
         """Find the leftmost tile that can have a left-extending play."""
-        if not self.tiles:
-            return None
-        
-        # Find tiles that are part of the horizontal main line (connected left/right)
-        main_line_tiles = []
-        for tile in self.tiles:
-            if (self._is_tile_connected_to_side(tile, 'left') or
-                self._is_tile_connected_to_side(tile, 'right')):
-                main_line_tiles.append(tile)
-        
-        if not main_line_tiles:
-            # No main line yet, return the first tile
-            return self.tiles[0] if self.tiles else None
-        
-        # Return the leftmost tile from the main line
-        leftmost = min(main_line_tiles, key=lambda t: t.rect.x)
-        return leftmost
+        return self._main_line_end('left')
 
     def _find_rightmost_main_line_tile(self):
         """Find the rightmost tile that can have a right-extending play."""
+        return self._main_line_end('right')
+
+    def _main_line_end(self, side):
+        """
+        End tile of the main line on `side` of the opening tile, following the
+        graph (so corner turns are followed). The opening tile itself is the
+        end while nothing has been played on that side yet.
+        """
         if not self.tiles:
             return None
-        
-        # Find tiles that are part of the horizontal main line (connected left/right)
-        main_line_tiles = []
-        for tile in self.tiles:
-            if (self._is_tile_connected_to_side(tile, 'left') or
-                self._is_tile_connected_to_side(tile, 'right')):
-                main_line_tiles.append(tile)
-        
-        if not main_line_tiles:
-            # No main line yet, return the first tile
-            return self.tiles[0] if self.tiles else None
-        
-        # Return the rightmost tile from the main line
-        rightmost = max(main_line_tiles, key=lambda t: t.rect.x)
-        return rightmost
+
+        root = self.tiles[0]
+        first = self._neighbor_on(root, side)
+        if first is None:
+            return root
+        return self._follow_branch_to_end(first, root)
 
     def left_end_value(self):
         left_tile = self._find_leftmost_main_line_tile()
@@ -764,6 +583,10 @@ class Board:
         if tile.is_double():
             return tile.value1
 
+        # Attached tiles know which pip faces out
+        if id(tile) in self.outward_pips:
+            return self.outward_pips[id(tile)]
+
         # For regular tiles, find the unconnected side and return its value
         connected_sides = []
         for direction in ['top', 'bottom', 'left', 'right']:
@@ -813,32 +636,17 @@ class Board:
         
         return None
 
-    def _can_branch_in_direction(self, tile, direction):
-        """Check if a tile can have a new branch in the given direction."""
-        # If already connected in this direction, it's not available
-        if self._is_tile_connected_to_side(tile, direction):
-            return False
-        
-        # Special spinner rules
-        if tile == self.spinner_tile:
-            has_left = self._is_tile_connected_to_side(tile, 'left')
-            has_right = self._is_tile_connected_to_side(tile, 'right')
-            
-            # Always allow left/right if not occupied
-            if direction in ['left', 'right']:
-                return True
-                
-            # Only allow top/bottom after both left and right are established
-            if direction in ['top', 'bottom']:
-                return has_left and has_right
-        
-        # For non-spinner tiles: they can connect on any open side
-        return True
-
-    # Replace the get_board_ends_total method in board.py:
-
     def get_board_ends_total(self):
-        """Return the sum of exposed ends for scoring."""
+        """Return the sum of exposed ends for scoring (kept up to date by play())."""
+        total = self.position.total
+        if self.debug_open_ends and not self._undo_stack:
+            expected = self._recompute_board_ends_total()
+            if total != expected:
+                print(f"[BOARD] WARNING: running ends total {total} != recompute {expected}")
+        return total
+
+    def _recompute_board_ends_total(self):
+        """Walk the layout to total the exposed ends; used to cross-check the running total."""
         if not self.tiles:
             return 0
 
@@ -855,8 +663,8 @@ class Board:
             has_top    = self._is_tile_connected_to_side(spinner, 'top')
             has_bottom = self._is_tile_connected_to_side(spinner, 'bottom')
 
-            def branch_end_value(direction):
-                end_tile = self._follow_branch_to_end_from_spinner(direction)
+            def branch_end_value(arm):
+                end_tile = self._follow_branch_to_end_from_spinner(arm)
                 if not end_tile:
                     return 0
                 if end_tile.is_double():
@@ -911,12 +719,52 @@ class Board:
     
     def get_playable_ends(self, require_runway: bool = True):
         """
-        Return a list of (direction, target_tile, exposed_value) that are currently playable.
+        Return a tuple of (direction, target_tile, exposed_value) that are currently playable.
         `direction` is the direction you would extend FROM the returned `target_tile`.
         If a branch has turned a corner, we report the *actual* open direction at its end.
+        Served from the open-ends index that play() maintains.
         """
+        ends = self._open_ends
+        if self._undo_stack:
+            # Tiles from apply() have no layout, so there is no runway to check
+            return ends
+        if require_runway and self.tile_count > 1:
+            ends = self._apply_runway(ends)
+
+        if self.debug_open_ends:
+            expected = self._recompute_playable_ends(require_runway)
+            if list(ends) != list(expected):
+                print(f"[BOARD] WARNING: open-ends index {ends} != recompute {expected}")
+        return ends
+
+    def _apply_runway(self, ends):
+        """
+        Report the direction each branch end will actually grow in: the next
+        step of its lane route (unchanged if the route is full, since the
+        next tile lays the board out again with smaller tiles).
+        """
+        adjusted = []
+        for (direction, target_tile, value), arm in zip(ends, self._open_end_arms):
+            if target_tile is not self.spinner_tile:
+                direction = self._route_direction(arm, target_tile) or direction
+            adjusted.append((direction, target_tile, value))
+        return tuple(adjusted)
+
+    def _route_direction(self, arm, end_tile):
+        """Where the lane route of `arm` goes next from end_tile, or None if it is full."""
+        return self.layout.peek_direction(self.layout.cursors[arm], end_tile.rect)
+
+    def _routed_arm(self, end_tile):
+        """The arm whose open end is end_tile."""
+        for arm, tip in self.arm_tiles.items():
+            if tip is end_tile:
+                return arm
+        return None
+
+    def _recompute_playable_ends(self, require_runway=True):
+        """Derive the playable ends by walking the domino graph (debug cross-check)."""
         ends = []
-        if not self.tiles:
+        if self.tile_count == 0:
             return [('center', None, None)]
 
         spinner = self.spinner_tile
@@ -925,189 +773,49 @@ class Board:
             left_end  = self._find_leftmost_main_line_tile()
             right_end = self._find_rightmost_main_line_tile()
 
-            if left_end:
-                open_dir = self._find_actual_open_direction(left_end, require_runway=require_runway)
-                if open_dir:
+            if left_end is right_end:
+                # A lone opening tile is open on both of its ends
+                for open_dir in ('left', 'right'):
                     v = self._get_tile_connection_value_for_direction(left_end, open_dir)
                     if v is not None:
                         ends.append((open_dir, left_end, v))
+                return ends
 
-            if right_end and right_end != left_end:  # Avoid duplicate if they're the same tile
-                open_dir = self._find_actual_open_direction(right_end, require_runway=require_runway)
-                if open_dir:
-                    v = self._get_tile_connection_value_for_direction(right_end, open_dir)
-                    if v is not None:
-                        ends.append((open_dir, right_end, v))
+            for end_tile in (left_end, right_end):
+                end = self._recompute_end(end_tile, require_runway)
+                if end:
+                    ends.append(end)
             
             return ends
 
-        # Spinner present
-        has_left   = self._is_tile_connected_to_side(spinner, 'left')
-        has_right  = self._is_tile_connected_to_side(spinner, 'right')
-        has_top    = self._is_tile_connected_to_side(spinner, 'top')
-        has_bottom = self._is_tile_connected_to_side(spinner, 'bottom')
-
-        # LEFT branch (new or existing)
-        if not has_left and self._can_branch_in_direction(spinner, 'left'):
-            v = self._get_tile_connection_value_for_direction(spinner, 'left')
-            if v is not None:
-                ends.append(('left', spinner, v))
-        elif has_left:
-            end_tile = self._follow_branch_to_end_from_spinner('left')
-            if end_tile:
-                open_dir = self._find_actual_open_direction(end_tile, require_runway=require_runway)
-                if open_dir:
-                    v = self._get_tile_connection_value_for_direction(end_tile, open_dir)
-                    if v is not None:
-                        ends.append((open_dir, end_tile, v))
-
-        # RIGHT branch
-        if not has_right and self._can_branch_in_direction(spinner, 'right'):
-            v = self._get_tile_connection_value_for_direction(spinner, 'right')
-            if v is not None:
-                ends.append(('right', spinner, v))
-        elif has_right:
-            end_tile = self._follow_branch_to_end_from_spinner('right')
-            if end_tile:
-                open_dir = self._find_actual_open_direction(end_tile, require_runway=require_runway)
-                if open_dir:
-                    v = self._get_tile_connection_value_for_direction(end_tile, open_dir)
-                    if v is not None:
-                        ends.append((open_dir, end_tile, v))
+        # Spinner present: walk each arm on the screen side it grows from
+        has_arm = {arm: self._is_tile_connected_to_side(spinner, arm) for arm in SIDES}
+        arms = SIDES if (has_arm['left'] and has_arm['right']) else SIDES[:2]
 
-        # TOP and BOTTOM are offered once left & right exist
-        if has_left and has_right:
-            # TOP branch
-            if not has_top and self._can_branch_in_direction(spinner, 'top'):
-                v = self._get_tile_connection_value_for_direction(spinner, 'top')
-                if v is not None:
-                    ends.append(('top', spinner, v))
-            elif has_top:
-                end_tile = self._follow_branch_to_end_from_spinner('top')
-                if end_tile:
-                    open_dir = self._find_actual_open_direction(end_tile, require_runway=require_runway)
-                    if open_dir:
-                        v = self._get_tile_connection_value_for_direction(end_tile, open_dir)
-                        if v is not None:
-                            ends.append((open_dir, end_tile, v))
-
-            # BOTTOM branch
-            if not has_bottom and self._can_branch_in_direction(spinner, 'bottom'):
-                v = self._get_tile_connection_value_for_direction(spinner, 'bottom')
-                if v is not None:
-                    ends.append(('bottom', spinner, v))
-            elif has_bottom:
-                end_tile = self._follow_branch_to_end_from_spinner('bottom')
-                if end_tile:
-                    open_dir = self._find_actual_open_direction(end_tile, require_runway=require_runway)
-                    if open_dir:
-                        v = self._get_tile_connection_value_for_direction(end_tile, open_dir)
-                        if v is not None:
-                            ends.append((open_dir, end_tile, v))
-
-        # De-dupe
-        seen, deduped = set(), []
-        for item in ends:
-            if item not in seen:
-                deduped.append(item)
-                seen.add(item)
-        
-        return deduped
+        for arm in arms:
+            if not has_arm[arm]:
+                ends.append((arm, spinner, spinner.value1))
+                continue
+            end_tile = self._follow_branch_to_end(self._neighbor_on(spinner, arm), spinner)
+            end = self._recompute_end(end_tile, require_runway)
+            if end:
+                ends.append(end)
+
+        return ends
+
+    def _recompute_end(self, end_tile, require_runway):
+        """(direction, end_tile, value) for a branch end found by walking the graph, or None."""
+        arm = self._routed_arm(end_tile)
+        if arm is None:
+            return None
+        open_dir = self.arm_directions[arm]
+        if require_runway:
+            open_dir = self._route_direction(arm, end_tile) or open_dir
+        return (open_dir, end_tile, self._get_regular_tile_end_value(end_tile))
 
-    def _can_place_tile_directly_check(self, target_tile, new_tile, direction, is_double_placement=False):
-        """
-        Checks if a new tile can be placed directly adjacent to a target tile
-        in the specified direction without going out of bounds.
-        """
-        
-        spacing = 2  # Spacing between tiles
-        
-        # Calculate the size of the new tile based on direction and if it's a double
-        if new_tile.is_double() or is_double_placement:
-            # Double tiles are always square (40x40 in the original log, but let's assume 80x80 here)
-            # The log says a double is 40x80, but that seems to be a non-double tile.
-            # We'll use the consistent 80x40/40x80 for non-doubles and 80x80 for doubles.
-            needed_width = self.tile_height + spacing if direction in ['left', 'right'] else self.tile_width
-            needed_height = self.tile_height + spacing if direction in ['top', 'bottom'] else self.tile_width
-        elif direction in ['left', 'right']:
-            # Normal tile placed horizontally
-            needed_width = self.tile_height + spacing
-            needed_height = self.tile_width
-        else:
-            # Normal tile placed vertically
-            needed_width = self.tile_width
-            needed_height = self.tile_height + spacing
-
-        # Calculate the new tile's position based on the target tile and direction
-        if direction == 'left':
-            new_x = target_tile.rect.x - needed_width
-            new_y = target_tile.rect.y
-        elif direction == 'right':
-            new_x = target_tile.rect.x + target_tile.rect.width + spacing
-            new_y = target_tile.rect.y
-        elif direction == 'top':
-            new_x = target_tile.rect.x
-            new_y = target_tile.rect.y - needed_height
-        elif direction == 'bottom':
-            new_x = target_tile.rect.x
-            new_y = target_tile.rect.y + target_tile.rect.height + spacing
-        
-        # Check if the new position is within the play area
-        is_within_bounds = (
-            self.play_area_rect.left <= new_x and
-            new_x + needed_width <= self.play_area_rect.right and
-            self.play_area_rect.top <= new_y and
-            new_y + needed_height <= self.play_area_rect.bottom
-        )
-        
-        # Log the boundary check for debugging
-        print(f"[DEBUG BOUNDARY] Check for tile {new_tile.value1}|{new_tile.value2} at calculated position ({new_x}, {new_y}) with size {needed_width}x{needed_height}")
-        print(f"[DEBUG BOUNDARY] Is within bounds: {is_within_bounds}")
-        
-        return is_within_bounds
-        
     def _opposite_dir(self, d):
         return {'left':'right','right':'left','top':'bottom','bottom':'top'}.get(d, None)
 
-    def _find_actual_open_direction(self, tile, require_runway=True):
-        """Prefer continuing the current chain; only turn if out of runway."""
-        connected = [d for d in ['top','bottom','left','right']
-                     if self._is_tile_connected_to_side(tile, d)]
-
-        # Prefer horizontal continuation if the tile is in a horizontal chain
-        if 'left' in connected or 'right' in connected:
-            primary = 'left' if 'left' not in connected else ('right' if 'right' not in connected else None)
-            if primary:
-                if not require_runway or self._has_room_for_at_least_n_tiles(tile, primary, n=1):
-                    return primary
-                # out of runway: pick the vertical side with more space
-                up = self._remaining_space_pixels(tile, 'top')
-                down = self._remaining_space_pixels(tile, 'bottom')
-                return 'top' if up >= down else 'bottom'
-
-        # Prefer vertical continuation if the tile is in a vertical chain
-        if 'top' in connected or 'bottom' in connected:
-            primary = 'top' if 'top' not in connected else ('bottom' if 'bottom' not in connected else None)
-            if primary:
-                if not require_runway or self._has_room_for_at_least_n_tiles(tile, primary, n=1):
-                    return primary
-                # out of runway: pick the horizontal side with more space
-                left = self._remaining_space_pixels(tile, 'left')
-                right = self._remaining_space_pixels(tile, 'right')
-                return 'left' if left >= right else 'right'
-
-        # Isolated/ambiguous: pick the side with the most space
-        candidates = ['left','right','top','bottom']
-        return max(candidates, key=lambda d: self._remaining_space_pixels(tile, d))
-        
-    def _follow_chain_to_end(self, direction):
-        """Follow the main chain to its end in the given direction."""
-        if direction == 'left':
-            return self._find_leftmost_main_line_tile()
-        elif direction == 'right':
-            return self._find_rightmost_main_line_tile()
-        return None
-    
     def can_play_tile(self, tile):
         if not self.tiles:
             return True
@@ -1116,52 +824,43 @@ class Board:
                 return True
         return False
 
-    def _calculate_board_total(self):
-        """Calculates the sum of the values of the exposed ends of the domino branches."""
-        total = 0
-        for _, _, value in self.exposed_branch_ends:
-            total += value
-        return total
-
-    def _check_collision_with_border(self, target_tile, direction, tile_to_check):
+    def moves_for_hand(self, hand, require_runway=False):
         """
-        Checks if placing a tile in a given direction would cause it to
-        go outside the play area's horizontal or vertical bounds.
-        Returns True if a collision would occur, False otherwise.
+        Every legal (tile, direction, target_tile, end_value) for the tiles in
+        `hand`, in hand order and then open-end order. The open ends are read
+        once and joined against a pip -> hand positions index, so a whole hand
+        costs about what a single tile used to.
         """
-        tile_to_check_copy = tile_to_check.copy()
-        self._set_tile_rotation(tile_to_check_copy, direction, target_tile.value1 if direction in ['top', 'bottom'] else target_tile.value2)
-        new_x, new_y = self._calculate_initial_position(tile_to_check_copy, target_tile, direction)
-        
-        if new_x < self.play_area_rect.left or \
-           new_x + tile_to_check_copy.rect.width > self.play_area_rect.right or \
-           new_y < self.play_area_rect.top or \
-           new_y + tile_to_check_copy.rect.height > self.play_area_rect.bottom:
-            return True
-        return False
+        if not self.tiles:
+            return [(tile, 'center', None, None) for tile in hand]
+
+        by_pip = {}
+        for position, tile in enumerate(hand):
+            by_pip.setdefault(tile.value1, []).append(position)
+            if tile.value2 != tile.value1:
+                by_pip.setdefault(tile.value2, []).append(position)
+
+        found = []
+        ends = self.get_playable_ends(require_runway=require_runway)
+        for end_position, (direction, target_tile, end_value) in enumerate(ends):
+            for position in by_pip.get(end_value, ()):
+                found.append((position, end_position, direction, target_tile, end_value))
+        found.sort(key=lambda move: move[:2])
+        return [(hand[position], direction, target_tile, end_value)
+                for position, _, direction, target_tile, end_value in found]
 
     def get_valid_placement_options(self, tile_to_check, require_runway=False):
         """
         Generates a list of all valid placement options for a given tile.
         This version uses the same logic as get_playable_ends.
         """
-        if not self.tiles:
-            return [('center', None, None)]
-
-        options = []
-        playable_ends = self.get_playable_ends(require_runway=require_runway)
-        
-        for direction, target_tile, end_value in playable_ends:
-            # Check if this tile can connect to this end
-            if end_value is not None and (end_value == tile_to_check.value1 or end_value == tile_to_check.value2):
-                options.append((direction, target_tile, end_value))
-        
+        options = [move[1:] for move in self.moves_for_hand((tile_to_check,), require_runway)]
         print(f"[DEBUG] get_valid_placement_options for {tile_to_check.value1}|{tile_to_check.value2}: found {len(options)} options")
         return options
     
     def get_valid_placement_options_with_scoring(self, tile_to_check, require_runway: bool = True):
         """Same as above, with scoring metadata."""
-        if not self.tiles:
+        if self.tile_count == 0:
             return [('center', None, None, {'scores': False, 'points': 0})]
 
         options = []
@@ -1185,6 +884,19 @@ class Board:
 
     def reset_board(self):
         self.tiles = []
+        self.neighbors = {}
+        self.outward_pips = {}
+        if self.tile_width != self.full_tile_width:
+            self._set_tile_size(self.full_tile_width)
+        self.occupancy.clear()
+        self.layout.reset()
+        self.hub_tile = None
+        self.arm_chains = {}
+        self._undo_stack = []
+        self.position.reset()
+        self.arm_tiles = {}
+        self.arm_directions = {}
+        self._refresh_open_ends()
         self.tile_count = 0
         self.exposed_branch_ends = []
         self.left_end_direction = 'horizontal'
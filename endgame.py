@@ -0,0 +1,235 @@
+# endgame.py — exact alpha-beta search for the end of a hand
+#
+# Once the boneyard is empty the only hidden information is how the unseen
+# tiles are split between the other hands. With two players there is only
+# one split, so the search is exact; with more, every consistent split is
+# solved (or a fixed sample of them when there are too many) and the move
+# with the best average wins. Opponents are assumed to play against us
+# ("paranoid" search), which for two players is plain minimax.
+import itertools
+import math
+import random
+import time
+
+from bitboard import TILE_PIPS, full_mask, indices, pip_total
+from engine import blocked_winner, hand_bonus, legal_moves
+from montecarlo import deal_unseen
+from position import BoardPosition
+from transposition import TranspositionTable
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    """The solver's time budget ran out mid-search."""
+
+
+class EndgameSolver:
+    """
+    Alpha-beta over (BoardPosition, hand masks, seat to move) with a
+    transposition table keyed on the position's Zobrist hash; pass the
+    game's TranspositionTable to keep what was learned across turns. Values are
+    what the rest of the hand is worth to the player choosing the move:
+    their points minus the others' average in classic mode, 1/0 for
+    winning the hand in race mode. Takes the same `spec`/candidates as
+    MonteCarloAI.
+
+    With a `time_budget` (seconds), choose() gives up and returns None once
+    it runs out; callers fall back to a cheaper move.
+
+    After each choose(): last_nodes, last_time (seconds) and last_deals.
+    """
+
+    def __init__(self, max_tiles=10, max_deals=16, table=None, time_budget=None):
+        self.max_tiles = max_tiles      # take over when this few tiles are left in hands
+        self.max_deals = max_deals
+        self.time_budget = time_budget
+        self.table = table if table is not None else TranspositionTable()
+        self.last_nodes = 0
+        self.last_time = 0.0
+        self.last_deals = 0
+
+    def applies(self, spec):
+        return spec['boneyard_count'] == 0 and sum(spec['hand_counts']) <= self.max_tiles
+
+    def choose(self, spec, candidates):
+        """Index into `candidates` of the best move, averaged over the possible deals."""
+        if not candidates:
+            return None
+        start = time.perf_counter()
+        self.nodes = 0
+        self.me = spec['seat']
+        self.scoring = spec['scoring_enabled']
+        self.position = BoardPosition(spec['scoring_mode'])
+        root = list(spec['position'])
+        root[2] = dict(root[2])
+        root = tuple(root)
+
+        self.deadline = start + self.time_budget if self.time_budget else None
+
+        deals = self._deals(spec)
+        totals = [0.0] * len(candidates)
+        try:
+            for hands in deals:
+                self.hands = list(hands)
+                self.n = len(hands)
+                for i, move in enumerate(candidates):
+                    self.position.restore((root[0], root[1], dict(root[2])) + root[3:])
+                    totals[i] += self._play(self.me, move, -math.inf, math.inf)
+        except SearchTimeout:
+            self.last_nodes = self.nodes
+            self.last_time = time.perf_counter() - start
+            print(f"[ENDGAME] Out of time after {self.nodes} nodes ({self.last_time * 1000:.1f} ms)")
+            return None
+
+        best = max(range(len(candidates)), key=lambda i: totals[i])
+        self.last_nodes = self.nodes
+        self.last_time = time.perf_counter() - start
+        self.last_deals = len(deals)
+        print(f"[ENDGAME] {len(deals)} deal(s), {self.nodes} nodes in {self.last_time * 1000:.1f} ms; "
+              f"best value {totals[best] / len(deals):.2f}")
+        return best
+
+    # ---------- deals ----------
+
+    def _deals(self, spec):
+        """
+        Every split of the unseen tiles over the other hands that fits what
+        we know they can't hold (or a sample of them if there are too many).
+        """
+        me = spec['seat']
+        unseen = list(indices(full_mask(spec['max_pip']) & ~(spec['hand'] | spec['played'])))
+        others = [s for s in range(len(spec['hand_counts'])) if s != me]
+        counts = [spec['hand_counts'][s] for s in others]
+        impossible = spec.get('impossible') or [0] * len(spec['hand_counts'])
+        barred = [impossible[s] for s in others]
+
+        ways, left = 1, len(unseen)
+        for count in counts:
+            ways *= math.comb(left, count)
+            left -= count
+
+        if ways <= self.max_deals:
+            deals = []
+            for split in self._all_splits(unseen, counts, barred):
+                hands = [0] * len(spec['hand_counts'])
+                hands[me] = spec['hand']
+                for seat, tiles in zip(others, split):
+                    for index in tiles:
+                        hands[seat] |= 1 << index
+                deals.append(hands)
+            if deals:
+                return deals
+            barred = None   # what we inferred doesn't add up; fall back to sampling
+
+        rng = random.Random(spec['played'])
+        if barred is None:
+            spec = dict(spec, impossible=None)
+        return [deal_unseen(spec, rng)[0] for _ in range(self.max_deals)]
+
+    def _all_splits(self, tiles, counts, barred):
+        if not counts:
+            return [[]]
+        allowed = [t for t in tiles if not barred[0] >> t & 1]
+        splits = []
+        for chosen in itertools.combinations(allowed, counts[0]):
+            rest = [t for t in tiles if t not in chosen]
+            for tail in self._all_splits(rest, counts[1:], barred[1:]):
+                splits.append([list(chosen)] + tail)
+        return splits
+
+    # ---------- search ----------
+
+    def _weight(self, seat, points):
+        """What `points` scored by `seat` are worth to us."""
+        if seat == self.me:
+            return points
+        return -points / (self.n - 1)
+
+    def _play(self, seat, move, alpha, beta):
+        """Value of `seat` playing `move` now, searched with window (alpha, beta)."""
+        index, arm, connection_value = move
+        a, b = TILE_PIPS[index]
+        position = self.position
+        state = position.snapshot()
+        position.place(arm, a, b, connection_value)
+        self.hands[seat] &= ~(1 << index)
+
+        if not self.hands[seat]:
+            if self.scoring:
+                bonus = 5 * round(sum(pip_total(hand) for hand in self.hands) / 5)
+                value = self._weight(seat, bonus)
+            else:
+                value = 1.0 if seat == self.me else 0.0
+        else:
+            gain = 0
+            if self.scoring and position.total > 0 and position.total % 5 == 0:
+                gain = self._weight(seat, position.total)
+            value = gain + self._search((seat + 1) % self.n, 0, alpha - gain, beta - gain)
+
+        self.hands[seat] |= 1 << index
+        position.restore(state)
+        return value
+
+    def _search(self, seat, passes, alpha, beta):
+        self.nodes += 1
+        if self.deadline and not self.nodes & 63 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        key = ('endgame', self.me, self.scoring, self.position.hash, tuple(self.hands), seat, passes)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        moves = legal_moves(self.position, self.hands[seat])
+        if not moves:
+            if passes + 1 >= self.n:
+                return self._blocked()
+            # A pass changes nothing, so the window carries straight through
+            return self._search((seat + 1) % self.n, passes + 1, alpha, beta)
+
+        moves.sort(key=self._order_key, reverse=True)
+        maximizing = seat == self.me
+        alpha0, beta0 = alpha, beta
+        best = -math.inf if maximizing else math.inf
+        for move in moves:
+            value = self._play(seat, move, alpha, beta)
+            if maximizing:
+                best = max(best, value)
+                alpha = max(alpha, value)
+            else:
+                best = min(best, value)
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best <= alpha0:
+            flag = UPPER
+        elif best >= beta0:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(key, (best, flag))
+        return best
+
+    def _order_key(self, move):
+        """Try scoring plays and heavy tiles first; they tend to cut off sooner."""
+        index, arm, connection_value = move
+        a, b = TILE_PIPS[index]
+        total = self.position.projected_total(arm, a, b, connection_value)
+        return (total > 0 and total % 5 == 0) * total, a + b
+
+    def _blocked(self):
+        """Blocked hand: fewest pips wins (lowest seat on a tie), as in Game."""
+        pips = [pip_total(hand) for hand in self.hands]
+        winner = blocked_winner(pips)
+        if not self.scoring:
+            return 1.0 if winner == self.me else 0.0
+        return self._weight(winner, hand_bonus(pips, winner))
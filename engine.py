@@ -0,0 +1,246 @@
+# engine.py — the rules of the game with no pygame, images or layout
+#
+# A GameState holds a whole game as ints and lists: hands and the boneyard
+# as bitboard tile indices, the board as a BoardPosition. step() applies one
+# action for the player to move:
+#     ('play', tile_index, arm, connection_value)   arm None for the opening tile
+#     ('draw',)                                      only when nothing fits
+#     ('pass',)                                      only when nothing fits and the boneyard is empty
+# GameState drives every game: the headless players (tournament, environment,
+# batchsim) use it directly, and Game holds one and sends each play, draw and
+# pass through step(), with its pixel Board and hands following along.
+import random
+
+from bitboard import DOUBLES_MASK, PIP_MASKS, TILE_PIPS, indices, pip_total, set_size, tile_index
+from position import BoardPosition
+
+# Supported sets by highest pip, and hand size per player count as
+# (up to this many players, hand size) pairs, checked in order.
+DOMINO_SETS = {6: "Double-Six", 9: "Double-Nine", 12: "Double-Twelve", 15: "Double-Fifteen"}
+HAND_SIZES = {
+    6: ((3, 9), (4, 7), (5, 5), (8, 3)),
+    9: ((4, 10), (6, 8), (8, 6)),
+    12: ((4, 15), (6, 12), (8, 10)),
+    15: ((4, 15), (8, 12)),
+}
+MAX_PLAYERS = 8
+TARGET_SCORE = 150      # first to this many points wins (classic)
+
+
+def hand_size_for(max_pip, num_players):
+    """Tiles dealt to each player for a double-`max_pip` set."""
+    for up_to, size in HAND_SIZES[max_pip]:
+        if num_players <= up_to:
+            return size
+    raise ValueError(f"{DOMINO_SETS[max_pip]} supports at most {up_to} players, not {num_players}")
+
+
+# ---------- rules shared with Game and the AI ----------
+
+def points_for_total(total):
+    """What a board-ends total scores: itself if it is a positive multiple of 5."""
+    return total if total > 0 and total % 5 == 0 else 0
+
+
+def score_move(projected_total, current_total, scoring_enabled=True):
+    """
+    The greedy AI's value for a move that takes the ends total from
+    `current_total` to `projected_total`: what it scores, plus small nudges
+    towards totals that are hard to score from and towards lowering the total.
+    """
+    if not scoring_enabled:
+        # neutralize the "by 5" bias; keep a tiny defensive nudge
+        return 1 if projected_total < current_total else 0
+    score = points_for_total(projected_total)
+    if projected_total % 5 in (1, 4):
+        score += 2
+    if projected_total < current_total:
+        score += 1
+    return score
+
+
+def hand_bonus(pip_totals, winner):
+    """Points the hand's winner takes from the other hands, to the nearest 5."""
+    return 5 * round((sum(pip_totals) - pip_totals[winner]) / 5)
+
+
+def blocked_winner(pip_totals):
+    """Seat that wins a blocked hand: fewest pips, lowest seat on a tie."""
+    return min(range(len(pip_totals)), key=lambda seat: pip_totals[seat])
+
+
+def highest_double(hands):
+    """(seat, tile index) of the highest double dealt, or (None, None) if nobody has one."""
+    best_seat, best = None, None
+    for seat, hand in enumerate(hands):
+        doubles = hand & DOUBLES_MASK
+        if doubles:
+            top = doubles.bit_length() - 1     # higher doubles have higher indices
+            if best is None or top > best:
+                best_seat, best = seat, top
+    return best_seat, best
+
+
+def legal_moves(position, hand):
+    """(tile_index, arm, connection_value) for every tile in `hand` that fits an open end."""
+    if position.tile_count == 0:
+        return [(index, None, None) for index in indices(hand)]
+    return [(index, arm, pip)
+            for arm, pip in position.open_ends()
+            for index in indices(hand & PIP_MASKS[pip])]
+
+
+class GameState:
+    """
+    A game from the first deal to game over. `phase` is 'playing',
+    'hand_over' (call next_hand() to deal again) or 'game_over' (see
+    `winner`). The first hand is opened by whoever holds the highest double,
+    which they must lead; a hand's winner opens the next with any tile, and
+    after a blocked hand the holder of the top double leads it.
+    """
+
+    def __init__(self, num_players, max_pip=6, scoring_enabled=True,
+                 scoring_mode='spinner_stays_12', seed=None, deal=True):
+        self.num_players = num_players
+        self.max_pip = max_pip
+        self.scoring_enabled = scoring_enabled
+        self.hand_size = hand_size_for(max_pip, num_players)
+        self.rng = random.Random(seed)
+        self.position = BoardPosition(scoring_mode)
+        self.scores = [0] * num_players
+        self.hands = [0] * num_players
+        self.boneyard = []          # tile indices; draws take from the end
+        self.current = 0
+        self.must_play = None       # tile index the opener has to lead
+        self.phase = 'playing'
+        self.hand_winner = None
+        self.blocked = False
+        self.winner = None
+        self.hands_played = 0
+        if deal:
+            self.deal()
+
+    def copy(self):
+        other = GameState.__new__(GameState)
+        other.__dict__.update(self.__dict__)
+        other.position = BoardPosition(self.position.scoring_mode)
+        other.position.restore(self.position.snapshot())
+        other.scores = list(self.scores)
+        other.hands = list(self.hands)
+        other.boneyard = list(self.boneyard)
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        return other
+
+    # ---------- dealing ----------
+
+    def deal(self):
+        """Shuffle, deal a new hand and pick who opens it."""
+        tiles = list(range(set_size(self.max_pip)))
+        self.rng.shuffle(tiles)
+        for seat in range(self.num_players):
+            self.hands[seat] = 0
+            for _ in range(self.hand_size):
+                self.hands[seat] |= 1 << tiles.pop()
+        self.boneyard = tiles
+        self.position.reset()
+        self.phase = 'playing'
+
+        if self.hands_played == 0 or self.blocked:
+            # First hand: highest double; after a block: the top double, if dealt
+            if self.hands_played == 0:
+                seat, index = highest_double(self.hands)
+            else:
+                top = tile_index(self.max_pip, self.max_pip)
+                seat = next((s for s, hand in enumerate(self.hands) if hand >> top & 1), None)
+                index = top if seat is not None else None
+            self.current = seat if seat is not None else 0
+            self.must_play = index
+        else:
+            self.current = self.hand_winner
+            self.must_play = None
+        self.hand_winner = None
+        self.blocked = False
+
+    def next_hand(self):
+        if self.phase != 'hand_over':
+            raise ValueError(f"next_hand() needs a finished hand, not phase {self.phase!r}")
+        self.deal()
+
+    # ---------- moves ----------
+
+    def legal_actions(self):
+        """Every action the player to move may take now."""
+        if self.phase != 'playing':
+            return []
+        if self.position.tile_count == 0 and self.must_play is not None:
+            return [('play', self.must_play, None, None)]
+        moves = legal_moves(self.position, self.hands[self.current])
+        if moves:
+            return [('play',) + move for move in moves]
+        return [('draw',)] if self.boneyard else [('pass',)]
+
+    def step(self, action):
+        """
+        Apply `action` for the player to move. Returns the points it earned
+        them (board scoring plus any hand bonus). Raises ValueError for an
+        action that isn't legal now.
+        """
+        if action not in self.legal_actions():
+            raise ValueError(f"Illegal action {action!r} for player {self.current + 1}")
+        seat = self.current
+
+        if action[0] == 'draw':
+            self.hands[seat] |= 1 << self.boneyard.pop()
+            return 0            # same player keeps the turn
+        if action[0] == 'pass':
+            self._advance()
+            return 0
+
+        _, index, arm, connection_value = action
+        a, b = TILE_PIPS[index]
+        self.position.place(arm, a, b, connection_value)
+        self.hands[seat] &= ~(1 << index)
+        self.must_play = None
+
+        if not self.hands[seat]:
+            return self._end_hand(seat, blocked=False)
+
+        points = 0
+        if self.scoring_enabled:
+            points = points_for_total(self.position.total)
+            self.scores[seat] += points
+            if self.scores[seat] >= TARGET_SCORE:
+                self.phase = 'game_over'
+                self.winner = seat
+                return points
+        self._advance()
+        return points
+
+    def _advance(self):
+        self.current = (self.current + 1) % self.num_players
+        if not self.boneyard and not any(
+                legal_moves(self.position, hand) for hand in self.hands):
+            self._end_hand(blocked_winner(self.pip_totals()), blocked=True)
+
+    def _end_hand(self, winner, blocked):
+        self.hand_winner = winner
+        self.blocked = blocked
+        self.hands_played += 1
+        if not self.scoring_enabled:
+            # Race: going out, or fewest pips in a block, wins the game
+            self.phase = 'game_over'
+            self.winner = winner
+            return 0
+
+        bonus = hand_bonus(self.pip_totals(), winner)
+        self.scores[winner] += bonus
+        if any(score >= TARGET_SCORE for score in self.scores):
+            self.phase = 'game_over'
+            self.winner = max(range(self.num_players), key=lambda s: self.scores[s])
+        else:
+            self.phase = 'hand_over'
+        return bonus
+
+    def pip_totals(self):
+        return [pip_total(hand) for hand in self.hands]
@@ -0,0 +1,226 @@
+# environment.py — the game as a reset/step environment for training AI seats
+#
+# DominoEnv follows the Gymnasium API without depending on it: reset() gives
+# (observation, info), step(action) gives (observation, reward, terminated,
+# truncated, info), and info['action_mask'] marks the legal actions. The
+# learner plays one seat of an engine.GameState, the rules object Game also
+# holds and steps for the table (parity.py replays seeded Game sessions on a
+# bare GameState to check the two agree), and the other seats are
+# policies.Policy players.
+#
+# An action is a (tile, end) pair, tile_index * 4 + end, with ends in
+# BoardPosition order (left, right, top, bottom); the opening tile goes on
+# end 0. Draws and passes have no choice in them, so they are made for the
+# learner, and the environment only stops when it has a tile to play.
+#
+# VectorDominoEnv steps K independent games in one call. Needs NumPy.
+import random
+
+import numpy as np
+
+from bitboard import set_size
+from engine import DOMINO_SETS, GameState, hand_size_for
+from inference import HandInference
+from policies import Policy
+from position import SIDES
+
+ENDS = len(SIDES)
+
+
+def observation_size(max_pip, num_players):
+    """Length of the observation vector for a double-`max_pip` set and `num_players`."""
+    return 2 * set_size(max_pip) + 2 * ENDS + 4 + 2 * num_players
+
+
+def observe(state, seat):
+    """
+    What `seat` can see, as an int16 vector: its hand and the played tiles
+    (one 0/1 per tile each), the pip on each end (-1 when closed) and whether
+    that end shows a double, the spinner pip (-1 before one is down), the
+    ends total, the tile count on the board, the boneyard size, the others'
+    tile counts and then every score, both in seat order starting after (and
+    for scores, with) `seat`.
+    """
+    tiles = set_size(state.max_pip)
+    position = state.position
+    obs = np.zeros(observation_size(state.max_pip, state.num_players), dtype=np.int16)
+    hand, played = state.hands[seat], position.played
+    for index in range(tiles):
+        obs[index] = hand >> index & 1
+        obs[tiles + index] = played >> index & 1
+
+    at = 2 * tiles
+    obs[at:at + ENDS] = -1
+    for arm, pip in position.open_ends():
+        if arm in SIDES:
+            end = SIDES.index(arm)
+            obs[at + end] = pip
+            obs[at + ENDS + end] = position.tips.get(arm, (pip, False))[1]
+    at += 2 * ENDS
+    obs[at:at + 4] = (-1 if position.spinner is None else position.spinner, position.total,
+                      position.tile_count, len(state.boneyard))
+    at += 4
+
+    seats = [(seat + offset) % state.num_players for offset in range(state.num_players)]
+    for i, other in enumerate(seats[1:]):
+        obs[at + i] = state.hands[other].bit_count()
+    at += state.num_players - 1
+    for i, other in enumerate(seats):
+        obs[at + i] = state.scores[other]
+    return obs
+
+
+class DominoEnv:
+    """
+    One seat of a game against Policy opponents ("greedy" by default; one
+    name for all of them or one per other seat, in seat order). Rewards are
+    the learner's points minus the average the others scored since its last
+    move, or in race mode +1/-1 for winning or losing the game.
+    """
+
+    def __init__(self, num_players=2, max_pip=6, game_mode="scoring", seat=0,
+                 opponents="greedy", seed=None):
+        hand_size_for(max_pip, num_players)     # fail early on an impossible table
+        if not 0 <= seat < num_players:
+            raise ValueError(f"Seat {seat} is not at a {num_players}-player table")
+        if isinstance(opponents, str):
+            opponents = [opponents] * (num_players - 1)
+        if len(opponents) != num_players - 1:
+            raise ValueError(f"Expected {num_players - 1} opponents, got {len(opponents)}")
+
+        self.num_players = num_players
+        self.max_pip = max_pip
+        self.scoring_enabled = game_mode == "scoring"
+        self.seat = seat
+        self.opponent_names = list(opponents)
+        self.rng = random.Random(seed)
+        self.num_actions = set_size(max_pip) * ENDS
+        self.observation_size = observation_size(max_pip, num_players)
+        self.state = None
+        self.opponents = {}
+        self.inference = HandInference(num_players, max_pip)
+        self._legal = {}
+
+    def __repr__(self):
+        return (f"DominoEnv({DOMINO_SETS[self.max_pip]}, {self.num_players} players, "
+                f"seat {self.seat}, vs {', '.join(self.opponent_names)})")
+
+    def reset(self, seed=None):
+        """
+        Deal a new game and play up to the learner's first decision. A race
+        someone wins before the learner has a tile to play is dealt again.
+        """
+        others = [s for s in range(self.num_players) if s != self.seat]
+        while True:
+            if seed is None:
+                seed = self.rng.getrandbits(32)
+            self.state = GameState(self.num_players, self.max_pip, self.scoring_enabled, seed=seed)
+            self.opponents = {other: Policy(name, seed=seed + other)
+                              for other, name in zip(others, self.opponent_names)}
+            self.inference.reset()
+            self._play_until_decision()
+            if self.state.phase != 'game_over':
+                return observe(self.state, self.seat), self._info()
+            seed = None
+
+    def step(self, action):
+        """Play `action` for the learner, then the others until it must choose again."""
+        play = self._legal.get(int(action))
+        if play is None:
+            raise ValueError(f"Illegal action {action} (tile {action // ENDS}, end {action % ENDS})")
+        state = self.state
+        before = list(state.scores)
+        state.step(play)
+        self._play_until_decision()
+
+        terminated = state.phase == 'game_over'
+        if self.scoring_enabled:
+            gained = [after - start for after, start in zip(state.scores, before)]
+            mine = gained[self.seat]
+            reward = mine - (sum(gained) - mine) / (self.num_players - 1)
+        else:
+            reward = 0.0 if not terminated else (1.0 if state.winner == self.seat else -1.0)
+        return observe(state, self.seat), float(reward), terminated, False, self._info()
+
+    def action_mask(self):
+        mask = np.zeros(self.num_actions, dtype=bool)
+        mask[list(self._legal)] = True
+        return mask
+
+    def _info(self):
+        return {'action_mask': self.action_mask(), 'scores': list(self.state.scores),
+                'winner': self.state.winner}
+
+    def _play_until_decision(self):
+        """Deal on, and play the others' turns and the learner's forced draws and passes."""
+        state = self.state
+        self._legal = {}
+        while state.phase != 'game_over':
+            if state.phase == 'hand_over':
+                state.next_hand()
+                self.inference.reset()
+                continue
+            current = state.current
+            actions = state.legal_actions()
+            if current == self.seat and actions[0][0] == 'play':
+                for play in actions:
+                    _, index, arm, _ = play
+                    self._legal[index * ENDS + (0 if arm is None else SIDES.index(arm))] = play
+                return
+            action = actions[0] if current == self.seat else \
+                self.opponents[current].act(state, self.inference.impossible)
+            if action[0] != 'play':
+                self.inference.cannot_play(current, [pip for _, pip in state.position.open_ends()],
+                                           drawing=action[0] == 'draw')
+            state.step(action)
+
+
+class VectorDominoEnv:
+    """
+    K independent DominoEnvs stepped together: observations (K, size),
+    rewards and flags (K,), and info['action_mask'] (K, actions). A game
+    that ends is reset straight away; its last observation and final scores
+    are in info['final_observation'] / info['final_scores'] for that row.
+    """
+
+    def __init__(self, num_envs, num_players=2, max_pip=6, game_mode="scoring", seat=0,
+                 opponents="greedy", seed=None):
+        seeds = random.Random(seed)
+        self.envs = [DominoEnv(num_players, max_pip, game_mode, seat, opponents,
+                               seed=seeds.getrandbits(32))
+                     for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.num_actions = self.envs[0].num_actions
+        self.observation_size = self.envs[0].observation_size
+
+    def reset(self, seed=None):
+        seeds = random.Random(seed) if seed is not None else None
+        results = [env.reset(seeds.getrandbits(32) if seeds else None) for env in self.envs]
+        return np.stack([obs for obs, _ in results]), self._infos([info for _, info in results])
+
+    def step(self, actions):
+        observations, rewards, terminated, infos = [], [], [], []
+        final_observation = np.zeros((self.num_envs, self.observation_size), dtype=np.int16)
+        final_scores = [None] * self.num_envs
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, reward, done, _, info = env.step(action)
+            if done:
+                final_observation[i], final_scores[i] = obs, info['scores']
+                obs, info = env.reset()
+            observations.append(obs)
+            rewards.append(reward)
+            terminated.append(done)
+            infos.append(info)
+        info = self._infos(infos)
+        info['final_observation'] = final_observation
+        info['final_scores'] = final_scores
+        return (np.stack(observations), np.array(rewards, dtype=np.float32),
+                np.array(terminated), np.zeros(self.num_envs, dtype=bool), info)
+
+    def action_masks(self):
+        return np.stack([env.action_mask() for env in self.envs])
+
+    @staticmethod
+    def _infos(infos):
+        return {'action_mask': np.stack([info['action_mask'] for info in infos]),
+                'scores': [info['scores'] for info in infos]}
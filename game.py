@@ -3,9 +3,17 @@ import random
 import os
 import time  # Add this import for timing
 from board import Board
-from tile import Tile
+from tile import Tile, generated_face
 from player import Player
 from boneyard import Boneyard
+from bitboard import indices, mask_of
+from engine import GameState, hand_size_for
+from endgame import EndgameSolver
+from montecarlo import MonteCarloAI
+from policies import AI_LEVELS, make_engine, visible_spec
+from transposition import TranspositionTable
+from inference import HandInference
+from ai_worker import AIWorker
 import asyncio
 # Base path helper (works in browser build, too)
 BASE = os.path.dirname(__file__)
@@ -19,6 +27,7 @@ _FACE_CACHE = {}        # scaled faces by (l, r, w, h)
 TILE_WIDTH = 40
 TILE_HEIGHT = 80
 
+
 def load_image_rel(path):
     """Load image relative to the project, cache by full path."""
     full = P(path)
@@ -47,12 +56,10 @@ def load_card_face(left, right):
             return load_image_rel(rel)
         except Exception as e:
             last_err = e
-    # Visible placeholder so game keeps running if missing
-    print(f"[ASSET] Could not load face for {left}-{right}: {last_err}")
-    ph = pygame.Surface((100, 200), pygame.SRCALPHA)
-    ph.fill((0, 0, 0))  # black placeholder
-    pygame.draw.rect(ph, (200, 200, 200), ph.get_rect(), 6)
-    return ph
+    # No card art (bigger sets only ship 0-6): draw a face so the game keeps running
+    if max(left, right) <= 6:
+        print(f"[ASSET] Could not load face for {left}-{right}: {last_err}")
+    return generated_face(left, right, 100, 200)
 
 def get_face_scaled(left, right, w, h):
     """Return a scaled face Surface for (left,right) at size (w,h)."""
@@ -65,19 +72,23 @@ def get_face_scaled(left, right, w, h):
     return surf
 
 class Game:
-    def __init__(self, screen, num_players, num_humans, game_mode="scoring"):
+    def __init__(self, screen, num_players, num_humans, game_mode="scoring", max_pip=6,
+                 ai_levels="greedy"):
         self.game_mode = game_mode
         self.scoring_enabled = (game_mode == "scoring")
         self.screen = screen
         self.num_players = num_players
         self.num_humans = num_humans
-        self.players = []
-        for i in range(num_players):
-            self.players.append(Player(i, is_human=(i < self.num_humans)))
+        self.max_pip = max_pip
+        self.hand_size = hand_size_for(max_pip, num_players)
+        self.players = self._new_players()
         self.current_player_index = 0
-        self.board = Board(screen.get_width(), screen.get_height())
+        self.board = Board(screen.get_width(), screen.get_height(), max_pip=max_pip)
         self.selected_tile = None
         self.boneyard = None
+        # The rules run on an engine.GameState (see _step); the Board, the
+        # players' hands and the boneyard hold the Tiles and follow it.
+        self._new_state()
         self.game_over = False
         self.font = pygame.font.SysFont(None, 36)
         self.button_font = pygame.font.SysFont(None, 24)
@@ -96,17 +107,41 @@ class Game:
         self.tile_to_place = None
         self.placement_options = []
 
-        # New state variables for round management
-        self.last_round_winner_index = None
+        # Opening rules for the hand, read off the state (see _sync_opening)
         self.can_start_any_tile = False
         self.must_play_tile = None
         self.return_to_menu_requested = False   # set when user clicks after final Game Over
         self.exiting = False
-        
-        # ADD THIS: Flag to prevent double point awards
-        self.round_ended = False
         self.cached_board_total = 0
 
+        # Bumped by every real state change (deal, play, draw, turn change);
+        # per-frame checks only re-run when it has moved.
+        self.state_version = 0
+
+        # AI level per seat (see AI_LEVELS); one name applies to every seat
+        if isinstance(ai_levels, str):
+            ai_levels = [ai_levels] * num_players
+        self.ai_levels = list(ai_levels)
+        if len(self.ai_levels) != num_players:
+            raise ValueError(f"Expected {num_players} AI levels, got {len(self.ai_levels)}")
+        for level in self.ai_levels:
+            if level not in AI_LEVELS:
+                raise ValueError(f"Unknown AI level {level!r}; expected one of {', '.join(AI_LEVELS)}")
+        # Exact search takes over near the end of a hand once the boneyard is
+        # empty ("exact" seats only); its cache lives for the whole hand (see
+        # _reset_ai_cache)
+        self.ai_cache = TranspositionTable()
+        self.endgame = EndgameSolver(table=self.ai_cache,
+                                     time_budget=0.8 * AI_LEVELS["exact"][1])
+        self.ai_engines = {level: make_engine(level) for level in set(self.ai_levels)}
+        self.ai_time_used = [0.0] * num_players   # seconds of AI thinking per seat this hand
+        # Tiles each player is known not to hold, from their passes and draws
+        self.inference = HandInference(num_players, max_pip)
+        # Searches run here so the frame loop keeps drawing while the AI thinks
+        self.ai_worker = AIWorker()
+        self._greedy_turn_key = None
+        self._turn_moves = (None, [])     # (turn key, legal moves) for the AI to move
+
         # AI timing variables
         self.ai_turn_start_time = None
         self.ai_delay = 1.5  # 1.5 seconds delay for AI moves
@@ -140,11 +175,7 @@ class Game:
         
     def run(self):
             self._deal_initial_hands()
-            self.current_player_index = self._determine_starting_player()
-            if self.current_player_index is None:
-                self.current_player_index = 0
-                print("No suitable starting tile found, defaulting to Player 1.")
-            
+
             # Start AI timer if first player is AI
             current_player = self.players[self.current_player_index]
             if not current_player.is_human:
@@ -192,8 +223,6 @@ class Game:
                 pygame.display.flip()
 
 
-                self._check_game_end_conditions()
-
                 if self.game_over:
                     running = False
                     break
@@ -202,15 +231,18 @@ class Game:
                 if not self.waiting_for_placement_choice and not message_is_blocking:
                     current_player = self.players[self.current_player_index]
                     if not current_player.is_human:
+                        # The AI thinks in the background, overlapping the delay
+                        ready = self._ai_ready(current_player)
                         if self.waiting_for_ai_delay:
                             # Check if enough time has passed
-                            if time.time() - self.ai_turn_start_time >= self.ai_delay:
+                            if time.time() - self.ai_turn_start_time >= self.ai_delay and ready:
                                 self.waiting_for_ai_delay = False
                                 self._handle_player_turn()
-                        else:
+                        elif ready:
                             # This shouldn't happen, but handle it just in case
                             self._handle_player_turn()
 
+            self._shutdown_ai()
             print("Game Over. Final Scores:")
             for player in self.players:
                 print(f"Player {player.index + 1}: {player.score} points")
@@ -225,7 +257,6 @@ class Game:
     async def run_async(self):
         """Browser-friendly loop: same logic as run(), but yields each frame."""
         self._deal_initial_hands()
-        self.current_player_index = self._determine_starting_player() or 0
 
         # Start AI timer if first player is AI
         current_player = self.players[self.current_player_index]
@@ -273,8 +304,6 @@ class Game:
             message_is_blocking = self._draw_ai_message()
             pygame.display.flip()
 
-            # End-of-hand checks
-            self._check_game_end_conditions()
             if self.game_over:
                 running = False
                 break
@@ -283,17 +312,19 @@ class Game:
             if not self.waiting_for_placement_choice and not message_is_blocking:
                 current_player = self.players[self.current_player_index]
                 if not current_player.is_human:
+                    ready = self._ai_ready(current_player)
                     if self.waiting_for_ai_delay:
-                        if time.time() - self.ai_turn_start_time >= self.ai_delay:
+                        if time.time() - self.ai_turn_start_time >= self.ai_delay and ready:
                             self.waiting_for_ai_delay = False
                             self._handle_player_turn()
-                    else:
+                    elif ready:
                         self._handle_player_turn()
 
             clock.tick(60)
             # CRUCIAL in browsers: yield once per frame
             await asyncio.sleep(0)
 
+        self._shutdown_ai()
         print("Game Over. Final Scores:")
         for player in self.players:
             print(f"Player {player.index + 1}: {player.score} points")
@@ -304,79 +335,126 @@ class Game:
             return "EXIT"
         return "GAME_OVER"
 
-    def _deal_initial_hands(self):
-        """Centralized logic for creating and dealing tiles for a new round/game."""
-        self.all_tiles = [Tile(i, j) for i in range(7) for j in range(i, 7)]
-        random.shuffle(self.all_tiles)
+    def _bump_state_version(self):
+        self.state_version += 1
+
+    def _reset_ai_cache(self):
+        """New hand: nothing cached about the last one can come up again."""
+        if len(self.ai_cache):
+            stats = self.ai_cache.stats()
+            print(f"[AI] Search cache for the last hand: {stats['entries']} entries, "
+                  f"{stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                  f"{stats['evictions']} evictions")
+        self.ai_cache.clear()
+        self.inference.reset()
+        if any(self.ai_time_used):
+            used = ", ".join(f"P{seat + 1} {seconds:.2f}s" for seat, seconds in enumerate(self.ai_time_used)
+                             if seconds)
+            print(f"[AI] Thinking time last hand: {used}")
+        self.ai_time_used = [0.0] * self.num_players
+
+    def _note_cannot_play(self, player):
+        """Everyone saw `player` fail to match the open ends before drawing or passing."""
+        ends = [end for _, _, end in self.board.get_playable_ends(require_runway=False)]
+        self.inference.cannot_play(player.index, ends, drawing=not self.boneyard.is_empty())
+
+    def _new_state(self):
+        """A fresh game: a new GameState (dealing from `random`, so seeding it repeats a game) and its Tiles."""
+        self.state = GameState(self.num_players, self.max_pip, self.scoring_enabled,
+                               self.board.scoring_mode, seed=random.getrandbits(32), deal=False)
+        self.action_log = []    # every action stepped this game, in order (parity.py replays it)
+        top = self.max_pip + 1
+        self.tiles_by_index = {tile.index: tile for tile in (Tile(i, j) for i in range(top) for j in range(i, top))}
 
-        hand_size = 9 if self.num_players in [2, 3] else 7
-        for player in self.players:
-            player.hand = [self.all_tiles.pop() for _ in range(hand_size)]
-        self.boneyard = Boneyard(self.all_tiles)
+    def _deal_initial_hands(self):
+        """Deal the next hand through the rules engine and hand out the Tiles it dealt."""
+        self._bump_state_version()
+        self._reset_ai_cache()
+        state = self.state
+        if state.phase == 'hand_over':
+            state.next_hand()
+        else:
+            state.deal()
+        tiles = self.tiles_by_index
+        for player, hand in zip(self.players, state.hands):
+            player.hand = [tiles[index] for index in indices(hand)]
+        self.boneyard = Boneyard([tiles[index] for index in state.boneyard])
+        self.current_player_index = state.current
+        self._sync_opening()
         print("Hands dealt.")
+        if self.must_play_tile is not None:
+            print(f"Player {state.current + 1} opens with "
+                  f"{self.must_play_tile.value1}|{self.must_play_tile.value2}.")
+        else:
+            print(f"Player {state.current + 1} opens with any tile.")
+
+    def _sync_opening(self):
+        """Read the opening rule for an empty board off the state."""
+        opening = self.state.phase == 'playing' and self.state.position.tile_count == 0
+        must_play = self.state.must_play if opening else None
+        self.must_play_tile = self.tiles_by_index[must_play] if must_play is not None else None
+        self.can_start_any_tile = opening and must_play is None
+
+    def _engine_action(self, tile, placement_option):
+        """The GameState action for playing `tile` at a Board placement option (arm None if it has none)."""
+        direction, target_tile, end_value = placement_option
+        if not self.board.tiles:
+            return ('play', tile.index, None, None)
+        return ('play', tile.index, self.board._arm_for_option(direction, target_tile), end_value)
 
-    def _determine_starting_player(self):
-        """Determines the starting player based on game state."""
-        # SPECIAL CASE: After blocked game, find player with 6|6
-        if hasattr(self, 'blocked_game_restart') and self.blocked_game_restart:
-            print("Blocked game restart: Looking for player with 6|6 tile...")
-            self.blocked_game_restart = False  # Reset flag
-            
-            for i, player in enumerate(self.players):
-                for tile in player.hand:
-                    if tile.value1 == 6 and tile.value2 == 6:
-                        print(f"Player {i + 1} has the 6|6 tile and will start.")
-                        self.must_play_tile = tile
-                        self.can_start_any_tile = False
-                        return i
-            
-            # Fallback if no 6|6 found (shouldn't happen)
-            print("Warning: No 6|6 tile found! Defaulting to Player 1.")
-            self.must_play_tile = None
-            self.can_start_any_tile = False
-            return 0
-        
-        # If this is a new round and we have a previous round winner, they start
-        if hasattr(self, 'last_round_winner_index') and self.last_round_winner_index is not None:
-            print(f"Player {self.last_round_winner_index + 1} (previous round winner) starts this round and can play ANY tile.")
-            self.can_start_any_tile = True
-            self.must_play_tile = None  # Round winner can play any tile
-            return self.last_round_winner_index
-        
-        # Otherwise, this is the first round - find player with highest double
-        highest_double_value = -1
-        starting_player_index = None
-        starting_tile = None
-        
-        # Check all players for their highest double
-        for i, player in enumerate(self.players):
-            player_highest_double = -1
-            player_highest_tile = None
-            
-            # Find this player's highest double
-            for tile in player.hand:
-                if tile.is_double() and tile.value1 > player_highest_double:
-                    player_highest_double = tile.value1
-                    player_highest_tile = tile
-            
-            # Check if this player has the overall highest double so far
-            if player_highest_double > highest_double_value:
-                highest_double_value = player_highest_double
-                starting_player_index = i
-                starting_tile = player_highest_tile
-        
-        if starting_player_index is not None:
-            print(f"Player {starting_player_index + 1} starts with the highest double: {highest_double_value}|{highest_double_value}")
-            # Store the tile that must be played first (only for first round)
-            self.must_play_tile = starting_tile
-            self.can_start_any_tile = False
-            return starting_player_index
+    def _step(self, action):
+        """
+        Take `action` for the player to move through GameState.step, then
+        make the table follow the state: the Tile moves between boneyard,
+        hand and board, scores, the turn and the end of the hand. A played
+        tile must already be on the Board. Returns the points the state gave.
+        """
+        state = self.state
+        seat = state.current
+        player = self.players[seat]
+        before = list(state.scores)
+        points = state.step(action)
+        self.action_log.append(action)
+        self._bump_state_version()
+
+        if action[0] == 'draw':
+            tile = self.boneyard.draw_tile()
+            player.add_tile(tile)
+            print(f"[GAME] Player {seat + 1} drew a tile: ({tile.value1}, {tile.value2})")
+        elif action[0] == 'play':
+            player.remove_tile(self.tiles_by_index[action[1]])
+            self.cached_board_total = self.board.get_board_ends_total()
+            self._sync_opening()
         else:
-            # If no doubles at all, default to Player 1 (index 0)
-            print("No doubles found in any hand. Player 1 starts.")
-            self.must_play_tile = None
-            self.can_start_any_tile = False
-            return 0
+            print(f"[GAME] Player {seat + 1} passed.")
+        self._check_table(seat)
+        for each, score in zip(self.players, state.scores):
+            each.score = score
+
+        if state.hand_winner is not None:
+            winner = self.players[state.hand_winner]
+            bonus = state.scores[winner.index] - before[winner.index]
+            if winner.index == seat and state.blocked:
+                bonus -= points         # the blocking play's own board points
+            self._show_hand_end(winner, bonus)
+        elif action[0] == 'play' and points:
+            print(f"Player {seat + 1} scored {points} points! Total: {player.score}")
+            self._show_ai_message(f"Player {seat + 1} scored {points} points!")
+            if state.phase == 'game_over':
+                self._show_immediate_winner_overlay(player)
+                self.overlay_lines.append("Click anywhere to return to the main menu.")
+        if state.phase == 'playing' and action[0] != 'draw':
+            self._next_turn()
+        return points
+
+    def _check_table(self, seat):
+        """The Board and the Tiles in hand must show what the state holds."""
+        state = self.state
+        if (self.board.position.hash, self.board.position.total) != (state.position.hash, state.position.total):
+            raise RuntimeError("[GAME] The board has drifted from the rules engine's position")
+        if mask_of(self.players[seat].hand) != state.hands[seat] or \
+                len(self.boneyard.tiles) != len(state.boneyard):
+            raise RuntimeError(f"[GAME] Player {seat + 1}'s tiles have drifted from the rules engine")
 
     def _draw_game_screen(self):
         # clear background
@@ -399,53 +477,44 @@ class Game:
         pygame.display.flip()
     
     def _play_tile_and_check_scoring(self, tile, placement_option, current_player):
-        """Centralized method to play a tile and handle scoring exactly once."""
-        success = self.board.play(tile, placement_option)
-        if success:
-            current_player.remove_tile(tile)
-            self.cached_board_total = self.board.get_board_ends_total()
-            
-            # Check if player has won the round
-            if not current_player.hand:
-                print(f"[GAME] Player {current_player.index + 1} played their last tile!")
-                if not self.scoring_enabled:
-                    # Race mode → this ends the entire game now
-                    self.overlay_title = "Game Over"
-                    self.overlay_lines = [
-                        f"Player {current_player.index + 1} played their last tile.",
-                        f"Player {current_player.index + 1} is the winner!",
-                        "Click anywhere to continue",
-                    ]
-                    self.phase = "game_over"
-                    self.show_all_hands = True
-                    # Let the click handler return to the menu
-                    return True
-                else:
-                    # Classic (points) → end the hand and award points
-                    self._end_round_with_winner(current_player)
-                    return True
-            
-            # Clear special first-tile flags
-            self.can_start_any_tile = False
-            self.must_play_tile = None
-            
-            # SINGLE SCORING CHECK - only called here
-            self._check_for_scoring()
-
-            # Only advance if the scoring didn’t just end the game/hand
-            if self.phase != "game_over" and not getattr(self, "round_ended", False):
-                self._next_turn()
+        """Play a tile: the rules engine must allow it, the Board lays it out, then _step applies it."""
+        action = self._engine_action(tile, placement_option)
+        if action in self.state.legal_actions() and self.board.play(tile, placement_option):
+            self._step(action)
             return True
 
+        print("[GAME] Failed to place tile")
+        # FIXED: Reset UI state when placement fails so player can try again
+        self.waiting_for_placement_choice = False
+        self.tile_to_place = None
+        self.placement_options = []
+        self.selected_tile = None  # Deselect the tile so they can reselect
+        return False
+
+    def _show_hand_end(self, winner, bonus):
+        """The state ended the hand: show who won it, or the game in race mode."""
+        state = self.state
+        if not self.scoring_enabled:
+            # Race mode: going out, or the fewest pips in a block, wins the whole game
+            if state.blocked:
+                lines = ["The hand is blocked.",
+                         f"Player {winner.index + 1} wins with the fewest pips ({winner.pip_total})."]
+            else:
+                lines = [f"Player {winner.index + 1} played their last tile.",
+                         f"Player {winner.index + 1} is the winner!"]
+            self.overlay_title = "Game Over"
+            self.overlay_lines = lines + ["Click anywhere to continue"]
+            self.phase = "game_over"
+            self.show_all_hands = True
+            return
+
+        if state.blocked:
+            print("Game is locked! No player can make a move and boneyard is empty. Round Over.")
         else:
-            print("[GAME] Failed to place tile")
-            # FIXED: Reset UI state when placement fails so player can try again
-            self.waiting_for_placement_choice = False
-            self.tile_to_place = None
-            self.placement_options = []
-            self.selected_tile = None  # Deselect the tile so they can reselect
-            return False
-            
+            print(f"[GAME] Player {winner.index + 1} played their last tile!")
+        print(f"Player {winner.index + 1} awarded {bonus} points!")
+        self._show_hand_result_overlay(winner, bonus, blocked=state.blocked)
+
     def _show_immediate_winner_overlay(self, winner):
         # Freeze play behind a blocking overlay; the click handler will return to menu.
         self.overlay_title = "Game Over"
@@ -493,42 +562,36 @@ class Game:
 #        return hand_info
 
     # ------------------------- Overlay drawing helpers --------------------------
-    def _has_playable_move(self, player) -> bool:
-        """True if any tile in player's hand can be placed, allowing corner turns."""
-        playable_ends = self.board.get_playable_ends(require_runway=False)
-        
-        for tile in player.hand:
-            for direction, target_tile, end_value in playable_ends:
-                if end_value is not None and (end_value == tile.value1 or end_value == tile.value2):
-                    return True
-        return False
-
-    def _end_round_with_winner(self, winner):
-        # Prevent double-scoring / double-reset
-        if getattr(self, "round_ended", False):
-            return
-
-        # Mark the round as ended to stop normal turn processing
-        self.round_ended = True
-
-        # The winner of a normal (non-blocked) round starts next time
-        self.last_round_winner_index = winner.index
-
-        # Award points and prime the overlay state
-        points = self._award_end_round_points(winner)
-        self._show_hand_result_overlay(winner, points, blocked=False)
+    def _can_play(self):
+        """Does the rules engine give the player to move a tile to play?"""
+        actions = self.state.legal_actions()
+        return bool(actions) and actions[0][0] == 'play'
+
+    def _must_draw(self):
+        """Nothing fits and the boneyard has tiles: the player to move has to draw."""
+        return self.state.legal_actions() == [('draw',)]
+
+    def _draw(self):
+        """Draw one tile for the player to move and return it."""
+        player = self.players[self.state.current]
+        self._step(('draw',))
+        return player.hand[-1]
+
+    def _new_players(self):
+        """Seat the players; past four, each side of the table holds two hands."""
+        players = []
+        for i in range(self.num_players):
+            span = (0.0, 1.0)
+            if self.num_players > 4:
+                span = (0.0, 0.5) if i < 4 else (0.5, 1.0)
+            players.append(Player(i, is_human=(i < self.num_humans), seat_span=span))
+        return players
 
     def reset_game(self):
         """Resets the entire game for a fresh start, including scores."""
-        self.players = [Player(i, is_human=(i < self.num_humans)) for i in range(self.num_players)]
-        for player in self.players:
-            player.score = 0
-        
-        # Reset ALL round tracking variables
-        self.last_round_winner_index = None
-        self.can_start_any_tile = False
-        self.must_play_tile = None
-        self.round_ended = False  # RESET FLAG
+        self.players = self._new_players()
+        self._new_state()
+
         self.game_over = False
         self.selected_tile = None
         self.waiting_for_placement_choice = False
@@ -547,9 +610,8 @@ class Game:
         # COMPATIBLE: Use the board's reset method
         self.board.reset_board()
         
-        # Deal initial hands and determine starting player (will use highest double logic)
+        # Deal the first hand; the rules engine picks who opens it
         self._deal_initial_hands()
-        self.current_player_index = self._determine_starting_player() or 0
         
         # Start AI timer if first player is AI
         current_player = self.players[self.current_player_index]
@@ -559,120 +621,23 @@ class Game:
         
         print("New game started!")
 
-    def _check_game_end_conditions(self):
-        """Only handles blocked-hand resolution. A player going out is handled
-        immediately in _play_tile_and_check_scoring()."""
-        # If a hand just ended or we’re already showing Game Over, do nothing.
-        if self.round_ended or self.phase == "game_over":
-            return
-
-        # Nothing to check until the board has tiles.
-        if not self.board.tiles:
-            return
-
-        # Is the hand blocked? (nobody can play), and the boneyard is empty.
-        can_any = any(self._has_playable_move(p) for p in self.players)
-        if (not can_any) and self.boneyard.is_empty():
-            print("Game is locked! No player can make a move and boneyard is empty. Round Over.")
-            self.round_ended = True
-
-            # Winner = fewest pips
-            pip_totals = [(i, sum(t.value1 + t.value2 for t in p.hand)) for i, p in enumerate(self.players)]
-            pip_totals.sort(key=lambda x: x[1])
-            winner_idx, best_pips = pip_totals[0]
-            winner = self.players[winner_idx]
-
-            # In blocked games the next round restarts with 6|6 (classic only)
-            self.last_round_winner_index = None
-            self.blocked_game_restart = True
-
-            if not self.scoring_enabled:
-                # Race mode: blocked → fewest pips wins the WHOLE game
-                self.overlay_title = "Game Over"
-                self.overlay_lines = [
-                    "The hand is blocked.",
-                    f"Player {winner.index + 1} wins with the fewest pips ({best_pips}).",
-                    "Click anywhere to continue",
-                ]
-                self.phase = "game_over"
-                self.show_all_hands = True
-                return
-
-            # Classic mode: award points and show the hand summary
-            points = self._award_end_round_points(winner)
-            self._show_hand_result_overlay(winner, points, blocked=True)
-
-    def _award_end_round_points(self, round_winner_player):
-        """Awards points to the player who ended the round (or won a locked game) from opponents' remaining tiles."""
-        points_this_round = 0
-        
-        print(f"\n=== ROUND END POINT CALCULATION ===")
-        print(f"Round winner: Player {round_winner_player.index + 1}")
-        
-        for player in self.players:
-            if player != round_winner_player:
-                player_hand_points = 0
-                print(f"Player {player.index + 1} remaining tiles:")
-                for tile in player.hand:
-                    tile_points = tile.value1 + tile.value2
-                    player_hand_points += tile_points
-                    print(f"  {tile.value1}|{tile.value2} = {tile_points} points")
-                print(f"  Player {player.index + 1} total: {player_hand_points} points")
-                points_this_round += player_hand_points
-        
-        print(f"Total points from all opponents: {points_this_round}")
-        
-        # Round to the nearest multiple of 5
-        rounded_points = round(points_this_round / 5) * 5
-        round_winner_player.add_score(rounded_points)
-        print(f"Player {round_winner_player.index + 1} awarded {rounded_points} points!")
-        print("=== END CALCULATION ===\n")
-        return rounded_points
-
     def _end_round_and_reset_board(self):
-        """Resets the board and redeals for a new round."""
+        """Resets the board and deals the next hand."""
         print("Ending round and resetting board...")
         
-        # Collect all tiles back into all_tiles list
-        self.all_tiles = []
-        for player in self.players:
-            self.all_tiles.extend(player.hand)
-            player.hand = []
-        self.all_tiles.extend(self.board.tiles)
-        
-        if self.boneyard:
-            self.all_tiles.extend(self.boneyard.tiles)
-        
         # COMPATIBLE: Use the board's reset method
         self.board.reset_board()
         self.cached_board_total = 0
         
-        random.shuffle(self.all_tiles)
-
-        # Redeal tiles
-        hand_size = 9 if self.num_players in [2, 3] else 7
-        for player in self.players:
-            player.hand = [self.all_tiles.pop() for _ in range(hand_size)]
-        
-        self.boneyard = Boneyard(self.all_tiles)
-
-        # The round winner starts the next round and can play any tile
-        if self.last_round_winner_index is not None:
-            self.current_player_index = self.last_round_winner_index
-            self.can_start_any_tile = True  # Winner can play any tile
-            self.must_play_tile = None      # No restriction on which tile
-            print(f"Player {self.current_player_index + 1} (round winner) starts and can play any tile.")
-        else:
-            # Fallback (shouldn't happen in normal gameplay)
-            self.current_player_index = self._determine_starting_player() or 0
-            self.can_start_any_tile = False
+        # The rules engine deals and picks the opener (the last winner, or
+        # the top double's holder after a blocked hand)
+        self._deal_initial_hands()
 
         # Reset game state
         self.selected_tile = None
         self.waiting_for_placement_choice = False
         self.tile_to_place = None
         self.placement_options = []
-        self.round_ended = False  # RESET FLAG FOR NEW ROUND
         
         # Start AI timer if next player is AI
         current_player = self.players[self.current_player_index]
@@ -681,7 +646,9 @@ class Game:
             self.waiting_for_ai_delay = True
 
     def _next_turn(self):
-        self.current_player_index = (self.current_player_index + 1) % self.num_players
+        """The state has moved the turn on; follow it."""
+        self.current_player_index = self.state.current
+        self._bump_state_version()
         self.selected_tile = None
         print(f"It's now Player {self.current_player_index + 1}'s turn.")
         
@@ -691,27 +658,6 @@ class Game:
             self.ai_turn_start_time = time.time()
             self.waiting_for_ai_delay = True
 
-    def _check_for_scoring(self):
-        if not self.scoring_enabled:
-            return
-        score = self.board.get_board_ends_total()
-        self.cached_board_total = score
-        print(f"[GAME] Board total calculated as: {score}")
-
-        if score > 0 and score % 5 == 0:
-            current = self.players[self.current_player_index]
-            current.add_score(score)
-            print(f"Player {current.index + 1} scored {score} points! Total: {current.score}")
-            self._show_ai_message(f"Player {current.index + 1} scored {score} points!")
-
-            # NEW: immediate game over on 150+
-            if current.score >= 150:
-                self._show_immediate_winner_overlay(current)
-                self.overlay_lines.append("Click anywhere to return to the main menu.")
-                return  # phase is now "game_over"; keep loop running until user clicks
-        else:
-            print(f"[GAME] No scoring: {score} is not divisible by 5")
-
     # --------------------------- Human input (corner-aware) ----------------------
     
     def _handle_mouse_click(self, mouse_pos):
@@ -719,9 +665,9 @@ class Game:
 
         # --- Click-to-continue overlays ------------------------------------------
         if self.phase == "hand_summary":
-            # If someone reached 150+, show a winner announcement
-            if any(p.score >= 150 for p in self.players):
-                winner = max(self.players, key=lambda p: p.score)
+            # If the hand's points ended the game, show a winner announcement
+            if self.state.phase == 'game_over':
+                winner = self.players[self.state.winner]
                 self.overlay_title = "Game Over"
                 # inside _handle_mouse_click when phase == "hand_summary" and someone has 150+
                 self.overlay_lines = [
@@ -773,21 +719,18 @@ class Game:
                 return
 
             # Don’t allow drawing if you can already play
-            if self._has_playable_move(current_player):
+            if self._can_play():
                 self._show_ai_message("You already have a playable tile.")
                 return
 
-            drew_any = False
+            self._note_cannot_play(current_player)
             # Draw until playable or boneyard is empty
-            while (not self._has_playable_move(current_player)) and (not self.boneyard.is_empty()):
-                drawn_tile = self.boneyard.draw_tile()
-                current_player.add_tile(drawn_tile)
-                drew_any = True
-                print(f"Player {current_player.index + 1} drew a tile: ({drawn_tile.value1}, {drawn_tile.value2})")
+            while self._must_draw():
+                drawn_tile = self._draw()
                 self._show_ai_message(f"Player {current_player.index + 1} drew {drawn_tile.value1}|{drawn_tile.value2}.")
 
             # If you can play now, keep the turn (no auto-pass)
-            if self._has_playable_move(current_player):
+            if self._can_play():
                 # clear any pending UI state
                 self.selected_tile = None
                 self.waiting_for_placement_choice = False
@@ -798,19 +741,13 @@ class Game:
 
             # Boneyard empty and still no move → pass
             next_player_index = (self.current_player_index + 1) % self.num_players
-            if drew_any or self.boneyard.is_empty():
-                self._show_ai_message(
-                    f"No tiles to draw. Play passes to Player {next_player_index + 1}."
-                )
-                # clear any pending UI state, then pass
-                self.selected_tile = None
-                self.waiting_for_placement_choice = False
-                self.tile_to_place = None
-                self.placement_options = []
-                self._next_turn()
-            else:
-                # (Shouldn’t happen: drew_any False but boneyard not empty)
-                self._show_ai_message("Please draw a tile.")
+            self._show_ai_message(f"No tiles to draw. Play passes to Player {next_player_index + 1}.")
+            # clear any pending UI state, then pass
+            self.selected_tile = None
+            self.waiting_for_placement_choice = False
+            self.tile_to_place = None
+            self.placement_options = []
+            self._step(('pass',))
             return
 
         # --- Pass button ----------------------------------------------------------
@@ -819,16 +756,17 @@ class Game:
                 print("Only human players can click pass.")
                 return
 
-            if self._has_playable_move(current_player):
+            if self._can_play():
                 self._show_ai_message("You have a playable tile and cannot pass.")
                 return
 
-            if not self.boneyard.is_empty():
+            if self._must_draw():
                 # Must draw when tiles remain
                 self._show_ai_message('Please click the "Draw Tile" button')
                 return
 
             # Allowed to pass: no playable tiles and boneyard is empty
+            self._note_cannot_play(current_player)
             print(f"Player {current_player.index + 1} passed their turn.")
             next_player_index = (self.current_player_index + 1) % self.num_players
             self._show_ai_message(
@@ -836,7 +774,7 @@ class Game:
                 f"Play passes to Player {next_player_index + 1}."
             )
             self.selected_tile = None
-            self._next_turn()
+            self._step(('pass',))
             return
 
         # --- New Game button ------------------------------------------------------
@@ -936,7 +874,7 @@ class Game:
 
     def _handle_player_turn(self):
         """Handles the automatic turn logic for AI players."""
-        if self.game_over or self.waiting_for_placement_choice:
+        if self.game_over or self.waiting_for_placement_choice or self.state.phase != 'playing':
             return
 
         current_player = self.players[self.current_player_index]
@@ -953,8 +891,8 @@ class Game:
                     print(f"[DEBUG] Can play {direction} (no target tile)")
 
             # --- Special first-tile cases (unchanged) ---
-            if hasattr(self, 'must_play_tile') and self.must_play_tile and not self.board.tiles:
-                if self.must_play_tile in current_player.hand:
+            if self.must_play_tile and not self.board.tiles:
+                if current_player.has_tile(self.must_play_tile):
                     print(f"[GAME] AI must play required starting tile: ({self.must_play_tile.value1}, {self.must_play_tile.value2})")
                     self._play_tile_and_check_scoring(self.must_play_tile, ('center', None, None), current_player)
                     return
@@ -970,122 +908,161 @@ class Game:
                             best_score = tile_score
                             best_starting_tile = tile
                     if best_starting_tile:
-                        print(f"[GAME] AI (last round winner) strategically selected starting tile ({best_starting_tile.value1}, {best_starting_tile.value2})")
+                        print(f"[GAME] AI strategically selected starting tile ({best_starting_tile.value1}, {best_starting_tile.value2})")
                         self._play_tile_and_check_scoring(best_starting_tile, ('center', None, None), current_player)
                         return
 
-            # --- MAIN STRATEGIC LOGIC with loop guard (unchanged) ---
-            tried = set()  # (tile_id, direction, target_id)
-            max_attempts = max(4, len(current_player.hand) * 4)
+            # --- MAIN STRATEGIC LOGIC: walk down the ranked moves ---
+            move_order = self._ai_move_order(current_player)
+            if move_order:
+                tried = set()  # (tile_id, direction, target_id)
+                for tile_to_play, option in move_order:
+                    direction, target_tile, _ = option
+                    move_key = (id(tile_to_play), direction, id(target_tile) if target_tile else 0)
+                    if move_key in tried:
+                        continue
+                    tried.add(move_key)
 
-            attempts = 0
-            while attempts < max_attempts:
-                attempts += 1
+                    print(f"[GAME] AI trying tile ({tile_to_play.value1}, {tile_to_play.value2}) {direction}")
+                    if self._play_tile_and_check_scoring(tile_to_play, option, current_player):
+                        return  # Success ends AI's turn
+                    print("[GAME] Move failed to place, trying the next one")
 
-                best_strategic_move = self.board.get_best_strategic_move(current_player.hand)
-                if not best_strategic_move:
-                    print("[GAME] No strategic move found, falling back to random selection")
-                    break
+                raise RuntimeError("[GAME] The rules engine refused every move the board offered")
 
-                direction, target_tile, connection_value = best_strategic_move
-
-                # Find a tile that matches this exact move and verify its option exists
-                selected_tile = None
-                for tile in current_player.hand:
-                    if connection_value in (tile.value1, tile.value2):
-                        # Strategy may be runway-only; we verify with standard options first
-                        tile_options = self.board.get_valid_placement_options(tile)
-                        for tile_direction, tile_target, tile_value in tile_options:
-                            if (tile_direction == direction and tile_target == target_tile and tile_value == connection_value):
-                                selected_tile = tile
-                                break
-                    if selected_tile:
-                        break
-
-                move_key = (id(selected_tile) if selected_tile else None,
-                            direction,
-                            id(target_tile) if target_tile else 0)
-
-                if selected_tile is None:
-                    # Strategy pointed to something we can't actually execute; exit to fallback
-                    print("[GAME] Could not match a tile for the strategic move; falling back")
-                    break
+            if self._can_play():
+                raise RuntimeError("[GAME] The board shows no move the rules engine allows")
 
-                if move_key in tried:
-                    # We already tried this exact placement and it failed—avoid looping
-                    print("[GAME] Already tried this strategic placement; breaking to fallback")
-                    break
+            # No playable tiles → draw until playable or empty, else pass
+            self._note_cannot_play(current_player)
+            if self._must_draw():
+                # Keep drawing until a move exists or the boneyard is empty
+                while self._must_draw():
+                    self._draw()
+                    self._show_ai_message(f"Player {current_player.index + 1} drew a tile from the boneyard.")
 
-                print(f"[GAME] AI using strategic move: tile ({selected_tile.value1}, {selected_tile.value2}) {direction}")
-                if self._play_tile_and_check_scoring(selected_tile, best_strategic_move, current_player):
-                    return  # Success ends AI's turn
-                else:
-                    print("[GAME] Strategic move failed to place, will try a different option")
-                    tried.add(move_key)
-                    continue  # Ask strategy again; if it returns the same, the guard will break
+                # If drawing produced a legal move, let the AI act on its next tick
+                if self._can_play():
+                    return  # stay on same player's turn; next call will try to play
 
-            # --- FALLBACK: try any playable tile/options (CORNER-AWARE) ---
-            playable_tiles = []
-            for tile in current_player.hand:
-                options = self.board.get_valid_placement_options(tile, require_runway=False)
-                if options:
-                    playable_tiles.append((tile, options))
-
-            if playable_tiles:
-                placement_succeeded = False
-
-                for tile_to_play, placement_options in playable_tiles:
-                    if placement_succeeded:
-                        break
-
-                    for chosen_option in placement_options:
-                        print(f"[GAME] AI trying fallback tile ({tile_to_play.value1}, {tile_to_play.value2}) with option {chosen_option}")
-                        if self._play_tile_and_check_scoring(tile_to_play, chosen_option, current_player):
-                            placement_succeeded = True
-                            break
-                        else:
-                            print(f"[GAME] AI failed to place fallback tile ({tile_to_play.value1}, {tile_to_play.value2})")
-
-                if not placement_succeeded:
-                    print("[GAME] AI failed to place any tile with any option")
-                    self._next_turn()
+                # Still no move (boneyard must be empty or all draws unplayable) → pass
+                print("[GAME] AI still no moves after drawing, passing")
             else:
-                # No playable tiles → draw until playable or empty, else pass
-                if not playable_tiles:
-                    if not self.boneyard.is_empty():
-                        drew_any = False
-                        # Keep drawing until a move exists or the boneyard is empty
-                        while (not any(self.board.get_valid_placement_options(t, require_runway=False)
-                                       for t in current_player.hand)) and (not self.boneyard.is_empty()):
-                            drawn_tile = self.boneyard.draw_tile()
-                            current_player.add_tile(drawn_tile)
-                            drew_any = True
-                            print(f"[GAME] AI drew a tile: ({drawn_tile.value1}, {drawn_tile.value2})")
-                            self._show_ai_message(f"Player {current_player.index + 1} drew a tile from the boneyard.")
-
-                        # If drawing produced a legal move, let the AI act on its next tick
-                        if any(self.board.get_valid_placement_options(t, require_runway=False) for t in current_player.hand):
-                            return  # stay on same player's turn; next call will try to play
-
-                        # Still no move (boneyard must be empty or all draws unplayable) → pass
-                        print("[GAME] AI still no moves after drawing, passing")
-                        next_player_index = (self.current_player_index + 1) % self.num_players
-                        self._show_ai_message(
-                            f"Player {current_player.index + 1} cannot play. Play passes to Player {next_player_index + 1}."
-                        )
-                        self._next_turn()
-                    else:
-                        print("[GAME] AI cannot play and boneyard is empty, passing")
-                        next_player_index = (self.current_player_index + 1) % self.num_players
-                        self._show_ai_message(
-                            f"Player {current_player.index + 1} cannot play. Play passes to Player {next_player_index + 1}."
-                        )
-                        self._next_turn()
-                else:
-                    print("[GAME] AI cannot play and boneyard is empty, passing")
-                    next_player_index = (self.current_player_index + 1) % self.num_players
-                    self._show_ai_message(f"Player {current_player.index + 1} cannot play. Play passes to Player {next_player_index + 1}.")
-                    self._next_turn()
+                print("[GAME] AI cannot play and boneyard is empty, passing")
+            next_player_index = (self.current_player_index + 1) % self.num_players
+            self._show_ai_message(
+                f"Player {current_player.index + 1} cannot play. Play passes to Player {next_player_index + 1}."
+            )
+            self._step(('pass',))
+
+    def _ai_move_order(self, player):
+        """
+        Every legal (tile, placement option) for the AI, in the order to try
+        them: the search engine's pick first (if one is in use), then all moves
+        ranked by the greedy scorer. Empty if the AI cannot play.
+        Uses the background search for this turn if one was started (see
+        _ai_ready); if none was, or it ran out of time, the greedy order is
+        all there is.
+        """
+        start = time.perf_counter()
+        moves = self._moves_this_turn(player)
+        ranked = [(tile, option) for tile, option, _ in self.board.ranked_moves(player.hand, moves=moves)]
+        if not ranked:
+            return []
+
+        used = None           # how long this turn's search ran, if there was one
+        plan = self._engine_plan(player, moves)
+        if plan:
+            engine, spec, candidates, choices = plan
+            status = self.ai_worker.status(self._ai_turn_key(player))
+            if status is not None:
+                used = self.ai_worker.last_time
+            if status == 'done':
+                ranked.insert(0, choices[self.ai_worker.result])
+        self._report_ai_time(player, time.perf_counter() - start if used is None else used)
+        return ranked
+
+    def _report_ai_time(self, player, used):
+        level = self.ai_levels[player.index]
+        label, budget = AI_LEVELS[level]
+        self.ai_time_used[player.index] += used
+        print(f"[AI] Player {player.index + 1} ({label}) used {used:.2f}s of its {budget:.2f}s budget")
+
+    def _engine_plan(self, player, moves):
+        """
+        (engine, spec, candidates, choices) when the player's AI level has a
+        search engine (LookaheadAI, MonteCarloAI, EndgameSolver) to pick among
+        `moves`, else None for greedy.
+        """
+        if not moves:
+            return None
+        level = self.ai_levels[player.index]
+        engine = self.ai_engines[level]
+        if not engine:
+            return None
+        spec = self._visible_state(player)
+        if level == "exact" and self.endgame.applies(spec):
+            engine = self.endgame
+        candidates, choices = [], []
+        for tile, direction, target_tile, end_value in moves:
+            _, index, arm, _ = self._engine_action(tile, (direction, target_tile, end_value))
+            if self.board.tiles and arm is None:
+                continue
+            candidates.append((index, arm, end_value))
+            choices.append((tile, (direction, target_tile, end_value)))
+        if not candidates:
+            return None
+        return engine, spec, candidates, choices
+
+    def _ai_turn_key(self, player):
+        return (self.state_version, player.index)
+
+    def _moves_this_turn(self, player):
+        """board.moves_for_hand(player.hand), worked out once per turn and shared by ranking and search."""
+        key = self._ai_turn_key(player)
+        if self._turn_moves[0] != key:
+            self._turn_moves = (key, self.board.moves_for_hand(player.hand))
+        return self._turn_moves[1]
+
+    def _ai_ready(self, player):
+        """
+        Called every frame of an AI turn: starts its search in the background
+        on the first one, then reports whether the move can be played yet.
+        Greedy turns, forced openings and turns with one legal move are
+        always ready.
+        """
+        key = self._ai_turn_key(player)
+        if key == self._greedy_turn_key:
+            return True
+        status = self.ai_worker.status(key)
+        if status is None:
+            plan = None if self._opening_decided(player) else \
+                self._engine_plan(player, self._moves_this_turn(player))
+            if plan is None or len(plan[2]) == 1:
+                self._greedy_turn_key = key
+                return True
+            engine, spec, candidates, _ = plan
+            self.ai_worker.start(key, engine, spec, candidates,
+                                 budget=AI_LEVELS[self.ai_levels[player.index]][1])
+            status = self.ai_worker.status(key)
+        return status != 'thinking'
+
+    def _opening_decided(self, player):
+        """Does _handle_player_turn pick `player`'s opening tile without a search?"""
+        if self.board.tiles:
+            return False
+        if self.must_play_tile:
+            return player.has_tile(self.must_play_tile)
+        return self.can_start_any_tile
+
+    def _shutdown_ai(self):
+        """The game loop is done: drop any search still running and stop the sampling processes."""
+        self.ai_worker.cancel()
+        MonteCarloAI.shutdown()
+
+    def _visible_state(self, player):
+        """What `player` can see, as the plain dict MonteCarloAI works from."""
+        return visible_spec(self.state, player.index, self.inference.impossible)
 
     # -------------------------- Messaging & overlays ----------------------------
 
@@ -1155,6 +1132,13 @@ class Game:
             text_total = self.font.render(f"Board Total: {self.cached_board_total}", True, (255, 255, 255))
             self.screen.blit(text_total, (10, 10 + text_player.get_height() + 5))
 
+        if self.ai_worker.thinking():
+            dots = "." * (1 + int(time.time() * 3) % 3)
+            label = AI_LEVELS[self.ai_levels[current_player.index]][0]
+            text_thinking = self.font.render(f"Player {current_player.index + 1} ({label}) is thinking{dots}",
+                                             True, (255, 255, 160))
+            self.screen.blit(text_thinking, (10, 10 + 2 * (text_player.get_height() + 5)))
+
     def _draw_buttons(self):
         # Draw "Draw Tile" button
         pygame.draw.rect(self.screen, (0, 150, 0), self.draw_button_rect)
@@ -1244,7 +1228,7 @@ class Game:
     def draw_back_of_hand(self, screen, play_area_rect, player_index, *, show_score=True):
         """
         Draw the back of a player's hand around the play area.
-        player_index: 0=bottom, 1=left, 2=top, 3=right
+        player_index: seat 0=bottom, 1=left, 2=top, 3=right (4-7 share those sides)
         show_score: when False (Race mode), the 'Score:' label is hidden
         """
         import os
@@ -1289,7 +1273,8 @@ class Game:
             score_val = getattr(self.players[player_index], "score", 0)
             score_surf = font_scr.render(f"Score: {score_val}", True, (255, 215, 0))
 
-        num = len(self.players[player_index].hand)
+        player = self.players[player_index]
+        num = len(player.hand)
         sw, sh = screen.get_width(), screen.get_height()
 
         # helpers
@@ -1317,35 +1302,32 @@ class Game:
                 screen.blit(ns, (x_left, top))
                 return ns.get_width()
 
-        # --- positions by side ---
-        if player_index == 0:
+        # --- positions by side (seats past the fourth share a side) ---
+        if player.seat == 0:
             # bottom (human)
             y = play_area_rect.bottom + gap_from_area
-            total_w = max(0, num * tw + max(0, num - 1) * spacing)
-            start_x = play_area_rect.centerx - total_w // 2
+            start_x, step, total_w = player.hand_run(play_area_rect.left, play_area_rect.width, num, tw, spacing)
             for i in range(num):
-                screen.blit(back, (start_x + i * (tw + spacing), y))
-            blit_h_center(play_area_rect.centerx, y + th + 6)
+                screen.blit(back, (start_x + i * step, y))
+            blit_h_center(start_x + total_w // 2, y + th + 6)
 
-        elif player_index == 2:
+        elif player.seat == 2:
             # top
             y = play_area_rect.top - th - gap_from_area
-            total_w = max(0, num * tw + max(0, num - 1) * spacing)
-            start_x = play_area_rect.centerx - total_w // 2
-            blit_h_center(play_area_rect.centerx, y - name_surf.get_height() - 6)
+            start_x, step, total_w = player.hand_run(play_area_rect.left, play_area_rect.width, num, tw, spacing)
+            blit_h_center(start_x + total_w // 2, y - name_surf.get_height() - 6)
             for i in range(num):
-                screen.blit(back, (start_x + i * (tw + spacing), y))
+                screen.blit(back, (start_x + i * step, y))
 
-        elif player_index == 1:
+        elif player.seat == 1:
             # left (vertical)
             w, h = back_left.get_width(), back_left.get_height()
-            total_h = max(0, num * h + max(0, num - 1) * spacing)
-            start_y = play_area_rect.centery - total_h // 2
+            start_y, step, total_h = player.hand_run(play_area_rect.top, play_area_rect.height, num, h, spacing)
 
             # Tiles stack to the left of play area
             tiles_x = play_area_rect.left - gap_from_area - w
             for i in range(num):
-                screen.blit(back_left, (tiles_x, start_y + i * (h + spacing)))
+                screen.blit(back_left, (tiles_x, start_y + i * step))
 
             # Rotated label widths (to right-align against the tiles)
             r_name = pygame.transform.rotate(name_surf, 90)
@@ -1357,17 +1339,16 @@ class Game:
 
             # Put text between the screen edge and tiles; clamp to screen (≥8px)
             text_x = max(8, tiles_x - gap_text_to_tiles - max_text_w)
-            blit_v_stack(text_x, play_area_rect.centery, 90)
+            blit_v_stack(text_x, start_y + total_h // 2, 90)
 
         else:
             # right (vertical)
             w, h = back_right.get_width(), back_right.get_height()
-            total_h = max(0, num * h + max(0, num - 1) * spacing)
-            start_y = play_area_rect.centery - total_h // 2
+            start_y, step, total_h = player.hand_run(play_area_rect.top, play_area_rect.height, num, h, spacing)
 
             tiles_x = play_area_rect.right + gap_from_area
             for i in range(num):
-                screen.blit(back_right, (tiles_x, start_y + i * (h + spacing)))
+                screen.blit(back_right, (tiles_x, start_y + i * step))
 
             # Rotated label widths to clamp into the right margin
             r_name = pygame.transform.rotate(name_surf, 270)
@@ -1379,7 +1360,7 @@ class Game:
 
             # Place text to the right of tiles; clamp so it fits on-screen (≤ sw-8)
             text_x = min(sw - max_text_w - 8, tiles_x + w + gap_text_to_tiles)
-            blit_v_stack(text_x, play_area_rect.centery, 270)
+            blit_v_stack(text_x, start_y + total_h // 2, 270)
             
     def _blit_player_caption(self, surface, x, y, player_index, *, rotate=None):
         """Draws 'Player N' and (optionally) 'Score: S' depending on game mode."""
@@ -1422,7 +1403,7 @@ class Game:
         self.overlay_title = "Hand Result"
         if blocked:
             line1 = f"Player {winner.index + 1} wins blocked hand (lowest pips)."
-            next_line = "Player holding 6|6 plays first in the next hand"
+            next_line = f"Player holding {self.max_pip}|{self.max_pip} plays first in the next hand"
         else:
             line1 = f"Player {winner.index + 1} played their last tile."
             next_line = f"Player {winner.index + 1} plays first in the next hand"
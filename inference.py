@@ -0,0 +1,37 @@
+# inference.py — what each player's hidden hand cannot contain
+from bitboard import PIP_MASKS, full_mask
+
+
+class HandInference:
+    """
+    Per seat, a bitboard mask of tiles the player is known not to hold,
+    learned from public events: a player who passes or has to draw holds no
+    tile showing any of the open-end pips at that moment.
+
+    Drawing brings in tiles nobody else has seen, so a draw replaces what we
+    knew with just the current ends (the tiles they keep from the draw were
+    unplayable too, and the one that finally fits gets played at once). A
+    pass adds to it.
+    """
+
+    def __init__(self, num_players, max_pip=6):
+        self.num_players = num_players
+        self.set_mask = full_mask(max_pip)
+        self.reset()
+
+    def reset(self):
+        """New hand: nothing is known yet."""
+        self.impossible = [0] * self.num_players
+
+    def cannot_play(self, seat, end_pips, drawing):
+        """`seat` had no tile for any of `end_pips` and is about to draw (or pass)."""
+        mask = 0
+        for pip in set(end_pips):
+            if pip is not None:
+                mask |= PIP_MASKS[pip]
+        mask &= self.set_mask
+        if drawing:
+            self.impossible[seat] = mask
+        else:
+            self.impossible[seat] |= mask
+        print(f"[INFER] Player {seat + 1} holds no {sorted(p for p in set(end_pips) if p is not None)}")
@@ -0,0 +1,234 @@
+# layout.py — lane ("snake") routes for the arms of the board
+from position import OPPOSITE, SIDES
+
+# Pinwheel: each arm leaves the hub straight, then snakes back and forth in
+# lanes through the quadrant clockwise from it, stepping toward TURNS[arm]
+# at the end of every lane. The four quadrants never overlap.
+TURNS = {'right': 'bottom', 'bottom': 'left', 'left': 'top', 'top': 'right'}
+SIGN = {'left': -1, 'top': -1, 'right': 1, 'bottom': 1}
+
+
+def _far_edge(rect, direction):
+    x, y, w, h = rect
+    return {'left': x, 'top': y, 'right': x + w, 'bottom': y + h}[direction]
+
+
+def _center(rect, direction):
+    """Centre of rect along the axis `direction` runs on."""
+    x, y, w, h = rect
+    return x + w // 2 if direction in ('left', 'right') else y + h // 2
+
+
+class LayoutPlanner:
+    """
+    Decides where the next tile on an arm goes. The hub (the opening tile,
+    or the spinner once there is one) always sits at the centre of the play
+    area, so the routes only depend on the play-area size and tile size and
+    are cached on the class. Each arm keeps a small cursor, so placing a
+    tile is a geometry-table lookup plus a couple of comparisons, and tiles
+    on different routes can't overlap.
+
+    A route is (lane_direction, turn_direction, limits), where limits maps a
+    direction to how far a tile travelling that way may reach. Lanes stop
+    half a tile short of their limit so the tile that turns the corner still
+    fits.
+    """
+
+    _routes_cache = {}
+    _capacity_cache = {}
+
+    def __init__(self, play_area_rect, geometry, tile_width, tile_height, spacing):
+        self.area = (play_area_rect.left, play_area_rect.top,
+                     play_area_rect.right, play_area_rect.bottom)
+        self.hub_center = ((self.area[0] + self.area[2]) // 2, (self.area[1] + self.area[3]) // 2)
+        self.geometry = geometry
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.spacing = spacing
+        self.cursors = {}   # arm -> cursor dict
+
+    def reset(self):
+        self.cursors = {}
+
+    # ---------- routes ----------
+
+    def _key(self):
+        return (self.area, self.tile_width, self.tile_height, self.spacing)
+
+    def routes(self):
+        routes = self._routes_cache.get(self._key())
+        if routes is None:
+            routes = self._routes_cache[self._key()] = self._build_routes(*self.hub_center)
+        return routes
+
+    def _build_routes(self, cx, cy):
+        left, top, right, bottom = self.area
+        overhang = self.tile_width // 2
+        # Lanes that double back stop short of the hub's row/column: half a
+        # double across it, the gap, and room for a corner tile's overhang.
+        clear = self.tile_height // 2 + self.spacing + overhang
+        far = {'left': left + overhang, 'top': top + overhang,
+               'right': right - overhang, 'bottom': bottom - overhang}
+        back = {'left': cx + clear, 'top': cy + clear, 'right': cx - clear, 'bottom': cy - clear}
+        edge = {'left': left, 'top': top, 'right': right, 'bottom': bottom}
+        return {
+            arm: (arm, TURNS[arm], {arm: far[arm], OPPOSITE[arm]: back[OPPOSITE[arm]], TURNS[arm]: edge[TURNS[arm]]})
+            for arm in TURNS
+        }
+
+    def _new_cursor(self, route):
+        lane, turn, _ = route
+        return {
+            'route': route,
+            'tiles': 0,            # tiles placed on the route so far
+            'lane': lane,          # direction the current lane runs
+            'lanes': 0,            # lanes finished so far
+            'turning': False,      # between lanes, heading toward the turn side
+            # how far the current lane reaches toward the turn side
+            'extent': self.hub_center[0] if turn in ('left', 'right') else self.hub_center[1],
+            'corner': None,        # how far the last tile heading toward the turn side reaches
+        }
+
+    def hub_rect(self, is_double):
+        """(x, y, w, h) of the hub: a double stands upright, any other tile lies across."""
+        cx, cy = self.hub_center
+        w, h = (self.tile_width, self.tile_height) if is_double else (self.tile_height, self.tile_width)
+        return (cx - w // 2, cy - h // 2, w, h)
+
+    def start(self, is_spinner):
+        """Open routes off the hub: four arms for a spinner, left/right for a plain tile."""
+        routes = self.routes()
+        arms = SIDES if is_spinner else ('left', 'right')
+        self.cursors = {arm: self._new_cursor(routes[arm]) for arm in arms}
+
+    def fits(self, hub_is_double, arms):
+        """
+        Would every arm fit its route, with arms mapping each arm to its
+        tiles going outward as (is_double, matches_value1)? Plans the tiles
+        without placing any.
+        """
+        routes = self.routes()
+        for arm, tiles in arms.items():
+            cursor, target = self._new_cursor(routes[arm]), self.hub_rect(hub_is_double)
+            for is_double, matches_value1 in tiles:
+                placement = self.plan(cursor, is_double, matches_value1, target)
+                if placement is None:
+                    return False
+                target = placement[1:5]
+                self.advance(cursor, placement[5], target)
+        return True
+
+    def capacity(self):
+        """
+        Fewest tiles any arm's route is sure to hold, whatever the hub is:
+        regular tiles all the way (doubles are shorter along a lane) in lanes
+        as wide as a double across them. Cached like the routes.
+        """
+        fewest = self._capacity_cache.get(self._key())
+        if fewest is None:
+            fewest = self._capacity_cache[self._key()] = self._fewest_tiles()
+        return fewest
+
+    def _fewest_tiles(self):
+        routes = self.routes()
+        fewest = None
+        for hub_is_double, arms in ((False, ('left', 'right')), (True, SIDES)):
+            for arm in arms:
+                cursor, target = self._new_cursor(routes[arm]), self.hub_rect(hub_is_double)
+                while True:
+                    placement = self.plan(cursor, False, True, target)
+                    if placement is None:
+                        break
+                    target = placement[1:5]
+                    # Any lane may hold a double across it, so count every lane that wide
+                    lane_tile = placement[5] != cursor['route'][1]
+                    self.advance(cursor, placement[5], self._across(target, placement[5]) if lane_tile else target)
+                if fewest is None or cursor['tiles'] < fewest:
+                    fewest = cursor['tiles']
+        return fewest
+
+    # ---------- stepping ----------
+
+    def plan(self, cursor, is_double, matches_value1, target_rect):
+        """
+        (rotation, x, y, w, h, direction) for the next tile on this cursor's
+        route, placed off target_rect, or None if the route has run out of room.
+        """
+        _, turn, limits = cursor['route']
+        lane = cursor['lane']
+
+        if not cursor['turning']:
+            placement = self._candidate(is_double, lane, matches_value1, target_rect)
+            if self._fits(placement, lane, limits[lane]):
+                return placement
+            if not cursor['tiles']:
+                return None     # the hub's other sides belong to other arms
+        else:
+            next_lane = OPPOSITE[lane]
+            if self._lane_clear(cursor, turn, limits[turn], target_rect):
+                placement = self._candidate(is_double, next_lane, matches_value1, target_rect)
+                if self._fits(placement, next_lane, limits[next_lane]):
+                    return placement
+
+        placement = self._candidate(is_double, turn, matches_value1, target_rect)
+        if self._fits(placement, turn, limits[turn]):
+            return placement
+        return None
+
+    def peek_direction(self, cursor, target_rect):
+        """Direction the next regular tile (or, failing that, a double) would take."""
+        for is_double in (False, True):
+            placement = self.plan(cursor, is_double, True, target_rect)
+            if placement is not None:
+                return placement[5]
+        return None
+
+    def advance(self, cursor, direction, rect):
+        """Move the cursor past a tile placed at rect, heading `direction`."""
+        cursor['tiles'] += 1
+        turn = cursor['route'][1]
+        edge = _far_edge(rect, turn)
+        if direction == turn:
+            cursor['turning'] = True
+            cursor['corner'] = edge
+            return
+        if direction != cursor['lane']:
+            # First tile of a new lane; the corner tile it leaves from can
+            # reach further toward the turn side than the lane itself
+            cursor['lane'] = direction
+            cursor['lanes'] += 1
+            cursor['turning'] = False
+            cursor['extent'] = cursor['corner']
+        cursor['extent'] = max(cursor['extent'], edge) if SIGN[turn] > 0 else min(cursor['extent'], edge)
+
+    def _candidate(self, is_double, direction, matches_value1, target_rect):
+        rotation, w, h, fx, ox, fy, oy = self.geometry[is_double, direction, matches_value1]
+        tx, ty, tw, th = target_rect
+        return (rotation, tx + tw * fx // 2 + ox, ty + th * fy // 2 + oy, w, h, direction)
+
+    def _across(self, rect, direction):
+        """Rect of a double lying across a lane that runs `direction`, centred on rect."""
+        x, y, w, h = rect
+        cx, cy = x + w // 2, y + h // 2
+        w, h = (self.tile_width, self.tile_height) if direction in ('left', 'right') else \
+            (self.tile_height, self.tile_width)
+        return (cx - w // 2, cy - h // 2, w, h)
+
+    def _fits(self, placement, direction, limit):
+        """Inside the play area, and not past `limit` in the direction of travel."""
+        _, x, y, w, h, _ = placement
+        left, top, right, bottom = self.area
+        if x < left or y < top or x + w > right or y + h > bottom:
+            return False
+        return SIGN[direction] * (limit - _far_edge((x, y, w, h), direction)) >= 0
+
+    def _lane_clear(self, cursor, turn, turn_limit, target_rect):
+        """
+        Can a new lane start level with target_rect? Its widest tile (a double
+        across the lane) must clear the last lane and stay inside the limit.
+        """
+        center = _center(target_rect, turn)
+        half = self.tile_height // 2
+        sign = SIGN[turn]
+        return (sign * (center - cursor['extent']) >= half + self.spacing and
+                sign * (turn_limit - center) >= half)
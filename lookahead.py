@@ -0,0 +1,76 @@
+# lookahead.py — one move of lookahead for the mid-level AI
+import time
+
+from bitboard import TILE_PIPS, full_mask
+from engine import legal_moves, points_for_total
+from position import BoardPosition
+
+DOMINO_VALUE = 1000     # going out beats any score a move can make
+
+
+class LookaheadAI:
+    """
+    Scores each candidate by what it makes now minus the best reply the next
+    player could have, looking only at tiles they might hold (unseen, and
+    not ruled out by spec['impossible']). In race mode a move is better when
+    it leaves the next player nothing to play. Heavier tiles break ties.
+    Takes the same `spec`/candidates as MonteCarloAI; candidates it had no
+    time to finish before `time_budget` ran out are not chosen (the first
+    one is always finished).
+    """
+
+    def __init__(self, time_budget=0.25):
+        self.time_budget = time_budget
+        self.last_time = 0.0
+
+    def choose(self, spec, candidates):
+        if not candidates:
+            return None
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        scoring = spec['scoring_enabled']
+        me = spec['seat']
+        n = len(spec['hand_counts'])
+        nxt = (me + 1) % n
+        impossible = spec.get('impossible') or [0] * n
+        unseen = full_mask(spec['max_pip']) & ~(spec['hand'] | spec['played'])
+        their_tiles = unseen & ~impossible[nxt] if spec['hand_counts'][nxt] else 0
+
+        position = BoardPosition(spec['scoring_mode'])
+        root = spec['position']
+        values = []
+        for index, arm, connection_value in candidates:
+            if values and time.perf_counter() > deadline:
+                break
+            position.restore((root[0], root[1], dict(root[2])) + tuple(root[3:]))
+            a, b = TILE_PIPS[index]
+            position.place(arm, a, b, connection_value)
+
+            if spec['hand'] == 1 << index:
+                values.append(DOMINO_VALUE)
+                continue
+            replies = legal_moves(position, their_tiles)
+            if scoring:
+                reply = self._best_reply(position, replies, deadline if values else None)
+                if reply is None:
+                    break
+                value = points_for_total(position.total) - reply
+            else:
+                value = 0 if replies else 1
+            values.append(value + (a + b) / 100)
+
+        best = max(range(len(values)), key=lambda i: values[i])
+        self.last_time = time.perf_counter() - start
+        print(f"[LOOKAHEAD] {len(values)}/{len(candidates)} moves in {self.last_time * 1000:.1f} ms; "
+              f"best value {values[best]:.2f}")
+        return best
+
+    @staticmethod
+    def _best_reply(position, replies, deadline):
+        """Most points any of `replies` scores, or None if `deadline` passes first."""
+        best = 0
+        for count, (r_index, r_arm, r_value) in enumerate(replies):
+            if deadline and not count & 15 and time.perf_counter() > deadline:
+                return None
+            best = max(best, points_for_total(position.projected_total(r_arm, *TILE_PIPS[r_index], r_value)))
+        return best
@@ -2,7 +2,9 @@
 import asyncio
 import os
 import pygame
+from engine import DOMINO_SETS, MAX_PLAYERS
 from game import Game
+from policies import AI_LEVELS
 
 # ---------------- Window / bootstrap ----------------
 def initialize_maximized_game():
@@ -32,18 +34,29 @@ async def show_starting(screen, text):
         pygame.display.flip()
         await asyncio.sleep(0)
 
+async def ask_domino_set(screen):
+    """Pick the domino set by its highest double. Returns 6/9/12/15 or None if closed."""
+    return await _pick_option(screen, "Select Domino Set",
+                              [(f"{name} ({pip}|{pip})", pip) for pip, name in DOMINO_SETS.items()])
+
 async def show_player_select(screen):
-    """Pick number of players (2–4). Returns int or None if window closed."""
+    """Pick number of players (2–8). Returns int or None if window closed."""
+    return await _pick_option(screen, "Select Number of Players",
+                              [(f"{n} Players", n) for n in range(2, MAX_PLAYERS + 1)])
+
+async def _pick_option(screen, heading, opts):
+    """Menu of (label, value) buttons, four to a column. Returns a value or None if closed."""
     font = pygame.font.SysFont(None, 48)
     big  = pygame.font.SysFont(None, 60)
 
-    opts = [("2 Players", 2), ("3 Players", 3), ("4 Players", 4)]
     buttons = []
     sw, sh = screen.get_width(), screen.get_height()
+    columns = (len(opts) + 3) // 4
 
     for i, (label, val) in enumerate(opts):
         surf = font.render(label, True, (255, 255, 255))
-        rect = surf.get_rect(center=(sw // 2, sh // 2 - 60 + i * 80))
+        col_x = sw // 2 + (i // 4 - (columns - 1) / 2) * 260
+        rect = surf.get_rect(center=(int(col_x), sh // 2 - 60 + (i % 4) * 80))
         buttons.append((surf, rect, val))
 
     while True:
@@ -58,7 +71,7 @@ async def show_player_select(screen):
                         return val
 
         screen.fill((0, 100, 150))
-        title = big.render("Select Number of Players", True, (255, 255, 0))
+        title = big.render(heading, True, (255, 255, 0))
         screen.blit(title, title.get_rect(center=(sw // 2, sh // 2 - 140)))
 
         for surf, rect, _ in buttons:
@@ -69,15 +82,34 @@ async def show_player_select(screen):
         await asyncio.sleep(0)  # yield
 
 async def ask_human_players(screen, total_players):
-    """Pick how many humans (0..total_players). Returns int or None if closed."""
+    """
+    Pick how many humans (0..total_players) and the AI level of every other
+    seat (click a seat to cycle through AI_LEVELS). Returns
+    (num_humans, levels per seat) or None if closed.
+    """
     font = pygame.font.SysFont(None, 48)
     small = pygame.font.SysFont(None, 32)
     sw, sh = screen.get_width(), screen.get_height()
 
+    level_names = list(AI_LEVELS)
+    num_humans = 1
+    levels = [level_names[0]] * total_players
+
     btn_w, btn_h, gap = 60, 50, 18
     total_w = total_players * (btn_w + gap) + btn_w
     start_x = (sw - total_w) // 2
-    y = sh // 2 + 30
+    y = sh // 2 - 110
+
+    seat_w, seat_h = 300, 44
+    columns = (total_players + 3) // 4
+    seat_rects = []
+    for i in range(total_players):
+        r = pygame.Rect(0, 0, seat_w, seat_h)
+        r.center = (int(sw // 2 + (i // 4 - (columns - 1) / 2) * (seat_w + 30)),
+                    y + 110 + (i % 4) * (seat_h + 14))
+        seat_rects.append(r)
+    start_rect = pygame.Rect(0, 0, 200, 56)
+    start_rect.center = (sw // 2, y + 110 + 4 * (seat_h + 14) + 30)
 
     while True:
         for ev in pygame.event.get():
@@ -85,24 +117,47 @@ async def ask_human_players(screen, total_players):
                 return None
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
                 return None
+            if ev.type == pygame.KEYDOWN and ev.key in (pygame.K_RETURN, pygame.K_SPACE):
+                return num_humans, levels
             if ev.type == pygame.MOUSEBUTTONDOWN:
                 for i in range(total_players + 1):
                     r = pygame.Rect(start_x + i * (btn_w + gap), y, btn_w, btn_h)
                     if r.collidepoint(ev.pos):
-                        return i
+                        num_humans = i
+                for i, r in enumerate(seat_rects):
+                    if i >= num_humans and r.collidepoint(ev.pos):
+                        levels[i] = level_names[(level_names.index(levels[i]) + 1) % len(level_names)]
+                if start_rect.collidepoint(ev.pos):
+                    print(f"[UI] {num_humans} human(s); AI levels {levels[num_humans:]}")
+                    return num_humans, levels
 
         screen.fill((50, 50, 120))
         title = font.render(f"How many human players? (0–{total_players})", True, (255, 255, 255))
-        hint  = small.render("Remaining seats will be AI", True, (210, 210, 210))
-        screen.blit(title, title.get_rect(center=(sw // 2, sh // 2 - 60)))
-        screen.blit(hint,  hint.get_rect(center=(sw // 2, sh // 2 - 20)))
+        hint  = small.render("Remaining seats will be AI; click a seat to change its level", True, (210, 210, 210))
+        screen.blit(title, title.get_rect(center=(sw // 2, y - 90)))
+        screen.blit(hint,  hint.get_rect(center=(sw // 2, y - 45)))
 
         for i in range(total_players + 1):
             r = pygame.Rect(start_x + i * (btn_w + gap), y, btn_w, btn_h)
-            pygame.draw.rect(screen, (230, 230, 230), r, border_radius=8)
+            color = (255, 220, 90) if i == num_humans else (230, 230, 230)
+            pygame.draw.rect(screen, color, r, border_radius=8)
             num = small.render(str(i), True, (0, 0, 0))
             screen.blit(num, num.get_rect(center=r.center))
 
+        for i, r in enumerate(seat_rects):
+            if i < num_humans:
+                label, color = f"Player {i + 1}: Human", (90, 90, 140)
+            else:
+                name, budget = AI_LEVELS[levels[i]]
+                label, color = f"Player {i + 1}: {name} AI ({budget:g}s)", (30, 120, 60)
+            pygame.draw.rect(screen, color, r, border_radius=8)
+            txt = small.render(label, True, (255, 255, 255))
+            screen.blit(txt, txt.get_rect(center=r.center))
+
+        pygame.draw.rect(screen, (200, 120, 30), start_rect, border_radius=10)
+        txt = small.render("Continue", True, (255, 255, 255))
+        screen.blit(txt, txt.get_rect(center=start_rect.center))
+
         pygame.display.flip()
         await asyncio.sleep(0)  # yield
 
@@ -156,18 +211,42 @@ async def ask_game_mode(screen):
         pygame.display.flip()
         await asyncio.sleep(0)  # yield
 
+async def show_notice(screen, text, seconds=4.0):
+    """Show `text` until a click or key press, or for `seconds`."""
+    font = pygame.font.SysFont(None, 40)
+    small = pygame.font.SysFont(None, 28)
+    clock = pygame.time.Clock()
+    end = pygame.time.get_ticks() + int(seconds * 1000)
+    while pygame.time.get_ticks() < end:
+        for ev in pygame.event.get():
+            if ev.type in (pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                return
+        screen.fill((10, 30, 10))
+        t = font.render(text, True, (255, 255, 255))
+        screen.blit(t, t.get_rect(center=(screen.get_width()//2, screen.get_height()//2)))
+        hint = small.render("Click to go back to the menu", True, (200, 200, 200))
+        screen.blit(hint, hint.get_rect(center=(screen.get_width()//2, screen.get_height()//2 + 50)))
+        pygame.display.flip()
+        clock.tick(30)
+        await asyncio.sleep(0)
+
 # ---------------- Main loop (async) ----------------
 async def main_async():
     screen = initialize_maximized_game()
 
     while True:
+        max_pip = await ask_domino_set(screen)
+        if max_pip is None:
+            break
+
         num_players = await show_player_select(screen)
         if num_players is None:
             break
 
-        num_humans = await ask_human_players(screen, num_players)
-        if num_humans is None:
+        seats = await ask_human_players(screen, num_players)
+        if seats is None:
             break
+        num_humans, ai_levels = seats
 
         game_mode = await ask_game_mode(screen)
         if game_mode is None:
@@ -175,12 +254,19 @@ async def main_async():
 
         await show_starting(screen, f"Starting {game_mode} game...")
 
-        print(f"[MAIN] Starting game with {num_players} players "
+        print(f"[MAIN] Starting {DOMINO_SETS[max_pip]} game with {num_players} players "
               f"({num_humans} human, {num_players - num_humans} AI)")
         print(f"[MAIN] Window size: {screen.get_width()}x{screen.get_height()}")
 
         # Prefer async run if present
-        game = Game(screen, num_players, num_humans, game_mode=game_mode)
+        try:
+            game = Game(screen, num_players, num_humans, game_mode=game_mode, max_pip=max_pip,
+                        ai_levels=ai_levels)
+        except ValueError as e:
+            # e.g. a window too small to lay out the whole set
+            print(f"[MAIN] Can't start that game: {e}")
+            await show_notice(screen, f"{e}. Enlarge the window or pick a smaller set.")
+            continue
         if hasattr(game, "run_async"):
             result = await game.run_async()
         else:
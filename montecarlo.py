@@ -0,0 +1,243 @@
+# montecarlo.py — determinized Monte Carlo move choice for the AI
+#
+# The AI can see its own hand, the board and how many tiles everyone else
+# holds. For each sample we deal the unseen tiles at random into the other
+# hands and the boneyard (a "determinization"), then play the hand out from
+# every candidate move with a fast greedy policy. The move with the best
+# average outcome wins. Everything here works on BoardPosition and bitboard
+# masks, so the samples can run in worker processes without pygame.
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import TILE_PIPS, full_mask, indices, pip_total
+from engine import TARGET_SCORE, blocked_winner, hand_bonus, legal_moves, points_for_total
+from position import BoardPosition
+
+WIN_BONUS = 100         # added to a rollout that reaches TARGET_SCORE
+RETURN_MARGIN = 0.02    # seconds workers stop early so their totals are back in time
+
+
+class MonteCarloAI:
+    """
+    Picks a move by sampling deals for the hidden tiles and rolling each
+    candidate out to the end of the hand. Samples are spread over a shared
+    process pool until `time_budget` seconds have passed; where worker
+    processes aren't available (e.g. the browser build) they run in-process.
+    The budget is a deadline: a sample still running at it is dropped, and
+    only when none at all has finished is one played out past it.
+
+    `spec` is a plain dict describing what the player can see:
+        max_pip, scoring_mode, scoring_enabled,
+        position   BoardPosition.snapshot() of the board,
+        seat       index of the player to move,
+        hand       bitboard mask of that player's hand,
+        played     mask of the tiles on the board,
+        hand_counts, scores   per seat,
+        boneyard_count,
+        impossible masks per seat of tiles that player can't hold (optional)
+    and a candidate is (tile_index, arm, connection_value), arm None for the
+    opening tile.
+    """
+
+    _pool = None          # shared by every instance; False once it failed to start
+
+    def __init__(self, time_budget=1.0, workers=None, seed=None):
+        self.time_budget = time_budget
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 1)))
+        self.rng = random.Random(seed)   # never touch the game's shuffle
+        self.last_samples = 0
+
+    def choose(self, spec, candidates):
+        """Index into `candidates` of the move with the best average rollout."""
+        if len(candidates) <= 1:
+            self.last_samples = 0
+            return 0 if candidates else None
+
+        # Wall-clock deadline, since the workers are other processes
+        deadline = time.time() + self.time_budget
+        tasks = [(spec, candidates, deadline - RETURN_MARGIN, self.rng.getrandbits(64), 0)
+                 for _ in range(self.workers)]
+        totals = [0.0] * len(candidates)
+        samples = 0
+        batches = self._run(tasks)
+        if not sum(batch_samples for _, batch_samples in batches):
+            # The pool took the whole budget to answer: one sample here
+            batches = [run_batch((spec, candidates, deadline, tasks[0][3], 1))]
+        for batch_totals, batch_samples in batches:
+            samples += batch_samples
+            for i, value in enumerate(batch_totals):
+                totals[i] += value
+
+        self.last_samples = samples
+        best = max(range(len(candidates)), key=lambda i: totals[i])
+        print(f"[MC] {samples} samples over {len(candidates)} moves; "
+              f"best average {totals[best] / max(1, samples):.2f}")
+        return best
+
+    def _run(self, tasks):
+        pool = self._get_pool()
+        if pool:
+            try:
+                return list(pool.map(run_batch, tasks))
+            except Exception as e:
+                print(f"[MC] Process pool failed ({e}); running in-process")
+                MonteCarloAI._pool = False
+        # In-process: one batch with the whole budget, and at least one sample
+        return [run_batch(tasks[0][:4] + (1,))]
+
+    def _get_pool(self):
+        if MonteCarloAI._pool is None:
+            try:
+                MonteCarloAI._pool = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, ImportError, NotImplementedError) as e:
+                print(f"[MC] No process pool available ({e}); running in-process")
+                MonteCarloAI._pool = False
+        return MonteCarloAI._pool
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+        cls._pool = None
+
+
+# ---------- worker side (module-level so the pool can pickle it) ----------
+
+def run_batch(task):
+    """
+    Sample deals until the time.time() deadline; returns (total per
+    candidate, samples). A sample the deadline cuts short is dropped, unless
+    fewer than `floor` have finished.
+    """
+    spec, candidates, deadline, seed, floor = task
+    rng = random.Random(seed)
+    totals = [0.0] * len(candidates)
+    samples = 0
+    while samples < floor or time.time() < deadline:
+        hands, boneyard = deal_unseen(spec, rng)
+        outcomes = []
+        for move in candidates:
+            if samples >= floor and time.time() >= deadline:
+                return totals, samples
+            outcomes.append(playout(spec, hands, boneyard, move))
+        for i, outcome in enumerate(outcomes):
+            totals[i] += outcome
+        samples += 1
+    return totals, samples
+
+
+def deal_unseen(spec, rng, attempts=8):
+    """
+    One determinization: (hand mask per seat, boneyard tile list). Each other
+    hand avoids the tiles spec['impossible'] says it can't hold, filling the
+    most constrained hands first; if the shuffle keeps painting itself into a
+    corner, the last attempt deals without the constraints.
+    """
+    seat = spec['seat']
+    counts = spec['hand_counts']
+    impossible = spec.get('impossible') or [0] * len(counts)
+    unseen = list(indices(full_mask(spec['max_pip']) & ~(spec['hand'] | spec['played'])))
+    others = sorted((s for s in range(len(counts)) if s != seat),
+                    key=lambda s: impossible[s].bit_count(), reverse=True)
+
+    for attempt in range(attempts + 1):
+        rng.shuffle(unseen)
+        hands = [0] * len(counts)
+        hands[seat] = spec['hand']
+        left = unseen
+        for other in others:
+            barred = impossible[other] if attempt < attempts else 0
+            take = [index for index in left if not barred >> index & 1][:counts[other]]
+            if len(take) < counts[other]:
+                break
+            for index in take:
+                hands[other] |= 1 << index
+            left = [index for index in left if not hands[other] >> index & 1]
+        else:
+            return hands, left
+
+
+def greedy_move(position, moves, scoring_enabled):
+    """Rollout policy: the biggest immediate score, then the heaviest tile."""
+    best, best_key = None, None
+    for move in moves:
+        index, arm, connection_value = move
+        a, b = TILE_PIPS[index]
+        points = 0
+        if scoring_enabled:
+            points = points_for_total(position.projected_total(arm, a, b, connection_value))
+        key = (points, a + b)
+        if best_key is None or key > best_key:
+            best, best_key = move, key
+    return best
+
+
+def playout(spec, hands, boneyard, first_move):
+    """
+    Play the hand out from `first_move` by the player to move. Returns their
+    points minus the others' average (classic) or 1/0 for a win (race).
+    """
+    position = BoardPosition(spec['scoring_mode'])
+    state = list(spec['position'])
+    state[2] = dict(state[2])          # tips are updated in place
+    position.restore(tuple(state))
+
+    me = spec['seat']
+    scoring = spec['scoring_enabled']
+    hands = list(hands)
+    boneyard = list(boneyard)
+    n = len(hands)
+    gains = [0] * n
+    seat, move, passes = me, first_move, 0
+
+    while True:
+        if move is None:
+            moves = legal_moves(position, hands[seat])
+            while not moves and boneyard:
+                hands[seat] |= 1 << boneyard.pop()
+                moves = legal_moves(position, hands[seat])
+            if not moves:
+                passes += 1
+                if passes >= n:
+                    return _blocked_value(spec, hands, gains, me)
+                seat = (seat + 1) % n
+                continue
+            move = greedy_move(position, moves, scoring)
+
+        passes = 0
+        index, arm, connection_value = move
+        a, b = TILE_PIPS[index]
+        position.place(arm, a, b, connection_value)
+        hands[seat] &= ~(1 << index)
+
+        if not hands[seat]:
+            if not scoring:
+                return 1.0 if seat == me else 0.0
+            gains[seat] += 5 * round(sum(pip_total(hand) for hand in hands) / 5)
+            return _points_value(spec, gains, me)
+
+        if scoring and position.total > 0 and position.total % 5 == 0:
+            gains[seat] += position.total
+            if spec['scores'][seat] + gains[seat] >= TARGET_SCORE:
+                gains[seat] += WIN_BONUS
+                return _points_value(spec, gains, me)
+
+        seat = (seat + 1) % n
+        move = None
+
+
+def _blocked_value(spec, hands, gains, me):
+    """Blocked hand: fewest pips wins (lowest seat on a tie), as in Game."""
+    pips = [pip_total(hand) for hand in hands]
+    winner = blocked_winner(pips)
+    if not spec['scoring_enabled']:
+        return 1.0 if winner == me else 0.0
+    gains[winner] += hand_bonus(pips, winner)
+    return _points_value(spec, gains, me)
+
+
+def _points_value(spec, gains, me):
+    others = [g for s, g in enumerate(gains) if s != me]
+    return gains[me] - sum(others) / len(others)
@@ -0,0 +1,111 @@
+# parity.py — replays seeded Game sessions on a bare engine.GameState
+#
+#   python parity.py [games]
+#
+# Game runs its rules on a GameState of its own and moves the pixel Board,
+# Tiles and Boneyard to follow it. This plays seeded greedy games through a
+# headless Game and replays every action it took on a separate GameState
+# dealt from the same rng, checking after each one that the scores, hands,
+# boneyard, board and phase on the table match the replay, and before each
+# turn that the Board offers exactly the plays the engine allows. Any
+# difference raises AssertionError naming the game and the action.
+import contextlib
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from bitboard import mask_of
+from engine import GameState
+from game import Game
+
+SCREEN = (1200, 800)
+# (players, highest pip, mode) for each seed
+CONFIGS = ((2, 6, "scoring"), (4, 6, "scoring"), (3, 9, "scoring"), (4, 9, "race"), (2, 12, "race"))
+MAX_TURNS = 5000
+
+
+def _table(game):
+    """What the table shows, in the same shape as _rules."""
+    return ([p.score for p in game.players], [mask_of(p.hand) for p in game.players],
+            [t.index for t in game.boneyard.tiles], game.board.position.hash, game.board.position.total)
+
+
+def _rules(state):
+    return (list(state.scores), list(state.hands), list(state.boneyard), state.position.hash, state.position.total)
+
+
+def _phase(game):
+    """The table's phase in GameState terms."""
+    if game.phase == "game_over" or game.game_over:
+        return 'game_over'
+    return 'hand_over' if game.phase == "hand_summary" else 'playing'
+
+
+def _check_offers(game, replica, where):
+    """The Board's moves for the player to move must be the engine's plays."""
+    if not game.board.tiles:
+        return      # the opening tile goes in the centre; only the engine knows which one must lead
+    player = game.players[replica.current]
+    offered = {game._engine_action(tile, (direction, target, end))
+               for tile, direction, target, end in game.board.moves_for_hand(player.hand)}
+    allowed = {action for action in replica.legal_actions() if action[0] == 'play'}
+    assert offered == allowed, f"{where}: board offers {sorted(offered - allowed)}, " \
+                               f"engine allows {sorted(allowed - offered)} besides"
+
+
+def replay(seed, players, max_pip, mode):
+    """Play one seeded game through Game and step a bare GameState alongside it. Returns (hands, actions)."""
+    random.seed(seed)
+    game = Game(pygame.display.get_surface(), players, 0, game_mode=mode, max_pip=max_pip, ai_levels="greedy")
+    state = game.state
+    replica = GameState(players, max_pip, state.scoring_enabled, state.position.scoring_mode, deal=False)
+    replica.rng.setstate(state.rng.getstate())
+    game._deal_initial_hands()
+    replica.deal()
+    label = f"seed {seed}, {players} players, {max_pip} pips, {mode}"
+
+    seen = 0
+    for _ in range(MAX_TURNS):
+        where = f"{label}, action {seen}"
+        assert _table(game) == _rules(replica), f"{where}: table and engine differ"
+        phase = _phase(game)
+        if phase == 'hand_over' and replica.phase == 'game_over':
+            phase = 'game_over'     # the last hand's summary comes up before Game Over
+        assert phase == replica.phase, f"{where}: table is {phase}, engine is {replica.phase}"
+        if replica.phase == 'game_over':
+            assert game.state.winner == replica.winner, f"{where}: the winners differ"
+            return replica.hands_played, seen
+        if replica.phase == 'hand_over':
+            game._handle_mouse_click((-1, -1))      # dismiss the hand summary; Game deals the next hand
+            replica.next_hand()
+            continue
+
+        assert game.current_player_index == replica.current, f"{where}: wrong player to move"
+        _check_offers(game, replica, where)
+        game._handle_player_turn()
+        for action in game.action_log[seen:]:
+            assert action in replica.legal_actions(), f"{label}, action {seen}: {action} is not legal"
+            replica.step(action)
+            seen += 1
+    raise AssertionError(f"{label}: no result after {MAX_TURNS} turns")
+
+
+def main(games=20):
+    pygame.init()
+    pygame.display.set_mode(SCREEN)
+    for players, max_pip, mode in CONFIGS:
+        hands = actions = 0
+        for seed in range(games):
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                played, stepped = replay(seed, players, max_pip, mode)
+            hands += played
+            actions += stepped
+        print(f"{players} players, double-{max_pip}, {mode}: {games} games, {hands} hands, "
+              f"{actions} actions replayed, table and engine agree")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
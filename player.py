@@ -1,45 +1,115 @@
 import pygame
+from bitboard import MAX_SUPPORTED_PIP
 
 # Define a consistent tile size for drawing, assuming 40x80 is standard domino size
 TILE_WIDTH = 40
 TILE_HEIGHT = 80
 
 class Player:
-    def __init__(self, index, is_human=True):
+    def __init__(self, index, is_human=True, seat_span=(0.0, 1.0)):
         self.index = index
+        # Side of the table: 0=bottom, 1=left, 2=top, 3=right. With more than
+        # four players two seats share a side, each taking seat_span of it.
+        self.seat = index % 4
+        self.seat_span = seat_span
         self.hand = []
         self.is_human = is_human
         self.score = 0
 
+    # ---------- hand and its pip index ----------
+    # The hand stays a list (its order is the on-screen order); alongside it
+    # we keep the held tiles by bitboard index, by pip, a per-pip count and
+    # the pip total. Assign self.hand or go through add_tile()/remove_tile()
+    # so they stay in step; don't mutate the list in place.
+
+    @property
+    def hand(self):
+        return self._hand
+
+    @hand.setter
+    def hand(self, tiles):
+        self._hand = list(tiles)
+        self.tiles_by_index = {}
+        self.by_pip = {}          # pip -> {tile.index: tile}
+        self.suit_counts = [0] * (MAX_SUPPORTED_PIP + 1)
+        self.pip_total = 0
+        for tile in self._hand:
+            self._index_tile(tile)
+
+    def _index_tile(self, tile):
+        self.tiles_by_index[tile.index] = tile
+        for pip in {tile.value1, tile.value2}:
+            self.by_pip.setdefault(pip, {})[tile.index] = tile
+            self.suit_counts[pip] += 1
+        self.pip_total += tile.value1 + tile.value2
+
     def add_tile(self, tile):
-        self.hand.append(tile)
+        self._hand.append(tile)
+        self._index_tile(tile)
 
     def remove_tile(self, tile):
-        if tile in self.hand:
-            self.hand.remove(tile)
-        else:
+        held = self.tiles_by_index.pop(tile.index, None)
+        if held is None:
             print(f"Warning: Tile ({tile.value1}, {tile.value2}) not found in Player {self.index + 1}'s hand.")
+            return
+        for i, t in enumerate(self._hand):
+            if t is held:
+                del self._hand[i]
+                break
+        for pip in {held.value1, held.value2}:
+            del self.by_pip[pip][held.index]
+            self.suit_counts[pip] -= 1
+        self.pip_total -= held.value1 + held.value2
+
+    def has_tile(self, tile):
+        return tile.index in self.tiles_by_index
+
+    def tiles_with_pip(self, pip):
+        return list(self.by_pip.get(pip, {}).values())
+
+    def can_match(self, pips):
+        """True if any tile in hand shows one of `pips` (None entries are ignored)."""
+        counts = self.suit_counts
+        return any(pip is not None and counts[pip] for pip in pips)
 
     def add_score(self, points):
         self.score += points
         print(f"Player {self.index + 1} scored {points} points! Total: {self.score}")
 
+    def hand_run(self, origin, length, count, tile_size, spacing):
+        """
+        (start, step, total) for `count` tiles centred in this seat's share of
+        a side `length` px long starting at `origin`. The step shrinks so a
+        big hand overlaps rather than running off its share.
+        """
+        lo, hi = self.seat_span
+        room = int(length * (hi - lo))
+        step = tile_size + spacing
+        if count > 1 and count * tile_size + (count - 1) * spacing > room:
+            step = max(1, (room - tile_size) // (count - 1))
+        total = tile_size + step * (count - 1) if count else 0
+        return origin + int(length * (lo + hi) / 2) - total // 2, step, total
+
     def draw_hand(self, screen, play_area):
         font = pygame.font.SysFont(None, 24)
         score_font = pygame.font.SysFont(None, 20)
         label = font.render(f"Player {self.index + 1}", True, (255, 255, 255))
         score_label = score_font.render(f"Score: {self.score}", True, (255, 255, 0))
 
+        # Tiles come back from the board at its (possibly smaller) size
+        for tile in self.hand:
+            tile.update_size(TILE_WIDTH, TILE_HEIGHT)
+
         # Common variables for spacing
         tile_spacing = 10
         text_padding = 10
 
-        if self.index == 0:  # Bottom Player (Human)
+        if self.seat == 0:  # Bottom Player (Human)
             effective_tile_width = TILE_WIDTH
             effective_tile_height = TILE_HEIGHT
 
-            total_hand_width = len(self.hand) * effective_tile_width + (len(self.hand) - 1) * tile_spacing
-            tiles_start_x = (screen.get_width() - total_hand_width) // 2
+            tiles_start_x, step, total_hand_width = self.hand_run(
+                0, screen.get_width(), len(self.hand), effective_tile_width, tile_spacing)
 
             # Start where you had it originally
             tiles_y_position = screen.get_height() - effective_tile_height - 40
@@ -61,7 +131,7 @@ class Player:
             # Draw tiles (horizontal)
             for i, tile in enumerate(self.hand):
                 tile.set_rotation(0)
-                tile.set_position(tiles_start_x + i * (effective_tile_width + tile_spacing), tiles_y_position)
+                tile.set_position(tiles_start_x + i * step, tiles_y_position)
                 tile.draw(screen)
 
             # Center the two texts together, placed BELOW the tiles (but clamped on-screen)
@@ -72,7 +142,7 @@ class Player:
             screen.blit(score_label, (text_start_x + label.get_width() + text_padding, desired_text_y))
 
 
-        elif self.index == 1: # Left Player (Human) - Player 2
+        elif self.seat == 1: # Left Player (Human) - Player 2
             # Tiles are vertical, so their visual width is TILE_HEIGHT, height is TILE_WIDTH
             effective_tile_width = TILE_HEIGHT # Visual width when rotated 90 degrees (80)
             effective_tile_height = TILE_WIDTH # Visual height when rotated 90 degrees (40)
@@ -86,39 +156,38 @@ class Player:
             # Calculate combined height of rotated text
             combined_text_height = rotated_label.get_height() + rotated_score.get_height() + text_padding
             
-            # Center text vertically on screen
-            text_start_y = (screen.get_height() - combined_text_height) // 2
+            # Center text vertically on this seat's share of the side
+            text_start_y = int(screen.get_height() * sum(self.seat_span) / 2) - combined_text_height // 2
 
             # Position tiles 20px to the right of the text
             tiles_x_position = text_x_position + max(rotated_label.get_width(), rotated_score.get_width()) + 20
             
             # Calculate total hand height and center it vertically
-            total_hand_height = len(self.hand) * effective_tile_height + (len(self.hand) - 1) * tile_spacing
-            tiles_start_y = (screen.get_height() - total_hand_height) // 2
+            tiles_start_y, step, _ = self.hand_run(
+                0, screen.get_height(), len(self.hand), effective_tile_height, tile_spacing)
 
             for i, tile in enumerate(self.hand):
                 tile.set_rotation(90) # Ensure vertical
-                tile.set_position(tiles_x_position, tiles_start_y + i * (effective_tile_height + tile_spacing))
+                tile.set_position(tiles_x_position, tiles_start_y + i * step)
                 tile.draw(screen)
 
             # Draw rotated text at fixed position
             screen.blit(rotated_score, (text_x_position, text_start_y))
             screen.blit(rotated_label, (text_x_position, text_start_y + rotated_score.get_height() + text_padding))
 
-        elif self.index == 2: # Top Player (Human)
+        elif self.seat == 2: # Top Player (Human)
             # Tiles are horizontal
             effective_tile_width = TILE_WIDTH
             effective_tile_height = TILE_HEIGHT
 
-            total_hand_width = len(self.hand) * effective_tile_width + (len(self.hand) - 1) * tile_spacing
-            
             # Center hand horizontally
-            tiles_start_x = (screen.get_width() - total_hand_width) // 2
+            tiles_start_x, step, total_hand_width = self.hand_run(
+                0, screen.get_width(), len(self.hand), effective_tile_width, tile_spacing)
             tiles_y_position = 40 # Position from top edge
 
             for i, tile in enumerate(self.hand):
                 tile.set_rotation(0) # Ensure horizontal
-                tile.set_position(tiles_start_x + i * (effective_tile_width + tile_spacing), tiles_y_position)
+                tile.set_position(tiles_start_x + i * step, tiles_y_position)
                 tile.draw(screen)
 
             # Player label and score (centered above tiles)
@@ -129,7 +198,7 @@ class Player:
             screen.blit(label, (text_start_x, text_y_position))
             screen.blit(score_label, (text_start_x + label.get_width() + text_padding, text_y_position))
 
-        elif self.index == 3: # Right Player (Human) - Player 4 (FIXED SPACING)
+        elif self.seat == 3: # Right Player (Human) - Player 4 (FIXED SPACING)
             # Tiles are vertical, so their visual width is TILE_HEIGHT, height is TILE_WIDTH
             effective_tile_width = TILE_HEIGHT # Visual width when rotated 90 degrees (80)
             effective_tile_height = TILE_WIDTH # Visual height when rotated 90 degrees (40)
@@ -144,19 +213,19 @@ class Player:
             # Calculate combined height of rotated text
             combined_text_height = rotated_label.get_height() + rotated_score.get_height() + text_padding
             
-            # Center text vertically on screen
-            text_start_y = (screen.get_height() - combined_text_height) // 2
+            # Center text vertically on this seat's share of the side
+            text_start_y = int(screen.get_height() * sum(self.seat_span) / 2) - combined_text_height // 2
 
             # Position tiles to the left of text
             tiles_x_position = text_x_position - effective_tile_width - 20
             
             # FIXED: Calculate actual hand height and center properly
-            actual_hand_height = len(self.hand) * effective_tile_height + (len(self.hand) - 1) * tile_spacing
-            tiles_start_y = (screen.get_height() - actual_hand_height) // 2
+            tiles_start_y, step, _ = self.hand_run(
+                0, screen.get_height(), len(self.hand), effective_tile_height, tile_spacing)
 
             for i, tile in enumerate(self.hand):
                 tile.set_rotation(90) # Ensure vertical
-                tile.set_position(tiles_x_position, tiles_start_y + i * (effective_tile_height + tile_spacing))
+                tile.set_position(tiles_x_position, tiles_start_y + i * step)
                 tile.draw(screen)
 
             # Draw rotated text at fixed position
@@ -0,0 +1,114 @@
+# policies.py — AI players that act straight on an engine.GameState
+#
+# Game uses make_engine() for its AI seats; Policy wraps the same engines (or
+# the greedy scorer, or a random mover) for headless play, e.g. tournament.py.
+import random
+import time
+
+from bitboard import TILE_PIPS
+from endgame import EndgameSolver
+from engine import score_move
+from lookahead import LookaheadAI
+from montecarlo import MonteCarloAI
+
+# AI difficulty tiers, weakest first: name -> (menu label, per-move time
+# budget in seconds). The budget is a hard cap; engines aim for 80% of it.
+AI_LEVELS = {
+    "greedy": ("Easy", 0.05),
+    "lookahead": ("Medium", 0.25),
+    "montecarlo": ("Hard", 1.0),
+    "exact": ("Expert", 2.0),
+}
+
+
+def make_engine(level, budget=None):
+    """Search engine behind an AI level; None for plain greedy."""
+    budget = 0.8 * (AI_LEVELS[level][1] if budget is None else budget)
+    if level == "lookahead":
+        return LookaheadAI(time_budget=budget)
+    if level in ("montecarlo", "exact"):
+        return MonteCarloAI(time_budget=budget)
+    return None
+
+
+def visible_spec(state, seat, impossible=None):
+    """What `seat` can see of `state`, as the spec dict the search engines take."""
+    return {
+        'max_pip': state.max_pip,
+        'scoring_mode': state.position.scoring_mode,
+        'scoring_enabled': state.scoring_enabled,
+        'position': state.position.snapshot(),
+        'seat': seat,
+        'hand': state.hands[seat],
+        'played': state.position.played,
+        'hand_counts': [hand.bit_count() for hand in state.hands],
+        'scores': list(state.scores),
+        'boneyard_count': len(state.boneyard),
+        'impossible': list(impossible) if impossible else [0] * state.num_players,
+    }
+
+
+def greedy_action(state, actions):
+    """The play Board.ranked_moves would put first: move score, then pip sum, then doubles."""
+    position = state.position
+    best, best_key = None, None
+    for action in actions:
+        _, index, arm, connection_value = action
+        a, b = TILE_PIPS[index]
+        projected = position.projected_total(arm, a, b, connection_value)
+        key = (score_move(projected, position.total, state.scoring_enabled), a + b, a == b)
+        if best_key is None or key > best_key:
+            best, best_key = action, key
+    return best
+
+
+class Policy:
+    """
+    Plays whichever seat is to move: "random", or any AI level ("greedy",
+    "lookahead", "montecarlo", "exact" — the last one switching to the
+    endgame solver once the boneyard is empty). `budget` overrides the
+    level's per-move seconds. After each choice, last_time is how long it
+    took, reported like the UI's AI seats.
+    """
+
+    NAMES = ("random",) + tuple(AI_LEVELS)
+
+    def __init__(self, name, seed=None, budget=None):
+        if name not in self.NAMES:
+            raise ValueError(f"Unknown policy {name!r}; expected one of {', '.join(self.NAMES)}")
+        self.name = name
+        self.rng = random.Random(seed)
+        self.budget = AI_LEVELS[name][1] if budget is None and name in AI_LEVELS else budget
+        self.last_time = 0.0
+        self.engine = make_engine(name, budget) if name in AI_LEVELS else None
+        if isinstance(self.engine, MonteCarloAI):
+            self.engine.rng.seed(seed)
+        self.endgame = None
+        if name == "exact":
+            self.endgame = EndgameSolver(time_budget=0.8 * self.budget)
+
+    def act(self, state, impossible=None):
+        """Action for the player to move in `state` (which is left untouched)."""
+        actions = state.legal_actions()
+        plays = [action for action in actions if action[0] == 'play']
+        if len(plays) <= 1:
+            return actions[0]
+        if self.name == "random":
+            return self.rng.choice(plays)
+
+        start = time.perf_counter()
+        action = None
+        engine = self.engine
+        if engine is not None:
+            spec = visible_spec(state, state.current, impossible)
+            if self.endgame and self.endgame.applies(spec):
+                engine = self.endgame
+            best = engine.choose(spec, [play[1:] for play in plays])
+            if best is not None:
+                action = plays[best]
+        if action is None:
+            action = greedy_action(state, plays)
+        self.last_time = time.perf_counter() - start
+        print(f"[AI] Player {state.current + 1} ({AI_LEVELS[self.name][0]}) used "
+              f"{self.last_time:.2f}s of its {self.budget:.2f}s budget")
+        return action
@@ -0,0 +1,150 @@
+# position.py — the board as the rules see it: arms and the pips they expose
+from bitboard import tile_index, tips_hash, ZOBRIST_TILE, ZOBRIST_SPINNER, ZOBRIST_TIP
+
+SIDES = ('left', 'right', 'top', 'bottom')
+OPPOSITE = {'left': 'right', 'right': 'left', 'top': 'bottom', 'bottom': 'top'}
+
+
+class BoardPosition:
+    """
+    Pixel-free view of the layout. Before a spinner is down the line has a
+    'left' and a 'right' arm; once the first double is played it becomes the
+    spinner and can grow up to four arms. Each started arm only needs the pip
+    showing at its open end (and whether that end tile is a double).
+    """
+
+    def __init__(self, scoring_mode='spinner_stays_12'):
+        self.scoring_mode = scoring_mode
+        self.reset()
+
+    def reset(self):
+        self.tile_count = 0
+        self.spinner = None   # pip of the spinner double, once one is down
+        self.tips = {}        # arm -> (exposed_pip, tip_is_double)
+        self.total = 0        # board-ends total, kept up to date by place()
+        self.played = 0       # bitboard mask of the tiles on the board
+        self.hash = 0         # Zobrist hash of played tiles, spinner and tips
+        self._ends = (('center', None),)
+
+    def open_ends(self):
+        """Tuple of (arm, pip) that can be played on, in left/right/top/bottom order."""
+        return self._ends
+
+    def place(self, arm, value1, value2, connection_value):
+        """
+        Record a tile joined to `arm` on `connection_value`. `arm` is ignored
+        for the opening tile.
+        """
+        is_double = value1 == value2
+        index = tile_index(value1, value2)
+        self.played |= 1 << index
+        h = self.hash ^ ZOBRIST_TILE[index]
+
+        if self.tile_count == 0:
+            self.total = self._opening_total(value1, value2)
+            if is_double:
+                self.spinner = value1
+                h ^= ZOBRIST_SPINNER[value1]
+            else:
+                self.tips = {'left': (value1, False), 'right': (value2, False)}
+                h ^= tips_hash(self.tips)
+        else:
+            self.total += self._total_delta(arm, value1, value2, connection_value)
+            if is_double and self.spinner is None:
+                # First double played on the line becomes the spinner; the rest
+                # of the line hangs off its other side.
+                self.spinner = value1
+                h ^= tips_hash(self.tips) ^ ZOBRIST_SPINNER[value1]
+                self.tips = {OPPOSITE[arm]: self.tips[OPPOSITE[arm]]}
+                h ^= tips_hash(self.tips)
+            else:
+                tip = (self._exposed(value1, value2, connection_value), is_double)
+                if arm in self.tips:
+                    h ^= ZOBRIST_TIP[(arm,) + self.tips[arm]]
+                self.tips[arm] = tip
+                h ^= ZOBRIST_TIP[(arm,) + tip]
+
+        self.hash = h
+
+        self.tile_count += 1
+        self._refresh_ends()
+
+    def snapshot(self):
+        """Everything place() changes, for restore() to put back."""
+        return (self.tile_count, self.spinner, dict(self.tips), self.total,
+                self.played, self.hash, self._ends)
+
+    def restore(self, state):
+        (self.tile_count, self.spinner, self.tips, self.total,
+         self.played, self.hash, self._ends) = state
+
+    def projected_total(self, arm, value1, value2, connection_value):
+        """Board-ends total after placing a tile on `arm`, without changing anything."""
+        if self.tile_count == 0:
+            return self._opening_total(value1, value2)
+        return self.total + self._total_delta(arm, value1, value2, connection_value)
+
+    def end_signature(self):
+        """
+        Everything projected_total() reads besides the candidate tile: the
+        tips, the spinner and whether it stands alone. Two positions with the
+        same signature score every move alike, whatever else is on the board.
+        """
+        tips = self.tips
+        return (self.scoring_mode, min(self.tile_count, 2), self.spinner, self.total,
+                tuple((arm,) + tips[arm] for arm in SIDES if arm in tips))
+
+    @staticmethod
+    def _opening_total(value1, value2):
+        return value1 * 2 if value1 == value2 else value1 + value2
+
+    @staticmethod
+    def _exposed(value1, value2, connection_value):
+        """Pip a tile shows outward once joined on `connection_value`."""
+        return value2 if value1 == connection_value else value1
+
+    @staticmethod
+    def _contribution(tip):
+        pip, is_double = tip
+        return pip * 2 if is_double else pip
+
+    def _spinner_term(self, has_left, has_right, lone):
+        """
+        What the spinner itself adds to the total: a lone spinner always
+        scores as a double; under 'spinner_stays_12' it keeps doing so until
+        both left and right have been played.
+        """
+        if lone or (self.scoring_mode == 'spinner_stays_12' and not (has_left and has_right)):
+            return self.spinner * 2
+        return 0
+
+    def _total_delta(self, arm, value1, value2, connection_value):
+        """Change in the ends total when a tile joins `arm` of a non-empty board."""
+        tips = self.tips
+        is_double = value1 == value2
+
+        if is_double and self.spinner is None:
+            # The double becomes the spinner: `arm` is now its open side and
+            # the other side keeps the far end of the line.
+            spinner_term = value1 * 2 if self.scoring_mode == 'spinner_stays_12' else 0
+            return spinner_term - self._contribution(tips[arm])
+
+        delta = self._contribution((self._exposed(value1, value2, connection_value), is_double))
+        if arm in tips:
+            return delta - self._contribution(tips[arm])
+        # A new spinner arm may change what the spinner itself is worth
+        has_left, has_right = 'left' in tips, 'right' in tips
+        before = self._spinner_term(has_left, has_right, self.tile_count == 1)
+        after = self._spinner_term(has_left or arm == 'left', has_right or arm == 'right', False)
+        return delta + after - before
+
+    def _refresh_ends(self):
+        tips = self.tips
+        if self.tile_count == 0:
+            self._ends = (('center', None),)
+        elif self.spinner is None:
+            self._ends = (('left', tips['left'][0]), ('right', tips['right'][0]))
+        else:
+            # Spinner arms: left/right always, top/bottom once both left and right exist
+            arms = SIDES if ('left' in tips and 'right' in tips) else SIDES[:2]
+            self._ends = tuple((arm, tips[arm][0] if arm in tips else self.spinner) for arm in arms)
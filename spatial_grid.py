@@ -0,0 +1,47 @@
+# spatial_grid.py — uniform grid of placed tile rects for collision checks
+
+
+class SpatialGrid:
+    """
+    Buckets axis-aligned rects into fixed-size cells so an overlap query only
+    looks at the handful of rects near it instead of every placed tile.
+    Rects are stored as plain (x, y, w, h) tuples, copied at insert time.
+    """
+
+    def __init__(self, cell_width, cell_height):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}   # (col, row) -> list of rects touching that cell
+
+    def clear(self):
+        self.cells.clear()
+
+    def _cell_range(self, x, y, w, h):
+        cw, ch = self.cell_width, self.cell_height
+        return (range(x // cw, (x + w - 1) // cw + 1),
+                range(y // ch, (y + h - 1) // ch + 1))
+
+    def insert(self, x, y, w, h):
+        rect = (x, y, w, h)
+        cols, rows = self._cell_range(x, y, w, h)
+        for col in cols:
+            for row in rows:
+                self.cells.setdefault((col, row), []).append(rect)
+
+    def overlaps(self, x, y, w, h, inset=0):
+        """
+        True if (x, y, w, h) overlaps any stored rect, with both rects shrunk
+        by `inset` on every side first (never below 1px).
+        """
+        ax, ay = x + inset, y + inset
+        ax2, ay2 = ax + max(1, w - 2 * inset), ay + max(1, h - 2 * inset)
+        cols, rows = self._cell_range(x, y, w, h)
+        cells = self.cells
+        for col in cols:
+            for row in rows:
+                for bx, by, bw, bh in cells.get((col, row), ()):
+                    bx, by = bx + inset, by + inset
+                    if (ax < bx + max(1, bw - 2 * inset) and bx < ax2 and
+                            ay < by + max(1, bh - 2 * inset) and by < ay2):
+                        return True
+        return False
@@ -1,6 +1,7 @@
 # tile.py  — web/pygbag-friendly image loading for domino tiles
 import os
 import pygame
+from bitboard import tile_index
 
 # Resolve paths in a way that works in pygbag (browser) and desktop
 BASE_DIR = os.path.dirname(__file__)
@@ -8,10 +9,56 @@ def R(*parts: str) -> str:
     """Join path parts relative to this file (and also try plain relative)."""
     return os.path.join(BASE_DIR, *parts)
 
+# Faces as loaded by (a, b), and scaled by (a, b, w, h); swap_values() and
+# update_size() reload the image, so without these every flip would go back
+# to disk.
+_BASE_FACES = {}
+_FACE_CACHE = {}
+
+# Pip spots on a 3x3 grid (col, row) for 0-9; bigger values are drawn as numbers.
+_PIP_SPOTS = {
+    0: (),
+    1: ((1, 1),),
+    2: ((0, 0), (2, 2)),
+    3: ((0, 0), (1, 1), (2, 2)),
+    4: ((0, 0), (2, 0), (0, 2), (2, 2)),
+    5: ((0, 0), (2, 0), (1, 1), (0, 2), (2, 2)),
+    6: ((0, 0), (2, 0), (0, 1), (2, 1), (0, 2), (2, 2)),
+    7: ((0, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (2, 2)),
+    8: ((0, 0), (1, 0), (2, 0), (0, 1), (2, 1), (0, 2), (1, 2), (2, 2)),
+    9: tuple((c, r) for r in range(3) for c in range(3)),
+}
+
+
+def generated_face(a: int, b: int, w: int, h: int) -> pygame.Surface:
+    """
+    Draw a vertical a|b face (a on top) for tiles with no card art, e.g. the
+    extra tiles of double-nine and bigger sets.
+    """
+    face = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.rect(face, (245, 245, 235), face.get_rect(), border_radius=max(2, w // 8))
+    pygame.draw.rect(face, (40, 40, 40), face.get_rect(), max(1, w // 20), border_radius=max(2, w // 8))
+    pygame.draw.line(face, (40, 40, 40), (w // 8, h // 2), (w - w // 8, h // 2), max(1, w // 20))
+    for half, value in ((0, a), (1, b)):
+        top = half * h // 2
+        if value in _PIP_SPOTS:
+            radius = max(1, w // 12)
+            for col, row in _PIP_SPOTS[value]:
+                cx = w * (col + 1) // 4
+                cy = top + h // 2 * (row + 1) // 4
+                pygame.draw.circle(face, (20, 20, 20), (cx, cy), radius)
+        else:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            text = pygame.font.SysFont(None, max(12, w * 3 // 4)).render(str(value), True, (20, 20, 20))
+            face.blit(text, text.get_rect(center=(w // 2, top + h // 4)))
+    return face
+
 class Tile:
     def __init__(self, value1: int, value2: int):
         self.value1 = value1
         self.value2 = value2
+        self.index = tile_index(value1, value2)   # fixed bit in bitboard masks
 
         # Keep the same visual size you’ve been using
         self.current_width = 40
@@ -44,11 +91,18 @@ class Tile:
         return None
 
     def _load_face_surface(self, a: int, b: int) -> pygame.Surface:
+        """Unscaled face for a|b, looked up once per tile value."""
+        a, b = sorted((a, b))
+        face = _BASE_FACES.get((a, b))
+        if face is None:
+            face = _BASE_FACES[a, b] = self._find_face_surface(a, b)
+        return face
+
+    def _find_face_surface(self, a: int, b: int) -> pygame.Surface:
         """
         Accept several filename variants to be robust to case/underscore/dash
         differences. Preferred is: assets/Cards/card_<min>-<max>.jpg
         """
-        a, b = sorted((a, b))
         candidates = [
             f"assets/Cards/card_{a}-{b}.jpg",
             f"assets/Cards/card_{a}-{b}.JPG",
@@ -63,30 +117,40 @@ class Tile:
             if surf:
                 return surf
 
-        # Fallback placeholder so the game still runs if an asset is missing
-        print(f"[ASSET] Missing image for tile {a}-{b}; using placeholder.")
-        ph = pygame.Surface((self.current_width, self.current_height), pygame.SRCALPHA)
-        ph.fill((0, 0, 0))
-        pygame.draw.rect(ph, (200, 200, 200), ph.get_rect(), 6)
-        return ph
+        # No card art for this tile (bigger sets only ship 0-6): draw one
+        if b <= 6:
+            print(f"[ASSET] Missing image for tile {a}-{b}; drawing a face instead.")
+        return generated_face(a, b, 100, 200)
 
     def _load_image(self) -> pygame.Surface:
         """
-        Load the face image (normalizing to min-max naming) and scale to 40x80.
+        Load the face image (normalizing to min-max naming) and scale to the
+        current size (40x80 unless the board shrank it).
         """
         a, b = sorted((self.value1, self.value2))
         # Normalize stored values to match canonical filename order
         if (self.value1, self.value2) != (a, b):
             self.value1, self.value2 = a, b
 
-        face = self._load_face_surface(self.value1, self.value2)
-        return pygame.transform.smoothscale(face, (self.current_width, self.current_height))
+        key = (a, b, self.current_width, self.current_height)
+        image = _FACE_CACHE.get(key)
+        if image is None:
+            face = self._load_face_surface(a, b)
+            image = _FACE_CACHE[key] = pygame.transform.smoothscale(face, (self.current_width, self.current_height))
+        return image
 
     # ---------- public API used by the rest of your game ----------
 
     def update_size(self, new_width: int, new_height: int):
-        # Intentional no-op (keeps spacing consistent with your current UI)
-        pass
+        """
+        Resize the face. The board shrinks tiles for sets bigger than
+        double-six and hands put them back; at the current size this is a no-op.
+        """
+        if (new_width, new_height) == (self.current_width, self.current_height):
+            return
+        self.current_width, self.current_height = new_width, new_height
+        self.image = self._load_image()
+        self._update_rect_after_rotation(self.rotation)
 
     def is_double(self) -> bool:
         return self.value1 == self.value2
@@ -0,0 +1,247 @@
+# tournament.py — headless self-play between AI strategies on every core
+#
+#   python tournament.py greedy lookahead [--games 1000] [--players 2] [--set 6]
+#                        [--mode scoring|race] [--seed 0] [--workers N] [--budget SECONDS]
+#
+# Strategies are the AI levels (greedy, lookahead, montecarlo, exact) plus
+# "random". Game g is dealt from seed + g, so a run repeats exactly, and the
+# strategies rotate round the seats from one game to the next. Search levels
+# use their interactive per-move budget unless --budget says otherwise.
+#
+# --duplicate replays every deal once per seat rotation, so each strategy
+# gets the same cards as the others and the luck of the deal cancels out.
+# Deals are added --batch at a time until every strategy's win share is
+# known to within --precision (at --confidence), or --games deals are used.
+import argparse
+import contextlib
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from engine import DOMINO_SETS, MAX_PLAYERS, GameState, hand_size_for
+from inference import HandInference
+from montecarlo import MonteCarloAI
+from policies import Policy
+
+ELO_START = 1500
+ELO_K = 16
+MAX_STEPS = 20_000      # a game that runs this long is abandoned as a bug
+
+
+def play_game(task):
+    """Play one seeded game; returns a result dict (see tally())."""
+    game_no, seed, strategies, max_pip, scoring, budget = task
+    players = len(strategies)
+    state = GameState(players, max_pip, scoring_enabled=scoring, seed=seed)
+    seats = [Policy(name, seed=seed * MAX_PLAYERS + seat, budget=budget)
+             for seat, name in enumerate(strategies)]
+    inference = HandInference(players, max_pip)
+    hands = blocked = 0
+
+    for _ in range(MAX_STEPS):
+        if state.phase == 'game_over':
+            break
+        if state.phase == 'hand_over':
+            hands += 1
+            blocked += state.blocked
+            state.next_hand()
+            inference.reset()
+            continue
+        seat = state.current
+        action = seats[seat].act(state, inference.impossible)
+        if action[0] != 'play':
+            inference.cannot_play(seat, [pip for _, pip in state.position.open_ends()],
+                                  drawing=action[0] == 'draw')
+        state.step(action)
+    else:
+        raise RuntimeError(f"Game {game_no} (seed {seed}) did not finish in {MAX_STEPS} steps")
+
+    return {
+        'game': game_no,
+        'seed': seed,
+        'strategies': strategies,
+        'scores': list(state.scores),
+        'winner': state.winner,
+        'hands': hands + 1,
+        'blocked': blocked + state.blocked,
+    }
+
+
+def _quiet_worker():
+    """Pool initializer: the engines' progress lines would swamp the report,
+    and the tournament already keeps every core busy, so no nested pools."""
+    sys.stdout = open(os.devnull, "w")
+    MonteCarloAI._pool = False
+
+
+@contextlib.contextmanager
+def _mapper(workers, games):
+    """map() over play_game tasks: a process pool, or in-process for one worker."""
+    if workers <= 1:
+        MonteCarloAI._pool = False
+        with open(os.devnull, "w") as sink:
+            def play_all(tasks):
+                with contextlib.redirect_stdout(sink):
+                    return [play_game(task) for task in tasks]
+            yield play_all
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as pool:
+        yield lambda tasks: list(pool.map(play_game, tasks,
+                                          chunksize=max(1, min(len(tasks), games) // (workers * 8))))
+
+
+def run(strategies, games, players, max_pip, scoring, seed, workers, budget):
+    tasks = [(g, seed + g, [strategies[(g + seat) % len(strategies)] for seat in range(players)],
+              max_pip, scoring, budget)
+             for g in range(games)]
+    with _mapper(workers, games) as play_all:
+        return play_all(tasks)
+
+
+def seatings(strategies, players):
+    """Every distinct rotation of `strategies` round the table; each strategy gets
+    the same number of seats across them."""
+    rotations = range(max(players, len(strategies)))
+    return list(dict.fromkeys(
+        tuple(strategies[(r + seat) % len(strategies)] for seat in range(players))
+        for r in rotations))
+
+
+def deal_shares(results, strategies):
+    """Per strategy, its win share on each deal (wins / seats it held), in seed order."""
+    by_deal = {}
+    for result in results:
+        deal = by_deal.setdefault(result['seed'], {name: [0, 0] for name in strategies})
+        for seat, name in enumerate(result['strategies']):
+            deal[name][1] += 1
+            deal[name][0] += seat == result['winner']
+    return {name: [by_deal[seed][name][0] / by_deal[seed][name][1] for seed in sorted(by_deal)]
+            for name in strategies}
+
+
+def interval(values, z):
+    """(mean, half-width) of the normal confidence interval for the mean of `values`."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, math.inf
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, z * math.sqrt(variance / n)
+
+
+def run_duplicate(strategies, max_deals, players, max_pip, scoring, seed, workers, budget,
+                  precision=0.02, batch=100, confidence=0.95):
+    """
+    Duplicate play: deal seed + d is played once per seating, for d = 0, 1, ...
+    in batches of `batch` deals, stopping once every strategy's mean win share
+    has a confidence interval no wider than ±`precision` (after at least two
+    batches) or after `max_deals`. Returns (results, {name: (mean, half-width)}).
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    tables = seatings(strategies, players)
+    results, intervals = [], {}
+    deals = 0
+    with _mapper(workers, batch * len(tables)) as play_all:
+        while deals < max_deals:
+            count = min(batch, max_deals - deals)
+            tasks = [(len(results) + i * len(tables) + t, seed + deals + i, list(table),
+                      max_pip, scoring, budget)
+                     for i in range(count) for t, table in enumerate(tables)]
+            results += play_all(tasks)
+            deals += count
+            intervals = {name: interval(shares, z)
+                         for name, shares in deal_shares(results, strategies).items()}
+            widest = max(half for _, half in intervals.values())
+            print(f"[DUPLICATE] {deals} deals, {len(results)} games: widest interval ±{widest:.1%}")
+            if deals >= 2 * batch and widest <= precision:
+                break
+    return results, intervals
+
+
+def tally(results, strategies):
+    """Per strategy: seat-games, wins, points, hands and Elo, in game order."""
+    stats = {name: {'seats': 0, 'wins': 0, 'points': 0, 'hands': 0, 'elo': float(ELO_START)}
+             for name in strategies}
+    for result in sorted(results, key=lambda r: r['game']):
+        seated = result['strategies']
+        for seat, name in enumerate(seated):
+            entry = stats[name]
+            entry['seats'] += 1
+            entry['points'] += result['scores'][seat]
+            entry['hands'] += result['hands']
+        winner = seated[result['winner']]
+        stats[winner]['wins'] += 1
+
+        # The winner beats every other strategy at the table, each pairing
+        # weighted so a game moves a rating by at most K.
+        losers = {name for name in seated if name != winner}
+        for loser in losers:
+            expected = 1 / (1 + 10 ** ((stats[loser]['elo'] - stats[winner]['elo']) / 400))
+            change = ELO_K / len(losers) * (1 - expected)
+            stats[winner]['elo'] += change
+            stats[loser]['elo'] -= change
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Self-play tournament between AI strategies.")
+    parser.add_argument("strategies", nargs="+", choices=Policy.NAMES)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--set", type=int, default=6, choices=sorted(DOMINO_SETS), dest="max_pip",
+                        help="highest double of the domino set")
+    parser.add_argument("--mode", choices=("scoring", "race"), default="scoring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="per-move seconds for search strategies (default: their AI level's)")
+    parser.add_argument("--duplicate", action="store_true",
+                        help="replay each deal in every seat rotation; --games is then the most deals")
+    parser.add_argument("--precision", type=float, default=0.02,
+                        help="duplicate: stop once every win share is known to within this")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--batch", type=int, default=100, help="duplicate: deals between checks")
+    args = parser.parse_args(argv)
+    hand_size_for(args.max_pip, args.players)      # fail early on an impossible table
+    strategies = list(dict.fromkeys(args.strategies))
+    scoring = args.mode == "scoring"
+
+    start = time.perf_counter()
+    intervals = None
+    if args.duplicate:
+        results, intervals = run_duplicate(strategies, args.games, args.players, args.max_pip, scoring,
+                                           args.seed, args.workers, args.budget,
+                                           args.precision, args.batch, args.confidence)
+    else:
+        results = run(strategies, args.games, args.players, args.max_pip, scoring,
+                      args.seed, args.workers, args.budget)
+    elapsed = time.perf_counter() - start
+
+    stats = tally(results, strategies)
+    games = len(results)
+    hands = sum(r['hands'] for r in results)
+    blocked = sum(r['blocked'] for r in results)
+    seeds = sorted({r['seed'] for r in results})
+    print(f"{games} games of {DOMINO_SETS[args.max_pip]}, {args.players} players, {args.mode} mode, "
+          f"seeds {seeds[0]}..{seeds[-1]}" + (f" ({len(seeds)} duplicate deals)" if intervals else ""))
+    print(f"{'strategy':<12}{'seats':>7}{'win rate':>10}{'pts/hand':>10}{'elo':>8}"
+          + (f"{f'{args.confidence:.0%} interval':>18}" if intervals else ""))
+    for name in sorted(strategies, key=lambda n: -stats[n]['elo']):
+        entry = stats[name]
+        win_rate = entry['wins'] / entry['seats'] if entry['seats'] else 0.0
+        per_hand = entry['points'] / entry['hands'] if entry['hands'] else 0.0
+        line = f"{name:<12}{entry['seats']:>7}{win_rate:>10.1%}{per_hand:>10.2f}{entry['elo']:>8.0f}"
+        if intervals:
+            mean, half = intervals[name]
+            line += f"{f'{mean:.1%} ±{half:.1%}':>18}"
+        print(line)
+    print(f"Blocked hands: {blocked}/{hands} ({blocked / hands:.1%})")
+    print(f"{games / elapsed:.1f} games/s, {hands / elapsed:.1f} hands/s "
+          f"({elapsed:.1f}s on {max(1, args.workers)} worker(s))")
+
+
+if __name__ == "__main__":
+    main()
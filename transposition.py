@@ -0,0 +1,62 @@
+# transposition.py — bounded position cache shared by the AI searches
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TranspositionTable:
+    """
+    Dict-like cache from a position key (built around BoardPosition.hash) to
+    whatever a search wants to remember about it. Holds at most max_entries
+    entries, however big each value is; past that the least recently used
+    entry is dropped. The searches store small tuples, so the count is what
+    bounds memory. Counts hits, misses and evictions so the game can report
+    how well it is doing.
+
+    Keys must include everything the stored value depends on beyond the
+    board (hands, seat to move, whose point of view), so one table can be
+    kept for a whole hand and shared between searches.
+    """
+
+    def __init__(self, max_entries=200_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        """The value stored for `key`, or `default` if there is none (a stored None is a hit)."""
+        entry = self.entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, value):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+        entries[key] = value
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (e.g. at a new hand); the counters keep running."""
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }